@@ -1,5 +1,6 @@
 # imports
 import os
+import time
 import requests
 import streamlit as st
 
@@ -55,6 +56,9 @@ st.sidebar.markdown(
 # API Configuration
 API_URL = os.getenv("API_URL", "http://localhost:8000")
 
+# Annotated images are displayed 700 px wide: ask the API for 2x that (high-DPI screens), not the original size
+IMAGE_OUTPUT_PARAMS = {"max_side": 1400, "quality": 90}
+
 # Input type selector
 input_type = st.radio(
                       "Select input type:",
@@ -76,6 +80,7 @@ if input_type == "Image":
             with st.spinner("Running YOLOv8 inference on image..."):
                 response = requests.post(
                                          f"{API_URL}/predict/image",
+                                         params=IMAGE_OUTPUT_PARAMS,
                                          files={"file": uploaded_file},
                                          )
 
@@ -110,19 +115,54 @@ elif input_type == "Video":
         st.info("Video uploaded. Click below to start processing.")
 
         if st.button("Run inference"):
-            with st.spinner(
-                            "Processing video... This may take some time depending on its length."
-                            ):
-                response = requests.post(
-                                         f"{API_URL}/predict/video",
-                                         files={"file": uploaded_file},
-                                         )
+            # Submit as an asynchronous job and poll its progress
+            response = requests.post(
+                                     f"{API_URL}/jobs/video",
+                                     files={"file": uploaded_file},
+                                     )
 
-            if response.status_code != 200:
+            if response.status_code != 202:
                 st.error(f"API error: {response.text}")
+                st.stop()
+
+            job = response.json()
+            progress = st.progress(0.0, text="Video queued...")
+
+            while job["status"] in ("queued", "running"):
+                time.sleep(1)
+                response = requests.get(f"{API_URL}/jobs/{job['id']}")
+
+                if not response.ok:
+                    st.error(f"API error: {response.text}")
+                    st.stop()
+
+                job = response.json()
+
+                if job["frames_total"]:
+                    text = (
+                            f"Processing video... {job['frames_done']}/{job['frames_total']} frames"
+                            f" | {job['fps'] or 0:.1f} fps"
+                            )
+                    if job["eta_seconds"] is not None:
+                        text += f" | ETA {job['eta_seconds']:.0f} s"
+
+                    progress.progress(
+                                      min(1.0, job["frames_done"] / job["frames_total"]),
+                                      text=text,
+                                      )
+
+            if job["status"] == "failed":
+                st.error(f"API error: {job['error']}")
             else:
+                progress.progress(1.0, text="Video processed.")
                 st.success("Video processing completed.")
 
+                response = requests.get(f"{API_URL}/jobs/{job['id']}/result")
+
+                if not response.ok:
+                    st.error(f"API error: {response.text}")
+                    st.stop()
+
                 annotated_video = response.content
 
                 st.download_button(
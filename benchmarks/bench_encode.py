@@ -0,0 +1,110 @@
+# Imports
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+import cv2
+import numpy as np
+from config.config import INFERENCE, TEST_IMAGE1
+from benchmarks.load_test import synthetic_images
+from benchmarks.bench_render import NAMES
+
+sys.path.insert(0, str(INFERENCE))
+from image_io import downscale, encode_image  # type: ignore
+from render import Renderer  # type: ignore
+
+# Compared settings: (format, quality); quality is ignored by PNG
+SETTINGS = [("jpg", 95), ("jpg", 85), ("jpg", 75), ("webp", 90), ("webp", 75), ("png", None)]
+
+
+# Functions
+def annotated_image(path, width: int, height: int, objects: int = 20, seed: int = 0):
+    """
+    Load the test image (or a synthetic one when missing) and draw random
+    detections on it, like an annotated API response.
+    """
+
+    if path and Path(path).exists():
+        image = cv2.imread(str(path))
+    else:
+        image = cv2.imdecode(np.frombuffer(synthetic_images(1, width, height, seed)[0], np.uint8), cv2.IMREAD_COLOR)
+
+    rng = np.random.default_rng(seed)
+    h, w = image.shape[:2]
+    top_left = rng.uniform([0, 0], [w * 0.9, h * 0.9], (objects, 2))
+    size = rng.uniform(20, max(21, min(w, h) * 0.1), (objects, 2))
+    detections = np.column_stack([
+                                  top_left,
+                                  top_left + size,
+                                  rng.uniform(0.3, 1.0, objects),
+                                  rng.integers(0, len(NAMES), objects),
+                                  ]).astype(np.float32)
+
+    return Renderer(NAMES).draw_detections(image, detections)
+
+
+def bench_setting(image, fmt: str, quality, max_side: int, repeats: int):
+    """
+    Downscale and encode an image ``repeats`` times.
+
+    Returns
+    -------
+    tuple of (float, int, tuple)
+        Median time (ms), encoded size (bytes) and output size (W, H).
+    """
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        frame, _ = downscale(image, max_side)
+        content = encode_image(frame, fmt, quality)
+        times.append(time.perf_counter() - start)
+
+    return float(np.median(times)) * 1000, len(content), (frame.shape[1], frame.shape[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Size and latency of the annotated image response by format, quality and max side.")
+    parser.add_argument("--image", default=str(TEST_IMAGE1), help="Input image (synthetic when missing).")
+    parser.add_argument("--size", type=int, nargs=2, default=[3840, 2160], metavar=("WIDTH", "HEIGHT"), help="Size of the synthetic image.")
+    parser.add_argument("--max-sides", type=int, nargs="+", default=[0, 1400, 700], help="Longer sides to compare (0: original).")
+    parser.add_argument("--bandwidth", type=float, nargs="+", default=[10.0, 100.0], help="Client bandwidths (Mbit/s) for the transfer time.")
+    parser.add_argument("--repeats", type=int, default=5, help="Encodes per setting (median).")
+    parser.add_argument("--output", default=None, help="Optional JSON file for the results.")
+    args = parser.parse_args()
+
+    image = annotated_image(args.image, *args.size)
+    print(f"Input: {image.shape[1]}x{image.shape[0]}")
+
+    transfer_columns = " | ".join(f"{f'total @{b:g} Mbit/s':>20}" for b in args.bandwidth)
+    print(f"{'format':>6} | {'quality':>7} | {'output':>9} | {'encode ms':>9} | {'KiB':>8} | {transfer_columns}")
+
+    rows = []
+    for max_side in args.max_sides:
+        for fmt, quality in SETTINGS:
+            encode_ms, size, (width, height) = bench_setting(image, fmt, quality, max_side, args.repeats)
+
+            # Total latency added by the response: encode, then transfer at each bandwidth
+            totals = {b: encode_ms + size * 8 / (b * 1e6) * 1000 for b in args.bandwidth}
+            rows.append({
+                         "format": fmt,
+                         "quality": quality,
+                         "max_side": max_side,
+                         "width": width,
+                         "height": height,
+                         "encode_ms": round(encode_ms, 2),
+                         "bytes": size,
+                         "total_ms": {f"{b:g}": round(t, 1) for b, t in totals.items()},
+                         })
+
+            transfer = " | ".join(f"{totals[b]:>17.1f} ms" for b in args.bandwidth)
+            print(f"{fmt:>6} | {quality if quality else '-':>7} | {f'{width}x{height}':>9} | {encode_ms:>9.1f} | {size / 1024:>8.1f} | {transfer}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2))
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
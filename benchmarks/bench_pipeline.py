@@ -0,0 +1,337 @@
+# Imports
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+# CPU benchmark: hide the GPUs before torch is imported
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import cv2
+import numpy as np
+import torch
+from ultralytics.utils import LOGGER
+from config.config import ROOT_DIR, INFERENCE, TEST_IMAGE1, TEST_IMAGE2, TEST_VIDEO, MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED
+from benchmarks.load_test import synthetic_images, synthetic_videos, git_commit
+
+sys.path.insert(0, str(INFERENCE))
+from inference import InferencePicture, InferenceVideo  # type: ignore
+from registry import ModelRegistry  # type: ignore
+from image_io import decode_image  # type: ignore
+
+# Committed reference results (--save-baseline / --compare)
+BASELINE = ROOT_DIR / "benchmarks" / "baseline_pipeline.json"
+
+# Synthetic inputs (width, height)
+IMAGE_SIZES = [(640, 480), (1280, 720), (1920, 1080), (3840, 2160)]
+VIDEO_SIZES = [(640, 480), (1280, 720), (1920, 1080)]
+
+# Ultralytics ``Results.speed`` keys (milliseconds per image) to stage names
+SPEED_STAGES = {"preprocess": "preprocess", "inference": "forward", "postprocess": "postprocess"}
+
+
+# Helper functions
+def _peak_rss_mb():
+    # VmHWM is the peak of this process only (ru_maxrss keeps the parent's peak across exec)
+    status = Path("/proc/self/status")
+    if status.exists():
+        peak_kib = next(int(line.split()[1]) for line in status.read_text().splitlines() if line.startswith("VmHWM:"))
+    else:
+        peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return round(peak_kib / 1024, 1)  # KiB to MiB
+
+
+def _bench_image(model, path, repeats: int, warmup: int):
+    """
+    Decode, predict, draw and JPG-encode an image ``warmup + repeats``
+    times; median time per stage over the measured repeats.
+    """
+
+    data = Path(path).read_bytes()
+    runs = []
+
+    for i in range(warmup + repeats):
+        stages = {}
+
+        start = time.perf_counter()
+        image = decode_image(data)
+        stages["decode"] = time.perf_counter() - start
+
+        result = InferencePicture.predict_batch(model, [image])[0]
+        for key, stage in SPEED_STAGES.items():
+            stages[stage] = result.speed[key] / 1000
+
+        start = time.perf_counter()
+        drawn = InferencePicture(weights_yolo=None, image_path=image, model=model).run(result=result)
+        stages["drawing"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cv2.imencode(".jpg", drawn)
+        stages["encode"] = time.perf_counter() - start
+
+        if i >= warmup:
+            runs.append(stages)
+
+    stage_ms = {stage: float(np.median([r[stage] for r in runs])) * 1000 for stage in runs[0]}
+    total = float(np.median([sum(r.values()) for r in runs]))
+
+    return {
+            "frames": 1,
+            "fps": round(1 / total, 2),
+            "stage_ms": {stage: round(ms, 2) for stage, ms in stage_ms.items()},
+            }
+
+
+def _bench_video(model, path, repeats: int, batch_size: int, pipelined: bool):
+    """
+    Process and re-encode a video ``repeats`` times; median throughput and
+    mean time per frame in each stage.
+    """
+
+    fps = []
+    totals = {}
+    counts = {}
+    frames = 0
+
+    def observe(stage, seconds):
+        totals[stage] = totals.get(stage, 0.0) + seconds
+        counts[stage] = counts.get(stage, 0) + 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(repeats):
+            cap = cv2.VideoCapture(str(path))
+            size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            rate = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            cap.release()
+
+            progress = {}
+            infer = InferenceVideo(
+                                   input_path=str(path),
+                                   model_path=None,
+                                   model=model,
+                                   writer=cv2.VideoWriter(str(Path(tmp) / "annotated.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), rate, size),
+                                   progress_callback=lambda done, total: progress.update(done=done),
+                                   pipelined=pipelined,
+                                   batch_size=batch_size,
+                                   stage_callback=observe,
+                                   )
+
+            start = time.perf_counter()
+            infer.run()
+            elapsed = time.perf_counter() - start
+
+            frames = progress.get("done", 0)
+            fps.append(frames / elapsed)
+
+    return {
+            "frames": frames,
+            "fps": round(float(np.median(fps)), 2),
+            "stage_ms": {stage: round(totals[stage] / counts[stage] * 1000, 2) for stage in totals},
+            }
+
+
+def _case_worker(case, weights, repeats, warmup, threads, batch_size, pipelined, queue):
+    LOGGER.setLevel(logging.WARNING)
+    if threads:
+        torch.set_num_threads(threads)
+
+    model = ModelRegistry(capacity=1).get(weights)
+
+    if case["kind"] == "image":
+        result = _bench_image(model, case["path"], repeats, warmup)
+    else:
+        result = _bench_video(model, case["path"], repeats, batch_size, pipelined)
+
+    queue.put({**result, "peak_rss_mb": _peak_rss_mb(), "weights_sha256": model.sha256})
+
+
+def _percent_change(baseline: float, current: float):
+    return (current - baseline) / baseline * 100 if baseline else 0.0
+
+
+# Functions
+def build_cases(directory, video_frames: int, seed: int = 0):
+    """
+    Bundled test media (when present) and synthetic inputs of several
+    sizes, written to ``directory``.
+
+    Returns
+    -------
+    list of dict
+        Cases with a ``name``, a ``kind`` (``"image"`` or ``"video"``) and
+        a ``path``.
+    """
+
+    cases = []
+
+    for name, path, kind in (("test_image1", TEST_IMAGE1, "image"), ("test_image2", TEST_IMAGE2, "image"), ("test_video", TEST_VIDEO, "video")):
+        if Path(path).exists():
+            cases.append({"name": f"{kind}/{name}", "kind": kind, "path": str(path)})
+        else:
+            print(f"Skipping {name}: {path} not found (see test/test.md).")
+
+    for width, height in IMAGE_SIZES:
+        path = Path(directory) / f"synthetic_{width}x{height}.jpg"
+        path.write_bytes(synthetic_images(1, width, height, seed)[0])
+        cases.append({"name": f"image/synthetic_{width}x{height}", "kind": "image", "path": str(path)})
+
+    for width, height in VIDEO_SIZES:
+        path = Path(directory) / f"synthetic_{width}x{height}.mp4"
+        path.write_bytes(synthetic_videos(1, width, height, video_frames, seed=seed)[0])
+        cases.append({"name": f"video/synthetic_{width}x{height}", "kind": "video", "path": str(path)})
+
+    return cases
+
+
+def run_case(case, weights, repeats: int, warmup: int, threads, batch_size: int, pipelined: bool):
+    """
+    Benchmark one case in a fresh process, so that its peak RSS is its own
+    and not the largest of the cases run before it.
+
+    Returns
+    -------
+    dict
+        Frames, frames/s, time per stage (ms per frame), peak RSS (MiB) and
+        SHA-256 of the weights.
+    """
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_case_worker, args=(case, str(weights), repeats, warmup, threads, batch_size, pipelined, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+
+    return result
+
+
+def compare(baseline, current, threshold: float, min_ms: float):
+    """
+    Compare a run with the baseline.
+
+    A case regresses when its frames/s drops, or its peak RSS or the time of
+    one of its stages grows, by more than ``threshold`` percent. Stages
+    faster than ``min_ms`` in both runs are ignored (timer noise).
+
+    Returns
+    -------
+    list of str
+        One line per regression.
+    """
+
+    regressions = []
+
+    for name, now in current["cases"].items():
+        before = baseline["cases"].get(name)
+        if before is None:
+            continue
+
+        change = -_percent_change(before["fps"], now["fps"])
+        if change > threshold:
+            regressions.append(f"{name}: frames/s {before['fps']} -> {now['fps']} (-{change:.1f}%)")
+
+        change = _percent_change(before["peak_rss_mb"], now["peak_rss_mb"])
+        if change > threshold:
+            regressions.append(f"{name}: peak RSS {before['peak_rss_mb']} -> {now['peak_rss_mb']} MiB (+{change:.1f}%)")
+
+        for stage, ms in now["stage_ms"].items():
+            reference = before["stage_ms"].get(stage)
+            if reference is None or max(reference, ms) < min_ms:
+                continue
+            change = _percent_change(reference, ms)
+            if change > threshold:
+                regressions.append(f"{name}: {stage} {reference} -> {ms} ms (+{change:.1f}%)")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the image and video pipelines, with a regression baseline.")
+    parser.add_argument("--weights", default=str(INFERENCE / MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED), help="YOLOv8 weights.")
+    parser.add_argument("--repeats", type=int, default=5, help="Measured runs per image (median) and per video.")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured runs per image.")
+    parser.add_argument("--video-frames", type=int, default=60, help="Frames per synthetic video.")
+    parser.add_argument("--video-repeats", type=int, default=1, help="Measured runs per video.")
+    parser.add_argument("--batch-size", type=int, default=4, help="Video frames per model call (VIDEO_BATCH_SIZE).")
+    parser.add_argument("--serial", action="store_true", help="Process videos without the decode/encode threads (VIDEO_PIPELINED=0).")
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads (default: torch default).")
+    parser.add_argument("--cases", nargs="+", default=None, help="Only run the cases whose name contains one of these strings.")
+    parser.add_argument("--baseline", default=str(BASELINE), help="Baseline file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Save this run as the baseline.")
+    parser.add_argument("--compare", action="store_true", help="Compare this run with the baseline; exit code 1 on regression.")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold, in percent.")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="Stages faster than this (ms) are not compared.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic inputs.")
+    parser.add_argument("--output", default=None, help="Results file (JSON). Defaults to runs/bench_pipeline/<date>.json.")
+    args = parser.parse_args()
+
+    results = {
+               "environment": {
+                               "git_commit": git_commit(),
+                               "python": platform.python_version(),
+                               "torch": torch.__version__,
+                               "platform": platform.platform(),
+                               "cpus": os.cpu_count(),
+                               "threads": args.threads or torch.get_num_threads(),
+                               },
+               "settings": {
+                            "repeats": args.repeats,
+                            "video_repeats": args.video_repeats,
+                            "video_frames": args.video_frames,
+                            "batch_size": args.batch_size,
+                            "pipelined": not args.serial,
+                            },
+               "cases": {},
+               }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = build_cases(tmp, args.video_frames, args.seed)
+        if args.cases:
+            cases = [c for c in cases if any(pattern in c["name"] for pattern in args.cases)]
+
+        print(f"{'case':<28} | {'frames':>6} | {'frames/s':>8} | {'peak RSS MiB':>12} | stages (ms per frame)")
+
+        for case in cases:
+            repeats = args.repeats if case["kind"] == "image" else args.video_repeats
+            result = run_case(case, args.weights, repeats, args.warmup, args.threads, args.batch_size, not args.serial)
+            results["environment"]["weights_sha256"] = result.pop("weights_sha256")
+            results["cases"][case["name"]] = result
+
+            stages = ", ".join(f"{stage} {ms:.1f}" for stage, ms in result["stage_ms"].items())
+            print(f"{case['name']:<28} | {result['frames']:>6} | {result['fps']:>8.2f} | {result['peak_rss_mb']:>12.1f} | {stages}")
+
+    output = Path(args.output) if args.output else ROOT_DIR / "runs" / "bench_pipeline" / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results saved to {output}")
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.baseline).read_text())
+
+        for key in ("cpus", "threads", "weights_sha256"):
+            if baseline["environment"].get(key) != results["environment"].get(key):
+                print(f"Warning: {key} differs from the baseline ({baseline['environment'].get(key)} vs {results['environment'].get(key)}).")
+
+        regressions = compare(baseline, results, args.threshold, args.min_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"{len(regressions)} regression(s) above {args.threshold:g}% against {args.baseline}.")
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
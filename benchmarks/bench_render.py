@@ -0,0 +1,127 @@
+# Imports
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+from config.config import INFERENCE
+from benchmarks.bench_trackers import synthetic_scene
+
+sys.path.insert(0, str(INFERENCE))
+from render import Renderer, LabelAtlas, CLASS_COLORS  # type: ignore
+
+NAMES = {0: "can", 1: "foam", 2: "plastic", 3: "plastic bottle", 4: "unknow"}
+
+
+# Functions
+def legacy_draw(frame, tracked, names):
+    """
+    Previous drawing loop of ``InferenceVideo``: one ``cv2.rectangle`` and
+    one ``cv2.putText`` per tracked object.
+    """
+
+    for _, track_id, x1, y1, x2, y2, conf, class_id in tracked:
+        label = names[int(class_id)]
+        color = CLASS_COLORS.get(label, (255, 255, 255))
+        x1, y1, x2, y2, track_id = int(x1), int(y1), int(x2), int(y2), int(track_id)
+
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(
+                    frame,
+                    f"ID {track_id} | {label} {conf:.2f}",
+                    (x1, max(0, y1 - 8)),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.55,
+                    color,
+                    2,
+                    cv2.LINE_AA,
+                    )
+
+
+def tracked_rows(scene):
+    """
+    Tracked objects of a synthetic scene: one (objects, 8) array
+    ``[frame, track_id, x1, y1, x2, y2, conf, class_id]`` per frame, with
+    confidences rounded like a detector's (a few distinct values per track).
+    """
+
+    rows = []
+    for frame_idx, detections in enumerate(scene):
+        ids = np.arange(len(detections), dtype=np.float32)
+        conf = np.round(detections[:, 4], 2)
+        rows.append(np.column_stack([np.full(len(detections), frame_idx), ids, detections[:, :4], conf, detections[:, 5]]).astype(np.float32))
+
+    return rows
+
+
+def bench(draw, frames, background):
+    """
+    Draw every frame of a scene on a copy of the background.
+
+    Returns
+    -------
+    tuple of (float, np.ndarray)
+        Mean drawing time per frame (ms, the copy excluded) and the last
+        frame drawn.
+    """
+
+    elapsed = 0.0
+    for tracked in frames:
+        frame = background.copy()
+        start = time.perf_counter()
+        draw(frame, tracked)
+        elapsed += time.perf_counter() - start
+
+    return elapsed / len(frames) * 1000, frame
+
+
+def bench_plot(frames, background):
+    """
+    Image path: ``Results.plot()`` (copy of the image and Ultralytics
+    annotator) against ``Renderer.draw_detections`` in place.
+    """
+
+    detections = [np.column_stack([t[:, 2:6], t[:, 6], t[:, 7]]) for t in frames]
+
+    start = time.perf_counter()
+    for d in detections:
+        Results(orig_img=background, path="", names=NAMES, boxes=torch.from_numpy(d)).plot()
+    plot_ms = (time.perf_counter() - start) / len(frames) * 1000
+
+    renderer = Renderer(NAMES, atlas=LabelAtlas())
+    render_ms, _ = bench(renderer.draw_detections, detections, background)
+
+    return plot_ms, render_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Annotation drawing: per-object cv2 calls against the cached label renderer.")
+    parser.add_argument("--objects", type=int, nargs="+", default=[10, 50, 200], help="Objects per frame.")
+    parser.add_argument("--frames", type=int, default=100, help="Frames per scene.")
+    parser.add_argument("--size", type=int, nargs=2, default=[1920, 1080], metavar=("WIDTH", "HEIGHT"), help="Frame size.")
+    args = parser.parse_args()
+
+    width, height = args.size
+    background = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+    print(f"{'objects':>7} | {'loop ms':>8} | {'renderer ms':>11} | {'speedup':>7} | {'px differ':>9} | {'plot() ms':>9} | {'in place ms':>11}")
+
+    for objects in args.objects:
+        frames = tracked_rows(synthetic_scene(objects, args.frames, width, height))
+
+        legacy_ms, legacy_frame = bench(lambda f, t: legacy_draw(f, t, NAMES), frames, background)
+
+        # Fresh atlas: the first frames pay for the label rasterization
+        renderer = Renderer(NAMES, atlas=LabelAtlas())
+        render_ms, render_frame = bench(renderer.draw_tracks, frames, background)
+
+        differ = np.any(legacy_frame != render_frame, axis=2).mean() * 100
+        plot_ms, in_place_ms = bench_plot(frames, background)
+
+        print(f"{objects:>7} | {legacy_ms:>8.2f} | {render_ms:>11.2f} | {legacy_ms / render_ms:>6.1f}x | {differ:>8.2f}% | {plot_ms:>9.2f} | {in_place_ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Imports
+import sys
+import time
+import argparse
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+from config.config import INFERENCE
+
+sys.path.insert(0, str(INFERENCE))
+from inference import InferenceVideo  # type: ignore
+
+
+# Classes
+class _Names():
+    """
+    Stand-in for the model: the tracking stage only reads class names.
+    """
+
+    names = {0: "can", 1: "foam", 2: "plastic", 3: "plastic bottle", 4: "unknow"}
+
+
+# Functions
+def synthetic_scene(objects: int, frames: int, width: int = 1920, height: int = 1080, seed: int = 0):
+    """
+    Generate detections of objects drifting at constant speed, with box
+    jitter, bouncing on the frame borders.
+
+    Returns
+    -------
+    list of np.ndarray
+        One (objects, 6) array ``[x1, y1, x2, y2, conf, class_id]`` per frame.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    size = rng.uniform(20, 60, (objects, 2))
+    position = rng.uniform([0, 0], [width, height], (objects, 2)) - size / 2
+    velocity = rng.uniform(-3, 3, (objects, 2))
+    classes = rng.integers(0, 5, objects)
+
+    scene = []
+    for _ in range(frames):
+        position = position + velocity
+        bounce = (position < 0) | (position + size > [width, height])
+        velocity[bounce] *= -1
+
+        jitter = rng.normal(0, 1.0, (objects, 2))
+        top_left = position + jitter
+        scene.append(np.column_stack([
+                                      top_left,
+                                      top_left + size,
+                                      rng.uniform(0.4, 1.0, objects),
+                                      classes,
+                                      ]).astype(np.float32))
+
+    return scene
+
+
+def bench_tracker(tracker: str, scene, image):
+    """
+    Run the tracking stage of ``InferenceVideo`` (detector output to tracked
+    rows) over a synthetic scene.
+
+    Returns
+    -------
+    tuple of (float, int)
+        Mean milliseconds per frame and number of distinct track IDs.
+    """
+
+    infer = InferenceVideo(
+                           input_path="",
+                           model_path=None,
+                           model=_Names(),
+                           output="detections",
+                           tracker=tracker,
+                           )
+
+    results = [Results(image, path="", names=_Names.names, boxes=torch.from_numpy(dets)) for dets in scene]
+
+    start = time.perf_counter()
+    for frame_idx, result in enumerate(results):
+        infer._track(frame_idx, infer._to_detections(result))
+    elapsed = time.perf_counter() - start
+
+    tracks = np.concatenate(infer._rows)
+
+    return 1000 * elapsed / len(scene), len(np.unique(tracks[:, 1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tracking stage cost: Norfair against the vectorized ArrayTracker.")
+    parser.add_argument("--objects", type=int, nargs="+", default=[10, 100, 1000], help="Objects per frame.")
+    parser.add_argument("--frames", type=int, default=100, help="Frames per scene.")
+    args = parser.parse_args()
+
+    image = np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+    print(f"{'objects':>7} | {'tracker':>7} | {'ms/frame':>9} | {'frames/s':>9} | {'track IDs':>9}")
+
+    for objects in args.objects:
+        scene = synthetic_scene(objects, args.frames)
+
+        for tracker in ("norfair", "array"):
+            ms, ids = bench_tracker(tracker, scene, image)
+            print(f"{objects:>7} | {tracker:>7} | {ms:>9.2f} | {1000 / ms:>9.1f} | {ids:>9}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+# Imports
+import os
+import sys
+import time
+import logging
+import argparse
+
+# CPU benchmark: hide the GPUs before torch is imported
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import torch
+from ultralytics.utils import LOGGER
+from config.config import INFERENCE, TEST_VIDEO, MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED
+
+sys.path.insert(0, str(INFERENCE))
+from inference import InferenceVideo  # type: ignore
+from registry import ModelRegistry  # type: ignore
+
+
+# Functions
+def bench_batch_size(model, video, batch_size: int, repeats: int):
+    """
+    Process a video with a given frame batch size and measure throughput.
+
+    Parameters
+    ----------
+    model : registry.SharedModel
+        Loaded (and warmed up) model.
+    video : str or pathlib.Path
+        Input video.
+    batch_size : int
+        Number of frames per model call.
+    repeats : int
+        Number of runs; the best one is reported.
+
+    Returns
+    -------
+    tuple of (int, float)
+        Number of frames and best throughput in frames per second.
+    """
+
+    best = 0.0
+    frames = 0
+
+    for _ in range(repeats):
+        progress = {}
+        infer = InferenceVideo(
+                               input_path=str(video),
+                               model_path=None,
+                               model=model,
+                               output="detections",
+                               progress_callback=lambda done, total: progress.update(done=done),
+                               batch_size=batch_size,
+                               )
+
+        start = time.perf_counter()
+        infer.run()
+        elapsed = time.perf_counter() - start
+
+        frames = progress.get("done", 0)
+        best = max(best, frames / elapsed)
+
+    return frames, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Video inference throughput (frames/s) against frame batch size, on CPU.")
+    parser.add_argument("--video", default=str(TEST_VIDEO), help="Input video (default: TEST_VIDEO).")
+    parser.add_argument("--weights", default=str(INFERENCE / MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED), help="YOLOv8 weights.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Batch sizes to compare.")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per batch size (best is reported).")
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads (default: torch default).")
+    args = parser.parse_args()
+
+    # Per-frame predictor logs would be part of the measurement
+    LOGGER.setLevel(logging.WARNING)
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    model = ModelRegistry(capacity=1).get(args.weights)
+
+    print(f"Video: {args.video}")
+    print(f"torch threads: {torch.get_num_threads()}")
+    print(f"{'batch':>5} | {'frames':>6} | {'frames/s':>8} | {'speedup':>7}")
+
+    baseline = None
+    for batch_size in args.batch_sizes:
+        frames, fps = bench_batch_size(model, args.video, batch_size, args.repeats)
+        baseline = baseline or fps
+        print(f"{batch_size:>5} | {frames:>6} | {fps:>8.2f} | {fps / baseline:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,183 @@
+# Imports
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+import cv2
+from config.config import INFERENCE, TEST_VIDEO
+from benchmarks.load_test import synthetic_videos
+
+sys.path.insert(0, str(INFERENCE))
+from video_io import scaled_size, FFmpegPipeReader, FFmpegPipeWriter  # type: ignore
+
+
+# Functions
+def input_video(path, tmp: Path, width: int, height: int, frames: int):
+    """
+    Return the test video, or a synthetic one when missing. The synthetic
+    video is transcoded to H.264 (like camera footage), so that decoding is
+    not measured on the cheaper MPEG-4 Part 2 codec.
+    """
+
+    if path and Path(path).exists():
+        return Path(path)
+
+    raw = tmp / "synthetic_mp4v.mp4"
+    raw.write_bytes(synthetic_videos(1, width, height, frames)[0])
+
+    video = tmp / "synthetic.mp4"
+    reader = FFmpegPipeReader(raw)
+    writer = FFmpegPipeWriter(video, width, height, reader.get(cv2.CAP_PROP_FPS))
+    while True:
+        ok, frame = reader.read()
+        if not ok:
+            break
+        writer.write(frame)
+    reader.release()
+    writer.release()
+
+    return video
+
+
+def bench_decode(open_reader, max_side: int = 0, resize: bool = False):
+    """
+    Read every frame of a video; with ``resize``, frames are downscaled to
+    ``max_side`` after decoding (what the OpenCV path would have to do).
+
+    Returns
+    -------
+    tuple of (float, int, tuple)
+        Frames per second, number of frames and frame size (W, H).
+    """
+
+    start = time.perf_counter()
+    reader = open_reader()
+    frames, size = 0, (0, 0)
+
+    while True:
+        ok, frame = reader.read()
+        if not ok:
+            break
+        if resize:
+            width, height = scaled_size(frame.shape[1], frame.shape[0], max_side)
+            if (width, height) != (frame.shape[1], frame.shape[0]):
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        frames += 1
+        size = (frame.shape[1], frame.shape[0])
+
+    reader.release()
+
+    return frames / (time.perf_counter() - start), frames, size
+
+
+def bench_encode(open_writer, frames, path: Path):
+    """
+    Write frames with a writer and measure the output file.
+
+    Returns
+    -------
+    tuple of (float, int)
+        Frames per second (until the file is finalized) and file size
+        (bytes).
+    """
+
+    start = time.perf_counter()
+    writer = open_writer()
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+    return len(frames) / (time.perf_counter() - start), path.stat().st_size
+
+
+def bench_pipeline(video: Path, model_path, backend: str, max_side: int):
+    """
+    End-to-end ``InferenceVideo`` run (decode, detection, tracking, drawing
+    and encoding), in frames per second.
+    """
+
+    from inference import InferenceVideo  # type: ignore
+
+    frames = int(cv2.VideoCapture(str(video)).get(cv2.CAP_PROP_FRAME_COUNT))
+    infer = InferenceVideo(str(video), model_path, backend=backend, decode_max_side=max_side or None, pipelined=True)
+
+    start = time.perf_counter()
+    output = infer.run()
+    elapsed = time.perf_counter() - start
+
+    size = Path(output).stat().st_size
+    Path(output).unlink()
+
+    return frames / elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Video decode and encode throughput: OpenCV against ffmpeg pipes.")
+    parser.add_argument("--video", default=str(TEST_VIDEO), help="Input video (synthetic H.264 video when missing).")
+    parser.add_argument("--size", type=int, nargs=2, default=[1920, 1080], metavar=("WIDTH", "HEIGHT"), help="Size of the synthetic video.")
+    parser.add_argument("--frames", type=int, default=150, help="Frames of the synthetic video, and frames encoded.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 0], help="ffmpeg decoder threads to compare (0: chosen by ffmpeg).")
+    parser.add_argument("--max-sides", type=int, nargs="+", default=[0, 960], help="Decoded longer sides to compare (0: original).")
+    parser.add_argument("--model", default=None, help="Model weights for an end-to-end InferenceVideo run per backend (skipped when not given).")
+    parser.add_argument("--output", default=None, help="Optional JSON file for the results.")
+    args = parser.parse_args()
+
+    results = {"decode": [], "encode": [], "pipeline": []}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        video = input_video(args.video, tmp, *args.size, args.frames)
+
+        # Decoding
+        print(f"{'decoder':>16} | {'threads':>7} | {'output':>9} | {'frames':>6} | {'fps':>7}")
+        for max_side in args.max_sides:
+            cases = [("opencv", "-", lambda: cv2.VideoCapture(str(video)), True)]
+            cases += [("ffmpeg", t, lambda t=t: FFmpegPipeReader(video, threads=t, max_side=max_side or None), False) for t in args.threads]
+
+            for name, threads, open_reader, resize in cases:
+                label = f"{name} + resize" if resize and max_side else name
+                fps, frames, (width, height) = bench_decode(open_reader, max_side, resize)
+                results["decode"].append({"decoder": label, "threads": threads, "width": width, "height": height, "frames": frames, "fps": round(fps, 1)})
+                print(f"{label:>16} | {threads:>7} | {f'{width}x{height}':>9} | {frames:>6} | {fps:>7.1f}")
+
+        # Encoding, on the decoded frames kept in memory
+        reader = FFmpegPipeReader(video)
+        fps_in = reader.get(cv2.CAP_PROP_FPS)
+        frames = []
+        while len(frames) < args.frames:
+            ok, frame = reader.read()
+            if not ok:
+                break
+            frames.append(frame)
+        reader.release()
+
+        height, width = frames[0].shape[:2]
+        mp4v_path, h264_path = tmp / "mp4v.mp4", tmp / "h264.mp4"
+        writers = [
+                   ("opencv mp4v", mp4v_path, lambda: cv2.VideoWriter(str(mp4v_path), cv2.VideoWriter_fourcc(*"mp4v"), fps_in, (width, height))),  # type: ignore
+                   ("ffmpeg h264", h264_path, lambda: FFmpegPipeWriter(h264_path, width, height, fps_in)),
+                   ]
+
+        print(f"\n{'encoder':>16} | {'frames':>6} | {'fps':>7} | {'KiB':>9}")
+        for name, path, open_writer in writers:
+            fps, size = bench_encode(open_writer, frames, path)
+            results["encode"].append({"encoder": name, "frames": len(frames), "fps": round(fps, 1), "bytes": size})
+            print(f"{name:>16} | {len(frames):>6} | {fps:>7.1f} | {size / 1024:>9.1f}")
+
+        # End-to-end
+        if args.model:
+            print(f"\n{'backend':>16} | {'max side':>8} | {'fps':>7} | {'KiB':>9}")
+            for backend, max_side in [("opencv", 0)] + [("ffmpeg", m) for m in args.max_sides]:
+                fps, size = bench_pipeline(video, args.model, backend, max_side)
+                results["pipeline"].append({"backend": backend, "max_side": max_side, "fps": round(fps, 2), "bytes": size})
+                print(f"{backend:>16} | {max_side:>8} | {fps:>7.2f} | {size / 1024:>9.1f}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Imports
+import os
+import sys
+import time
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+import requests
+from config.config import INFERENCE, TEST_IMAGE1, MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED
+
+sys.path.insert(0, str(INFERENCE))
+from resources import process_memory  # type: ignore
+
+
+# Helper functions
+def _children(pid: int):
+    """
+    PIDs of the direct children of a process (the gunicorn workers).
+    """
+
+    path = Path(f"/proc/{pid}/task/{pid}/children")
+
+    return [int(p) for p in path.read_text().split()] if path.exists() else []
+
+
+def _wait_startup(proc, workers: int, timeout: float):
+    """
+    Wait until every worker has logged the end of its lifespan startup.
+    """
+
+    ready = threading.Event()
+    started = []
+
+    def read_log():
+        for line in proc.stderr:
+            if "Application startup complete" in line:
+                started.append(line)
+                if len(started) == workers:
+                    ready.set()
+
+    threading.Thread(target=read_log, daemon=True).start()
+
+    if not ready.wait(timeout):
+        proc.kill()
+        raise TimeoutError(f"{len(started)}/{workers} workers started after {timeout:.0f} s.")
+
+
+# Functions
+def measure(workers: int, preload: bool, weights, image, port: int, requests_per_worker: int, timeout: float = 300.0):
+    """
+    Start the API under gunicorn, send a few inference requests and read the
+    memory of every process.
+
+    Returns
+    -------
+    dict
+        Per-worker memory rows, master memory and startup time.
+    """
+
+    env = {
+           **os.environ,
+           "WEB_WORKERS": str(workers),
+           "WEB_PRELOAD": "1" if preload else "0",
+           "MODEL_PATH": str(weights),
+           "RESULT_CACHE_MB": "0",  # every request runs the model
+           }
+    command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", "app:app"]
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=INFERENCE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+    try:
+        _wait_startup(proc, workers, timeout)
+        startup = time.perf_counter() - start
+
+        data = Path(image).read_bytes()
+        for _ in range(workers * requests_per_worker):
+            response = requests.post(
+                                     f"http://127.0.0.1:{port}/predict/image?output=json",
+                                     files={"file": (Path(image).name, data)},
+                                     timeout=60,
+                                     )
+            response.raise_for_status()
+
+        return {
+                "startup_s": startup,
+                "master": process_memory(proc.pid),
+                "workers": [process_memory(pid) for pid in _children(proc.pid)],
+                }
+
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory of the API workers with and without preloading the model before fork.")
+    parser.add_argument("--workers", type=int, default=4, help="Gunicorn worker processes.")
+    parser.add_argument("--weights", default=str(INFERENCE / MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED), help="Model weights.")
+    parser.add_argument("--image", default=str(TEST_IMAGE1), help="Image sent to the API.")
+    parser.add_argument("--requests-per-worker", type=int, default=4, help="Inference requests per worker before measuring.")
+    parser.add_argument("--port", type=int, default=8765, help="Local port.")
+    args = parser.parse_args()
+
+    print(f"{'mode':>10} | {'startup s':>9} | {'RSS/worker':>10} | {'PSS/worker':>10} | {'shared/worker':>13} | {'total RSS':>9} | {'total PSS':>9}")
+
+    for preload in (False, True):
+        result = measure(args.workers, preload, args.weights, args.image, args.port, args.requests_per_worker)
+
+        rows = result["workers"]
+        processes = rows + [result["master"]]
+        total_rss = sum(r["rss_mb"] for r in processes)
+        total_pss = sum(r["pss_mb"] for r in processes)
+
+        print(
+              f"{'preload' if preload else 'no preload':>10} | "
+              f"{result['startup_s']:>9.1f} | "
+              f"{sum(r['rss_mb'] for r in rows) / len(rows):>10.1f} | "
+              f"{sum(r['pss_mb'] for r in rows) / len(rows):>10.1f} | "
+              f"{sum(r['shared_mb'] for r in rows) / len(rows):>13.1f} | "
+              f"{total_rss:>9.1f} | "
+              f"{total_pss:>9.1f}"
+              )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# Imports
+import json
+import time
+import argparse
+import platform
+import tempfile
+import threading
+from pathlib import Path
+import cv2
+import numpy as np
+from websockets.sync.client import connect
+from websockets.exceptions import ConnectionClosed
+from config.config import ROOT_DIR, INFERENCE, TEST_VIDEO, MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED
+from benchmarks.load_test import synthetic_videos, serve, git_commit, _percentiles
+
+
+# Functions
+def load_frames(path, size, frames: int, quality: int, max_side: int = 0):
+    """
+    Read the source video (a synthetic one when missing) and encode its
+    frames as JPEG, like a camera sending a stream.
+
+    Returns
+    -------
+    tuple of (list of bytes, float)
+        Encoded frames and the frame rate of the video.
+    """
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not (path and Path(path).exists()):
+            path = Path(tmp) / "synthetic.mp4"
+            path.write_bytes(synthetic_videos(1, *size, frames)[0])
+
+        cap = cv2.VideoCapture(str(path))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+
+        encoded = []
+        while len(encoded) < frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if max_side and max(frame.shape[:2]) > max_side:
+                scale = max_side / max(frame.shape[:2])
+                frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            encoded.append(cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes())
+        cap.release()
+
+    return encoded, fps
+
+
+def stream(url: str, frames, fps: float, duration: float, grace: float = 5.0):
+    """
+    Send the frames (looped) at ``fps`` for ``duration`` seconds while
+    receiving the results on the same connection.
+
+    Frames are sent on schedule whether or not the previous results came
+    back, like a camera. ``fps=0`` sends as fast as possible.
+
+    Returns
+    -------
+    tuple of (dict, list of dict, float)
+        Send time of every frame by sequence number, the received messages
+        (with their receive time) and the streaming time in seconds.
+    """
+
+    sent = {}
+    messages = []
+    done = threading.Event()
+
+    with connect(url, max_size=None) as ws:
+
+        def sender():
+            start = time.perf_counter()
+            seq = 0
+            while time.perf_counter() - start < duration:
+                if fps:
+                    delay = start + seq / fps - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                sent[seq] = time.perf_counter()
+                ws.send(frames[seq % len(frames)])
+                seq += 1
+            done.set()
+
+        thread = threading.Thread(target=sender, daemon=True)
+        start = time.perf_counter()
+        thread.start()
+
+        # Receive until the last frame sent is answered (the latest frame is never dropped)
+        try:
+            while True:
+                timeout = grace if done.is_set() else duration + grace
+                message = json.loads(ws.recv(timeout=timeout))
+                message["received_at"] = time.perf_counter()
+                messages.append(message)
+                if done.is_set() and message["seq"] == len(sent) - 1:
+                    break
+        except TimeoutError:
+            pass
+
+        elapsed = time.perf_counter() - start
+        thread.join()
+
+    return sent, messages, elapsed
+
+
+def summarize(sent, messages, elapsed: float):
+    """
+    Frames sent, processed, dropped and failed, achieved fps, and
+    end-to-end (client) and server latency percentiles.
+    """
+
+    processed = [m for m in messages if m["type"] == "detections"]
+    failed = [m for m in messages if m["type"] == "error"]
+    latency = [m["received_at"] - sent[m["seq"]] for m in processed]
+
+    # Age of the displayed result: time since the frame it belongs to was captured
+    staleness = []
+    for previous, current in zip(processed, processed[1:]):
+        staleness.append(current["received_at"] - sent[previous["seq"]])
+
+    return {
+            "frames_sent": len(sent),
+            "frames_processed": len(processed),
+            "frames_failed": len(failed),
+            "frames_dropped": len(sent) - len(processed) - len(failed),
+            "drop_rate": round(1 - (len(processed) + len(failed)) / len(sent), 4) if sent else None,
+            "duration_s": round(elapsed, 2),
+            "input_fps": round(len(sent) / elapsed, 2) if elapsed > 0 else None,
+            "achieved_fps": round(len(processed) / elapsed, 2) if elapsed > 0 else None,
+            "latency_ms": _percentiles(latency),
+            "server_latency_ms": _percentiles([m["latency_ms"] / 1000 for m in processed]),
+            "max_staleness_ms": round(max(staleness) * 1000, 1) if staleness else None,
+            "server_stats": messages[-1]["stats"] if messages else None,
+            "objects_per_frame": round(float(np.mean([len(m["objects"]) for m in processed])), 2) if processed else None,
+            "track_ids": len({o["id"] for m in processed for o in m["objects"]}),
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Camera stand-in for the /live WebSocket endpoint: streams video frames at a fixed rate and measures latency and drops.")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/live", help="WebSocket URL of a running API (ignored with --serve).")
+    parser.add_argument("--serve", action="store_true", help="Start the API locally under gunicorn for the run.")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the API started with --serve.")
+    parser.add_argument("--weights", default=str(INFERENCE / MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED), help="--serve: model weights.")
+    parser.add_argument("--video", default=str(TEST_VIDEO), help="Source video (synthetic when missing).")
+    parser.add_argument("--size", type=int, nargs=2, default=[1280, 720], metavar=("WIDTH", "HEIGHT"), help="Size of the synthetic video.")
+    parser.add_argument("--frames", type=int, default=150, help="Frames read from the source (looped while streaming).")
+    parser.add_argument("--max-side", type=int, default=0, help="Longer side of the frames sent (0: original).")
+    parser.add_argument("--quality", type=int, default=85, help="JPEG quality of the frames sent.")
+    parser.add_argument("--fps", type=float, default=None, help="Send rate (frames/s). Defaults to the video frame rate; 0 sends as fast as possible.")
+    parser.add_argument("--duration", type=float, default=20.0, help="Streaming time in seconds.")
+    parser.add_argument("--query", default="", help="Extra query string, e.g. 'reduced=true'.")
+    parser.add_argument("--output", default=None, help="Results file (JSON). Defaults to runs/live_client/<date>-<fps>fps.json.")
+    args = parser.parse_args()
+
+    frames, video_fps = load_frames(args.video, args.size, args.frames, args.quality, args.max_side)
+    fps = video_fps if args.fps is None else args.fps
+    print(f"Source: {len(frames)} frames, {np.mean([len(f) for f in frames]) / 1024:.0f} KiB per frame, sent at {fps:g} fps" if fps else f"Source: {len(frames)} frames, sent as fast as possible")
+
+    def run(url):
+        url = url + (f"?{args.query}" if args.query else "")
+        return summarize(*stream(url, frames, fps, args.duration))
+
+    try:
+        if args.serve:
+            with serve(args.port, 1, args.weights, cache=False) as base_url:
+                summary = run(base_url.replace("http://", "ws://") + "/live")
+        else:
+            summary = run(args.url)
+    except ConnectionClosed as e:
+        raise SystemExit(f"Connection closed by the server: {e}")
+
+    report = {
+              "git_commit": git_commit(),
+              "platform": platform.platform(),
+              "config": vars(args),
+              "send_fps": fps,
+              "summary": summary,
+              }
+
+    print(json.dumps(summary, indent=2))
+
+    output = Path(args.output) if args.output else ROOT_DIR / "runs" / "live_client" / f"{time.strftime('%Y%m%d-%H%M%S')}-{fps:g}fps.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+# Imports
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from contextlib import contextmanager
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+import requests
+from config.config import ROOT_DIR, INFERENCE, MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED
+
+# Endpoints under test: path and media type of the uploaded file
+ENDPOINTS = {
+             "image": ("/predict/image", ".jpg", "image/jpeg"),
+             "video": ("/predict/video", ".mp4", "video/mp4"),
+             }
+
+
+# Helper functions
+def _synthetic_frame(rng, width: int, height: int, objects):
+    """
+    Sea-like background (vertical gradient and noise) with floating objects
+    drawn as filled ellipses, so the model has something to look at.
+    """
+
+    gradient = np.linspace(0.6, 1.0, height, dtype=np.float32)[:, None, None]
+    frame = (np.array([120, 80, 30], np.float32) * gradient).repeat(width, axis=1)
+    frame += rng.normal(0, 12, frame.shape)
+    frame = np.clip(frame, 0, 255).astype(np.uint8)
+
+    for x, y, w, h, color in objects:
+        cv2.ellipse(frame, (int(x), int(y)), (int(w), int(h)), 0, 0, 360, color, -1)
+
+    return frame
+
+
+def _random_objects(rng, width: int, height: int, count: int):
+    return [
+            (
+             rng.uniform(0, width),
+             rng.uniform(0, height),
+             rng.uniform(5, 40),
+             rng.uniform(5, 25),
+             tuple(int(c) for c in rng.integers(0, 256, 3)),
+             )
+            for _ in range(count)
+            ]
+
+
+def _percentiles(values):
+    if not values:
+        return None
+
+    values = np.asarray(values) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+
+    return {
+            "mean": round(float(values.mean()), 1),
+            "p50": round(float(p50), 1),
+            "p95": round(float(p95), 1),
+            "p99": round(float(p99), 1),
+            "max": round(float(values.max()), 1),
+            }
+
+
+def _server_timing(header: str):
+    """
+    Parse a ``Server-Timing`` header into ``{stage: milliseconds}``.
+    """
+
+    stages = {}
+    for metric in filter(None, (m.strip() for m in header.split(","))):
+        name, *params = metric.split(";")
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "dur":
+                stages[name.strip()] = float(value)
+
+    return stages
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+                              ["git", "rev-parse", "--short", "HEAD"],
+                              cwd=ROOT_DIR,
+                              capture_output=True,
+                              text=True,
+                              check=True,
+                              ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Functions
+def synthetic_images(count: int, width: int, height: int, seed: int = 0):
+    """
+    Generate distinct JPEG images (distinct bytes, so the API result cache
+    does not answer them).
+
+    Returns
+    -------
+    list of bytes
+        Encoded images.
+    """
+
+    rng = np.random.default_rng(seed)
+    images = []
+
+    for _ in range(count):
+        frame = _synthetic_frame(rng, width, height, _random_objects(rng, width, height, int(rng.integers(1, 8))))
+        images.append(cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes())
+
+    return images
+
+
+def synthetic_videos(count: int, width: int, height: int, frames: int, fps: float = 25.0, seed: int = 0):
+    """
+    Generate short MP4 videos of objects drifting on a synthetic sea.
+
+    Returns
+    -------
+    list of bytes
+        Encoded videos.
+    """
+
+    rng = np.random.default_rng(seed)
+    videos = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(count):
+            path = Path(tmp) / f"video_{i}.mp4"
+            writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+
+            objects = _random_objects(rng, width, height, int(rng.integers(1, 8)))
+            speeds = rng.uniform(-3, 3, (len(objects), 2))
+            for t in range(frames):
+                moved = [(x + t * dx, y + t * dy, w, h, color) for (x, y, w, h, color), (dx, dy) in zip(objects, speeds)]
+                writer.write(_synthetic_frame(rng, width, height, moved))
+
+            writer.release()
+            videos.append(path.read_bytes())
+
+    return videos
+
+
+def send(session, url: str, filename: str, payload: bytes, media_type: str, timeout: float, scheduled=None):
+    """
+    Send one upload and time it.
+
+    The latency starts at ``scheduled`` when given (open loop: the intended
+    send time, so the time spent waiting for a free client slot is counted
+    and a slow server is not hidden by a late client).
+
+    Returns
+    -------
+    dict
+        Start, end, HTTP status (None on a transport error), error, cache
+        status and Server-Timing stages.
+    """
+
+    start = time.perf_counter() if scheduled is None else scheduled
+    record = {"start": start, "status": None, "error": None, "cache": None, "timing": {}}
+
+    try:
+        response = session.post(url, files={"file": (filename, payload, media_type)}, timeout=timeout)
+        response.content  # read the whole (possibly streamed) body
+        record["status"] = response.status_code
+        record["cache"] = response.headers.get("X-Cache")
+        record["timing"] = _server_timing(response.headers.get("Server-Timing", ""))
+        if response.status_code >= 400:
+            record["error"] = response.text[:200]
+
+    except requests.RequestException as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+
+    record["end"] = time.perf_counter()
+
+    return record
+
+
+def closed_loop(url: str, payloads, filename: str, media_type: str, concurrency: int, duration: float, total, timeout: float):
+    """
+    Closed loop: ``concurrency`` clients each send a request as soon as
+    their previous one completed, for ``duration`` seconds or ``total``
+    requests.
+    """
+
+    records = []
+    issued = iter(range(total if total else sys.maxsize))
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        with requests.Session() as session:
+            while time.perf_counter() < deadline:
+                with lock:
+                    i = next(issued, None)
+                if i is None:
+                    return
+                records.append(send(session, url, filename, payloads[i % len(payloads)], media_type, timeout))
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return records
+
+
+def open_loop(url: str, payloads, filename: str, media_type: str, rate: float, duration: float, total, max_in_flight: int, arrival: str, timeout: float, seed: int = 0):
+    """
+    Open loop: requests arrive at ``rate`` per second (Poisson or uniform
+    arrivals) whatever the response times, with at most ``max_in_flight``
+    requests sent at the same time.
+    """
+
+    rng = np.random.default_rng(seed)
+    sessions = threading.local()
+
+    def task(i, scheduled):
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        return send(sessions.session, url, filename, payloads[i % len(payloads)], media_type, timeout, scheduled)
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        begin = time.perf_counter()
+        offset = 0.0
+        i = 0
+
+        while (not total or i < total) and offset < duration:
+            delay = begin + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(task, i, begin + offset))
+
+            offset += rng.exponential(1 / rate) if arrival == "poisson" else 1 / rate
+            i += 1
+
+    return [future.result() for future in futures]
+
+
+def summarize(records):
+    """
+    Throughput, latency percentiles (successful requests) and error rates of
+    a run.
+    """
+
+    if not records:
+        return {"requests": 0}
+
+    elapsed = max(r["end"] for r in records) - min(r["start"] for r in records)
+    ok = [r for r in records if r["status"] is not None and r["status"] < 400]
+    statuses = Counter(str(r["status"]) if r["status"] is not None else "transport_error" for r in records)
+
+    stages = {}
+    for r in ok:
+        for stage, ms in r["timing"].items():
+            stages.setdefault(stage, []).append(ms)
+
+    return {
+            "requests": len(records),
+            "ok": len(ok),
+            "errors": len(records) - len(ok),
+            "error_rate": round((len(records) - len(ok)) / len(records), 4),
+            "rejected_503": statuses.get("503", 0),
+            "status_counts": dict(statuses),
+            "duration_s": round(elapsed, 2),
+            "throughput_rps": round(len(ok) / elapsed, 2) if elapsed > 0 else None,
+            "latency_ms": _percentiles([r["end"] - r["start"] for r in ok]),
+            "cache": dict(Counter(r["cache"] for r in ok if r["cache"])),
+            "server_timing_mean_ms": {stage: round(float(np.mean(v)), 1) for stage, v in stages.items()},
+            "sample_errors": sorted({r["error"] for r in records if r["error"]})[:5],
+            }
+
+
+@contextmanager
+def serve(port: int, workers: int, weights, cache: bool, timeout: float = 300.0):
+    """
+    Start the API locally under gunicorn (``inference/gunicorn.conf.py``)
+    and wait until it answers.
+    """
+
+    env = {
+           **os.environ,
+           "WEB_WORKERS": str(workers),
+           "MODEL_PATH": str(weights),
+           }
+    if not cache:
+        env["RESULT_CACHE_MB"] = "0"  # every request runs the model
+
+    command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", "app:app"]
+    proc = subprocess.Popen(command, cwd=INFERENCE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        deadline = time.perf_counter() + timeout
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"The API exited with code {proc.returncode}.")
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/stats/workers", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                pass
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"The API did not start after {timeout:.0f} s.")
+            time.sleep(0.5)
+
+        yield f"http://127.0.0.1:{port}"
+
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run(args, base_url: str):
+    """
+    Generate the inputs, warm the service up and run the load test.
+    """
+
+    path, suffix, media_type = ENDPOINTS[args.endpoint]
+    url = f"{base_url}{path}" + (f"?{args.query}" if args.query else "")
+    filename = f"load_test{suffix}"
+
+    width, height = args.size
+    if args.endpoint == "image":
+        payloads = synthetic_images(args.unique_inputs, width, height, args.seed)
+    else:
+        payloads = synthetic_videos(args.unique_inputs, width, height, args.video_frames, seed=args.seed)
+
+    with requests.Session() as session:
+        for i in range(args.warmup):
+            send(session, url, filename, payloads[i % len(payloads)], media_type, args.timeout)
+
+    if args.rate:
+        records = open_loop(url, payloads, filename, media_type, args.rate, args.duration, args.requests, args.max_in_flight, args.arrival, args.timeout, args.seed)
+    else:
+        records = closed_loop(url, payloads, filename, media_type, args.concurrency, args.duration, args.requests, args.timeout)
+
+    return summarize(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the inference API with synthetic images or videos.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running API (ignored with --serve).")
+    parser.add_argument("--serve", action="store_true", help="Start the API locally under gunicorn for the run.")
+    parser.add_argument("--workers", type=int, default=1, help="--serve: API worker processes.")
+    parser.add_argument("--weights", default=str(INFERENCE / MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED), help="--serve: model weights.")
+    parser.add_argument("--keep-cache", action="store_true", help="--serve: keep the result cache (disabled by default).")
+    parser.add_argument("--port", type=int, default=8765, help="--serve: local port.")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="image", help="Endpoint under test.")
+    parser.add_argument("--query", default="output=json", help="Query string of the requests.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Closed loop: concurrent clients.")
+    parser.add_argument("--rate", type=float, default=None, help="Open loop: arrival rate (requests/s). Closed loop when not set.")
+    parser.add_argument("--arrival", choices=["poisson", "uniform"], default="poisson", help="Open loop: arrival process.")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="Open loop: maximum concurrent requests.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test duration, in seconds.")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests.")
+    parser.add_argument("--warmup", type=int, default=3, help="Sequential requests sent before measuring.")
+    parser.add_argument("--unique-inputs", type=int, default=32, help="Distinct synthetic inputs, sent in turn.")
+    parser.add_argument("--size", type=int, nargs=2, default=[1280, 720], metavar=("WIDTH", "HEIGHT"), help="Size of the synthetic inputs.")
+    parser.add_argument("--video-frames", type=int, default=50, help="Frames per synthetic video.")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Request timeout, in seconds.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the inputs and arrivals.")
+    parser.add_argument("--output", default=None, help="Results file (JSON). Defaults to runs/load_test/<date>-<endpoint>-<mode>.json.")
+    args = parser.parse_args()
+
+    mode = f"open-{args.rate:g}rps" if args.rate else f"closed-{args.concurrency}c"
+
+    if args.serve:
+        with serve(args.port, args.workers, args.weights, args.keep_cache) as base_url:
+            results = run(args, base_url)
+    else:
+        results = run(args, args.url.rstrip("/"))
+
+    report = {
+              "config": {**vars(args), "mode": mode},
+              "environment": {
+                              "git_commit": git_commit(),
+                              "python": platform.python_version(),
+                              "platform": platform.platform(),
+                              "cpus": os.cpu_count(),
+                              },
+              "results": results,
+              }
+
+    output = Path(args.output) if args.output else ROOT_DIR / "runs" / "load_test" / f"{time.strftime('%Y%m%d-%H%M%S')}-{args.endpoint}-{mode}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    latency = results.get("latency_ms") or {}
+    print(f"{args.endpoint} {mode}: {results['requests']} requests, {results.get('throughput_rps')} req/s, error rate {results.get('error_rate')}")
+    print("latency ms: " + ", ".join(f"{k} {v}" for k, v in latency.items()))
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,8 @@ WEIGHTS_YOLOV8 = ROOT_DIR / "weights_yolov8"
 # Yolov8 paths
 DATASET_DIR_YOLO = DATA / "dataset_marinedebris_yolov8"
 DATASET_YAML = DATASET_DIR_YOLO / "data.yaml"
+DATASET_TRAIN_IMAGES = DATASET_DIR_YOLO / "train" / "images"
+DATASET_TEST_IMAGES = DATASET_DIR_YOLO / "test" / "images"
 
 # Models
 MODEL_NAME_YOLO = "yolov8n.pt"
@@ -31,6 +33,13 @@ MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED = "yolov8n_marinedebris_best_baseline_tunn
 
 MODEL_NAME_YOLO_FINAL_BASELINE_PARAMS = WEIGHTS_YOLOV8 / "best_params_used_baseline_tunned.csv"
 
+# ONNX exports of the best model (fixed batch of 1 and dynamic batch)
+MODEL_NAME_YOLO_FINAL_BASELINE_ONNX = "yolov8n_marinedebris_best_baseline_tunned.onnx"
+MODEL_NAME_YOLO_FINAL_BASELINE_ONNX_DYNAMIC = "yolov8n_marinedebris_best_baseline_tunned_dynamic.onnx"
+
+# INT8 (static quantization) variant of the fixed-batch ONNX export
+MODEL_NAME_YOLO_FINAL_BASELINE_INT8 = "yolov8n_marinedebris_best_baseline_tunned_int8.onnx"
+
 # Optmizer
 OPTIMIZER_RESULTS = WEIGHTS_YOLOV8 / "optuna_results.csv"
 
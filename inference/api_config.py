@@ -1,28 +1,214 @@
 # Imports
+import os
 from pathlib import Path
 import shutil
 import tempfile
 from fastapi import UploadFile
+from fastapi.responses import JSONResponse
 
 # Configuration
 BASE_DIR = Path(__file__).parent
 
-MODEL_PATH = BASE_DIR / "yolov8n_marinedebris_best_baseline_tunned.pt"
+# Model weights: PyTorch (.pt) or ONNX (.onnx, FP32 or INT8, runs on ONNX Runtime)
+MODEL_PATH = Path(os.getenv("MODEL_PATH", BASE_DIR / "yolov8n_marinedebris_best_baseline_tunned.pt"))
+
+# Multi-worker deployment (gunicorn.conf.py): API worker processes, model loaded before forking
+# (workers share its read-only pages) and torch intra-op threads per worker (0: CPUs / workers)
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))
+WEB_PRELOAD = os.getenv("WEB_PRELOAD", "1") == "1"
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", "0"))
+
+# Model registry: number of weights files kept loaded (LRU)
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "3"))
+
+# Micro-batching of /predict/image
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "10"))
+
+# Worker pool: "thread" or "process", workers and admission queue size. Thread workers share one
+# model whose forward passes are serialized by its lock (SharedModel): extra workers overlap decoding,
+# drawing and encoding with inference, not two forward passes; process workers each load their own model
+POOL_KIND = os.getenv("POOL_KIND", "thread")
+POOL_WORKERS = int(os.getenv("POOL_WORKERS", "2"))
+POOL_QUEUE_SIZE = int(os.getenv("POOL_QUEUE_SIZE", "16"))
+POOL_RETRY_AFTER = int(os.getenv("POOL_RETRY_AFTER", "5"))  # seconds
+
+# Reduced-resolution decode never goes below the model inference size
+IMAGE_DECODE_MIN_SIDE = 640
+
+# Annotated image returned by /predict/image (overridable per request): format ("jpg", "webp"
+# or "png"), JPG/WebP quality and longer side in pixels (0: original resolution)
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "jpg")
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "95"))
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "0"))
+
+# Sliced inference of large images (/predict/image?tiled=true): tile side (px), overlap fraction,
+# tiles per forward pass, extra full-image pass and cross-tile merge ("nms" or "fuse")
+TILE_SIZE = int(os.getenv("TILE_SIZE", "640"))
+TILE_OVERLAP = float(os.getenv("TILE_OVERLAP", "0.2"))
+TILE_BATCH_SIZE = int(os.getenv("TILE_BATCH_SIZE", "8"))
+TILE_FULL_IMAGE = os.getenv("TILE_FULL_IMAGE", "1") == "1"
+TILE_MERGE = os.getenv("TILE_MERGE", "nms")
+
+# Batch endpoint: maximum number of images in flight per request
+BATCH_UPLOAD_WINDOW = int(os.getenv("BATCH_UPLOAD_WINDOW", "16"))
 
 IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
 VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv"}
 
+# Uploads are copied to disk in chunks, up to a size cap; request bodies of the video routes are
+# rejected while they are received once they exceed the cap plus a margin for the multipart framing
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+MAX_VIDEO_UPLOAD_MB = int(os.getenv("MAX_VIDEO_UPLOAD_MB", "500"))
+UPLOAD_FORM_MARGIN = 1 << 16  # 64 KiB
+
+# Streamed video responses are sent in chunks of this size
+STREAM_CHUNK_SIZE = 1 << 16  # 64 KiB
+
+# Asynchronous video jobs: state and results persisted locally
+JOBS_DIR = Path(os.getenv("JOBS_DIR", BASE_DIR / "jobs"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "8"))  # unfinished jobs per API worker, 503 beyond
+JOB_TTL_HOURS = float(os.getenv("JOB_TTL_HOURS", "24"))  # finished jobs deleted after this time (0: kept)
+
+# Result cache of /predict/image: memory tier (MiB) and optional disk tier
+RESULT_CACHE_MB = int(os.getenv("RESULT_CACHE_MB", "64"))
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR") or None
+RESULT_CACHE_DISK_MB = int(os.getenv("RESULT_CACHE_DISK_MB", "1024"))
+
+# Video processing: decode / infer + track / render + encode run in their own threads
+VIDEO_PIPELINED = os.getenv("VIDEO_PIPELINED", "1") == "1"
+VIDEO_QUEUE_SIZE = int(os.getenv("VIDEO_QUEUE_SIZE", "8"))
+
+# Frames per model call when processing videos
+VIDEO_BATCH_SIZE = int(os.getenv("VIDEO_BATCH_SIZE", "4"))
+
+# Adaptive frame skipping: detector only on key frames, tracks interpolated in between
+VIDEO_ADAPTIVE = os.getenv("VIDEO_ADAPTIVE", "0") == "1"
+VIDEO_MAX_STRIDE = int(os.getenv("VIDEO_MAX_STRIDE", "5"))
+VIDEO_CHANGE_THRESHOLD = float(os.getenv("VIDEO_CHANGE_THRESHOLD", "6.0"))
+
+# Tracker backend: "norfair" or "array" (vectorized, for crowded scenes)
+VIDEO_TRACKER = os.getenv("VIDEO_TRACKER", "norfair")
+
+# Video I/O backend: "opencv" or "ffmpeg" (multithreaded decode pipe, H.264 output); with ffmpeg,
+# frames larger than VIDEO_DECODE_MAX_SIDE (0: off) are downscaled while decoding (boxes in the scaled size)
+VIDEO_BACKEND = os.getenv("VIDEO_BACKEND", "opencv")
+VIDEO_DECODE_THREADS = int(os.getenv("VIDEO_DECODE_THREADS", "0"))
+VIDEO_DECODE_MAX_SIDE = int(os.getenv("VIDEO_DECODE_MAX_SIDE", "0"))
+
+# Per-request profiling: Server-Timing header on every response; requests with an "X-Profile: <token>"
+# header (only when PROFILE_TOKEN is set) or sampled at random write their call tree to PROFILE_DIR,
+# which keeps the PROFILE_MAX_FILES most recent profiles
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", BASE_DIR / "profiles"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "100"))
+
+# Exceptions
+class UploadTooLargeError(ValueError):
+    """
+    Raised when an upload exceeds the configured size cap.
+    """
+
 # Helper functions
-def _save_upload_to_tmp(file: UploadFile) -> Path:
+def _save_upload_to_tmp(file: UploadFile, max_bytes: int = 0) -> Path:
     """
     Save an uploaded file to a temporary directory and return its path.
+
+    The upload is copied in ``UPLOAD_CHUNK_SIZE`` chunks. When ``max_bytes``
+    is set and the upload is larger, the partial copy is removed and
+    ``UploadTooLargeError`` is raised.
     """
     suffix = Path(file.filename).suffix.lower()  # type: ignore 
 
     tmp_dir = Path(tempfile.mkdtemp())
     tmp_path = tmp_dir / f"input{suffix}"
 
+    written = 0
     with open(tmp_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+        for chunk in iter(lambda: file.file.read(UPLOAD_CHUNK_SIZE), b""):
+            written += len(chunk)
+            if max_bytes and written > max_bytes:
+                f.close()
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise UploadTooLargeError(f"Upload exceeds {max_bytes // (1 << 20)} MB.")
+            f.write(chunk)
+
+    return tmp_path
+
+
+# Classes
+class UploadLimitMiddleware():
+    """
+    ASGI middleware capping the request body of some routes before the
+    multipart form is parsed (Starlette spools the whole body to disk
+    first, so the cap of ``_save_upload_to_tmp`` alone comes too late).
+
+    Requests announcing a larger ``Content-Length`` are answered with 413
+    without reading the body; otherwise the received bytes are counted and
+    the request is aborted with 413 as soon as they exceed the cap
+    (chunked uploads, or a wrong ``Content-Length``).
+    """
+
+    def __init__(self, app, limits: dict):
+        """
+        Parameters
+        ----------
+        app : ASGI application
+            Wrapped application.
+        limits : dict
+            Maximum upload size in bytes by request path, e.g.
+            ``{"/predict/video": 500 << 20}``. Bodies get
+            ``UPLOAD_FORM_MARGIN`` more bytes for the multipart framing.
+        """
+
+        self.app = app
+        self.limits = limits
+
+    @staticmethod
+    async def _reject(send, limit: int):
+        response = JSONResponse({"detail": f"Upload exceeds {limit // (1 << 20)} MB."}, status_code=413)
+        await response({"type": "http"}, None, send)
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if not limit:
+            await self.app(scope, receive, send)
+            return
+
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > limit + UPLOAD_FORM_MARGIN:
+            await self._reject(send, limit)
+            return
+
+        state = {"received": 0, "exceeded": False, "started": False}
+
+        async def limited_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["received"] += len(message.get("body", b""))
+                if state["received"] > limit + UPLOAD_FORM_MARGIN:
+                    state["exceeded"] = True
+                    raise UploadTooLargeError(f"Upload exceeds {limit // (1 << 20)} MB.")
+            return message
+
+        # Once the cap is exceeded, the response of the application (e.g. a 400 for the
+        # interrupted form) is replaced by the 413
+        async def limited_send(message):
+            if state["exceeded"]:
+                if message["type"] == "http.response.start" and not state["started"]:
+                    state["started"] = True
+                    await self._reject(send, limit)
+                return
+            if message["type"] == "http.response.start":
+                state["started"] = True
+            await send(message)
 
-    return tmp_path
\ No newline at end of file
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except UploadTooLargeError:
+            if state["started"]:
+                raise
+            await self._reject(send, limit)
\ No newline at end of file
@@ -1,15 +1,81 @@
 # Imports
 import os
+import json
 import shutil
+import time
+import asyncio
+from functools import partial
 from pathlib import Path
-import cv2
+from contextlib import asynccontextmanager, AsyncExitStack
+from typing import Literal
+import anyio
+import torch
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import Response
+from fastapi import FastAPI, Request, UploadFile, File, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from inference import InferencePicture, InferenceVideo  # type: ignore
+from registry import ModelRegistry  # type: ignore
+from batching import MicroBatcher  # type: ignore
+from workers import InferencePool, PoolSaturatedError  # type: ignore
+from image_io import decode_image, image_size, restore_scale, encode_image, ImageDecodeError, is_archive, iter_archive_images, ENCODED_MEDIA_TYPES  # type: ignore
+from outputs import detections_to_dict, detections_to_json, tracks_to_json, array_to_npy  # type: ignore
+from video_io import probe_video, scaled_size, FFmpegPipeWriter  # type: ignore
+from jobs import VideoJobManager, JobQueueFullError  # type: ignore
+from live import LiveSession  # type: ignore
+from cache import ResultCache, cache_key  # type: ignore
+from resources import thread_budget, configure_threads, process_memory  # type: ignore
+from metrics import MetricsMiddleware, stage_recorder, stage_timer, observe_speed, observe_video, observe_live_frame, live_connection, observe_model_load, render_metrics  # type: ignore
+from profiling import ProfilingMiddleware, current_trace, record_stage  # type: ignore
 from api_config import (
                         _save_upload_to_tmp,
+                        UploadTooLargeError,
+                        UploadLimitMiddleware,
                         MODEL_PATH,
+                        MODEL_CACHE_SIZE,
+                        BATCH_MAX_SIZE,
+                        BATCH_MAX_WAIT_MS,
+                        POOL_KIND,
+                        POOL_WORKERS,
+                        POOL_QUEUE_SIZE,
+                        POOL_RETRY_AFTER,
+                        IMAGE_DECODE_MIN_SIDE,
+                        BATCH_UPLOAD_WINDOW,
+                        MAX_VIDEO_UPLOAD_MB,
+                        STREAM_CHUNK_SIZE,
+                        JOBS_DIR,
+                        JOB_WORKERS,
+                        VIDEO_PIPELINED,
+                        VIDEO_QUEUE_SIZE,
+                        VIDEO_BATCH_SIZE,
+                        VIDEO_ADAPTIVE,
+                        VIDEO_MAX_STRIDE,
+                        VIDEO_CHANGE_THRESHOLD,
+                        VIDEO_TRACKER,
+                        RESULT_CACHE_MB,
+                        RESULT_CACHE_DIR,
+                        RESULT_CACHE_DISK_MB,
+                        TILE_SIZE,
+                        TILE_OVERLAP,
+                        TILE_BATCH_SIZE,
+                        TILE_FULL_IMAGE,
+                        TILE_MERGE,
+                        WEB_WORKERS,
+                        TORCH_THREADS,
+                        PROFILE_DIR,
+                        PROFILE_SAMPLE_RATE,
+                        PROFILE_TOKEN,
+                        PROFILE_INTERVAL_MS,
+                        PROFILE_MAX_FILES,
+                        IMAGE_FORMAT,
+                        IMAGE_QUALITY,
+                        IMAGE_MAX_SIDE,
+                        VIDEO_BACKEND,
+                        VIDEO_DECODE_THREADS,
+                        VIDEO_DECODE_MAX_SIDE,
+                        JOB_MAX_QUEUED,
+                        JOB_TTL_HOURS,
                         IMAGE_EXTENSIONS,
                         VIDEO_EXTENSIONS
                         )
@@ -17,26 +83,562 @@ from api_config import (
 # Out of docker in ROOT
 """
 from inference.inference import InferencePicture, InferenceVideo
+from inference.registry import ModelRegistry
+from inference.batching import MicroBatcher
+from inference.workers import InferencePool, PoolSaturatedError
+from inference.image_io import decode_image, image_size, restore_scale, encode_image, ImageDecodeError, is_archive, iter_archive_images, ENCODED_MEDIA_TYPES
+from inference.outputs import detections_to_dict, detections_to_json, tracks_to_json, array_to_npy
+from inference.video_io import probe_video, scaled_size, FFmpegPipeWriter
+from inference.jobs import VideoJobManager, JobQueueFullError
+from inference.live import LiveSession
+from inference.cache import ResultCache, cache_key
+from inference.resources import thread_budget, configure_threads, process_memory
+from inference.metrics import MetricsMiddleware, stage_recorder, stage_timer, observe_speed, observe_video, observe_live_frame, live_connection, observe_model_load, render_metrics
+from inference.profiling import ProfilingMiddleware, current_trace, record_stage
 
 from inference.api_config import (
                                   _save_upload_to_tmp,
+                                  UploadTooLargeError,
+                                  UploadLimitMiddleware,
                                   MODEL_PATH,
+                                  MODEL_CACHE_SIZE,
+                                  BATCH_MAX_SIZE,
+                                  BATCH_MAX_WAIT_MS,
+                                  POOL_KIND,
+                                  POOL_WORKERS,
+                                  POOL_QUEUE_SIZE,
+                                  POOL_RETRY_AFTER,
+                                  IMAGE_DECODE_MIN_SIDE,
+                                  BATCH_UPLOAD_WINDOW,
+                                  MAX_VIDEO_UPLOAD_MB,
+                                  STREAM_CHUNK_SIZE,
+                                  JOBS_DIR,
+                                  JOB_WORKERS,
+                                  VIDEO_PIPELINED,
+                                  VIDEO_QUEUE_SIZE,
+                                  VIDEO_BATCH_SIZE,
+                                  VIDEO_ADAPTIVE,
+                                  VIDEO_MAX_STRIDE,
+                                  VIDEO_CHANGE_THRESHOLD,
+                                  VIDEO_TRACKER,
+                                  RESULT_CACHE_MB,
+                                  RESULT_CACHE_DIR,
+                                  RESULT_CACHE_DISK_MB,
+                                  TILE_SIZE,
+                                  TILE_OVERLAP,
+                                  TILE_BATCH_SIZE,
+                                  TILE_FULL_IMAGE,
+                                  TILE_MERGE,
+                                  WEB_WORKERS,
+                                  TORCH_THREADS,
+                                  PROFILE_DIR,
+                                  PROFILE_SAMPLE_RATE,
+                                  PROFILE_TOKEN,
+                                  PROFILE_INTERVAL_MS,
+                                  PROFILE_MAX_FILES,
+                                  IMAGE_FORMAT,
+                                  IMAGE_QUALITY,
+                                  IMAGE_MAX_SIDE,
+                                  VIDEO_BACKEND,
+                                  VIDEO_DECODE_THREADS,
+                                  VIDEO_DECODE_MAX_SIDE,
+                                  JOB_MAX_QUEUED,
+                                  JOB_TTL_HOURS,
                                   IMAGE_EXTENSIONS,
                                   VIDEO_EXTENSIONS
                                   )
 """
 
+# Model registry (weights are loaded once per process and shared)
+model_registry = ModelRegistry(capacity=MODEL_CACHE_SIZE, load_callback=observe_model_load)
+
+# Result cache of /predict/image (content-addressed, single-flight)
+result_cache = ResultCache(
+                           max_bytes=RESULT_CACHE_MB << 20,
+                           disk_dir=RESULT_CACHE_DIR,
+                           disk_max_bytes=RESULT_CACHE_DISK_MB << 20,
+                           )
+
+# Response media types of /predict/image
+IMAGE_MEDIA_TYPES = {
+                     "image": "image/jpeg",
+                     "json": "application/json",
+                     "npy": "application/x-npy",
+                     }
+
+def _decode_image(data, reduced):
+    """
+    Decode an uploaded image (``decode`` stage of the metrics).
+
+    Returns the image and, for a reduced decode, the original (width,
+    height) the detections are mapped back to (None otherwise).
+    """
+
+    with stage_timer("image", "decode"):
+        return decode_image(data, reduced, IMAGE_DECODE_MIN_SIDE), image_size(data) if reduced else None
+
+def _predict_images(sources):
+    """
+    Batched forward pass used by the /predict/image micro-batcher.
+    """
+
+    return InferencePicture.predict_batch(model_registry.get(MODEL_PATH), sources)
+
+def _predict_tiled(image, tiling):
+    """
+    Sliced inference used by /predict/image with ``tiled=true`` (the tiles
+    are batched already, so it bypasses the micro-batcher).
+    """
+
+    return InferencePicture.predict_tiled(model_registry.get(MODEL_PATH), image, full_image=TILE_FULL_IMAGE, **tiling)
+
+def _render_image(result, output="image", encoding=None, size=None):
+    """
+    Build the /predict/image response body for the requested output format.
+
+    Returns the content bytes and media type. Drawing and image encoding
+    are skipped entirely for the ``json`` and ``npy`` formats. ``encoding``
+    sets the format, quality and longer side of the annotated image. With
+    ``size``, the original (width, height) of a reduced decode, the ``json``
+    and ``npy`` boxes are in original image coordinates.
+    """
+
+    encoding = encoding or {"fmt": IMAGE_FORMAT, "quality": IMAGE_QUALITY, "max_side": IMAGE_MAX_SIDE}
+
+    infer = InferencePicture(
+                             weights_yolo=str(MODEL_PATH),
+                             image_path=result.orig_img,
+                             model=model_registry.get(MODEL_PATH),
+                             )
+
+    if output in ("json", "npy"):
+        detections, shape = restore_scale(infer.detections(result=result), result.orig_shape, size)
+
+    if output == "json":
+        with stage_timer("image", "encode"):
+            return detections_to_json(detections, result.names, shape), IMAGE_MEDIA_TYPES[output]
+
+    if output == "npy":
+        with stage_timer("image", "encode"):
+            return array_to_npy(detections), IMAGE_MEDIA_TYPES[output]
+
+    # Shrunk to the requested size before drawing
+    with stage_timer("image", "drawing"):
+        img_det = infer.run(result=result, max_side=encoding["max_side"])
+
+    with stage_timer("image", "encode"):
+        content = encode_image(img_det, encoding["fmt"], encoding["quality"])
+
+    return content, ENCODED_MEDIA_TYPES[encoding["fmt"]]
+
+def _image_cache_key(data, reduced, output, tiling=None, encoding=None):
+    """
+    Result cache key of a /predict/image request: uploaded bytes, model
+    weights identity, inference parameters, decode mode, tiling settings,
+    output format and image encoding.
+    """
+
+    return cache_key(
+                     data,
+                     model_registry.get(MODEL_PATH).sha256,
+                     sorted(InferencePicture.PREDICT_ARGS.items()),
+                     IMAGE_DECODE_MIN_SIDE if reduced else None,
+                     (sorted(tiling.items()), TILE_FULL_IMAGE) if tiling else None,
+                     output,
+                     sorted(encoding.items()) if encoding else None,
+                     )
+
+def _video_inference(video_path, options=None, **kwargs):
+    """
+    Build an ``InferenceVideo`` on the shared model with the API video
+    settings. ``options`` overrides the adaptive frame skipping settings
+    (``adaptive``, ``max_stride``, ``change_threshold``).
+    """
+
+    options = {
+               "adaptive": VIDEO_ADAPTIVE,
+               "max_stride": VIDEO_MAX_STRIDE,
+               "change_threshold": VIDEO_CHANGE_THRESHOLD,
+               **(options or {}),
+               }
+
+    return InferenceVideo(
+                          input_path=str(video_path),
+                          model_path=str(MODEL_PATH),
+                          model=model_registry.get(MODEL_PATH),
+                          pipelined=VIDEO_PIPELINED,
+                          queue_size=VIDEO_QUEUE_SIZE,
+                          batch_size=VIDEO_BATCH_SIZE,
+                          tracker=VIDEO_TRACKER,
+                          stage_callback=stage_recorder("video"),
+                          backend=VIDEO_BACKEND,
+                          decode_threads=VIDEO_DECODE_THREADS,
+                          decode_max_side=VIDEO_DECODE_MAX_SIDE if VIDEO_BACKEND == "ffmpeg" else None,
+                          **options,
+                          **kwargs,
+                          )
+
+def _frame_stats(infer):
+    """
+    Number of frames that went through the detector and frames whose boxes
+    were interpolated, as reported in the JSON outputs.
+    """
+
+    return {
+            "frames_inferred": infer.frames_inferred,
+            "frames_interpolated": infer.frames_interpolated,
+            }
+
+def _run_timed(infer):
+    """
+    Run an ``InferenceVideo`` and record its frames and throughput.
+    """
+
+    start = time.perf_counter()
+    output = infer.run()
+    observe_video(infer.frames_inferred, infer.frames_interpolated, time.perf_counter() - start)
+
+    return output
+
+def _run_video(video_path, output="video", options=None):
+    """
+    Run inference + tracking on a video and build the /predict/video
+    response body for the requested output format.
+
+    Returns the content bytes (or the annotated video path for ``video``)
+    and media type. Drawing and video encoding are skipped entirely for the
+    ``json`` and ``npy`` formats.
+    """
+
+    infer = _video_inference(
+                             video_path,
+                             options,
+                             output="video" if output == "video" else "detections",
+                             )
+
+    output_path = _run_timed(infer)
+
+    if output == "json":
+        return tracks_to_json(infer.tracks, infer.model.names, infer.frame_shape, infer.fps, stats=_frame_stats(infer)), "application/json"
+
+    if output == "npy":
+        return array_to_npy(infer.tracks), "application/x-npy"
+
+    return output_path, "video/mp4"
+
+def _run_video_to_writer(video_path, writer, options=None):
+    """
+    Run inference + tracking on a video, sending the annotated frames to an
+    already opened writer (closed even if inference fails).
+    """
+
+    infer = _video_inference(video_path, options, writer=writer)
+
+    try:
+        _run_timed(infer)
+    finally:
+        writer.release()
+
+async def _kill_on_disconnect(receive, writer):
+    """
+    Abort the encoder of a streamed video as soon as the client disconnects
+    (otherwise only noticed at the next chunk sent, a fragment later).
+    """
+
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+    writer.kill()
+
+async def _stream_video(video_path, admission, options=None, receive=None):
+    """
+    Stream the annotated video as fragmented MP4 while it is being processed.
+
+    Frames are piped into an ffmpeg encoder from a worker thread; its output
+    is forwarded in ``STREAM_CHUNK_SIZE`` chunks. The admission slot and the
+    temp files are released when the stream ends or the client goes away,
+    once the worker has stopped.
+    """
+
+    try:
+        width, height, fps, _ = await run_in_threadpool(probe_video, video_path)
+        if VIDEO_BACKEND == "ffmpeg":
+            width, height = scaled_size(width, height, VIDEO_DECODE_MAX_SIDE)
+        writer = FFmpegPipeWriter("pipe:1", width, height, fps, fragmented=True)
+
+        # The writer holds a subprocess, so it cannot be sent to a process pool
+        runner = inference_pool.execute if inference_pool.kind == "thread" else run_in_threadpool
+        job = asyncio.ensure_future(runner(_run_video_to_writer, video_path, writer, options))
+        watcher = asyncio.ensure_future(_kill_on_disconnect(receive, writer)) if receive is not None else None
+
+        try:
+            while True:
+                chunk = await run_in_threadpool(writer.stdout.read1, STREAM_CHUNK_SIZE)  # type: ignore
+                if not chunk:
+                    break
+                yield chunk
+
+            await job
+
+        # On disconnection the encoder is killed, so the next frame write fails and the
+        # worker stops; it is waited for before the slot is released, and ffmpeg is reaped
+        finally:
+            with anyio.CancelScope(shield=True):
+                if watcher is not None:
+                    watcher.cancel()
+                if not job.done():
+                    writer.kill()
+                await asyncio.wait({job})
+                if not job.cancelled():
+                    job.exception()
+                await run_in_threadpool(writer.process.wait)
+                writer.stdout.close()  # type: ignore
+
+    finally:
+        with anyio.CancelScope(shield=True):
+            await admission.aclose()
+            await run_in_threadpool(_remove_tmp, video_path)
+
+def _decode_live_frame(data, reduced):
+    """
+    Decode a frame received on the live stream (``decode`` stage of the
+    metrics).
+    """
+
+    with stage_timer("live", "decode"):
+        return decode_image(data, reduced, IMAGE_DECODE_MIN_SIDE)
+
+def _live_session(reduced=False):
+    """
+    Build the ``LiveSession`` of a live stream connection: its own tracker
+    on the shared model, frames processed on the worker pool.
+    """
+
+    infer = InferenceVideo(
+                           input_path=None,  # type: ignore
+                           model_path=str(MODEL_PATH),
+                           model=model_registry.get(MODEL_PATH),
+                           output="detections",
+                           tracker=VIDEO_TRACKER,
+                           stage_callback=stage_recorder("live"),
+                           )
+
+    # The tracker lives in this process, so it cannot be sent to a process pool
+    executor = inference_pool.execute if inference_pool.kind == "thread" else run_in_threadpool
+
+    return LiveSession(
+                       infer=infer,
+                       decode=partial(_decode_live_frame, reduced=reduced),
+                       executor=executor,
+                       frame_callback=observe_live_frame,
+                       )
+
+def _run_video_job(video_path, progress_callback):
+    """
+    Process a video job: annotated video plus tracked objects as JSON.
+    """
+
+    infer = _video_inference(video_path, progress_callback=progress_callback)
+
+    output_path = _run_timed(infer)
+    detections = tracks_to_json(infer.tracks, infer.model.names, infer.frame_shape, infer.fps, stats=_frame_stats(infer))
+
+    return output_path, detections
+
+def _remove_tmp(path):
+    """
+    Remove the temporary directory of an upload.
+    """
+
+    shutil.rmtree(Path(path).parent, ignore_errors=True)
+
+async def _iter_batch_uploads(files):
+    """
+    Yield ``(filename, bytes)`` for every image of a batch upload.
+
+    A single zip/tar upload is read member by member; otherwise each upload
+    is one image. Bytes are ``None`` for uploads with an invalid extension.
+    """
+
+    if len(files) == 1 and is_archive(files[0].filename or ""):
+        members = iter_archive_images(files[0].file, files[0].filename, IMAGE_EXTENSIONS)
+
+        while True:
+            item = await run_in_threadpool(next, members, None)
+            if item is None:
+                return
+            yield item
+
+    for file in files:
+        if Path(file.filename).suffix.lower() not in IMAGE_EXTENSIONS:  # type: ignore
+            yield file.filename, None
+        else:
+            yield file.filename, await file.read()
+
+async def _predict_batch_item(filename, data, reduced):
+    """
+    Decode one image of a batch upload, run it through the micro-batcher and
+    return its NDJSON line (detections, or the error for this image).
+    """
+
+    try:
+        if data is None:
+            raise ImageDecodeError(f"Invalid image format: {Path(filename).suffix.lower()}")
+
+        image, size = await inference_pool.execute(_decode_image, data, reduced)
+        result = await _predict_image(image)
+        observe_speed("image", result)
+
+        infer = InferencePicture(
+                                 weights_yolo=str(MODEL_PATH),
+                                 image_path=image,
+                                 model=model_registry.get(MODEL_PATH),
+                                 )
+
+        detections, shape = restore_scale(infer.detections(result=result), result.orig_shape, size)
+        line = {"filename": filename, **detections_to_dict(detections, result.names, shape)}
+
+    except Exception as e:
+        line = {"filename": filename, "error": str(e)}
+
+    return (json.dumps(line) + "\n").encode("utf-8")
+
+async def _predict_image(image):
+    """
+    Run one image through the micro-batcher, or alone when the request is
+    profiled (the batched forward pass runs outside of the request, so it
+    would be missing from its profile).
+    """
+
+    trace = current_trace()
+    if trace is not None and trace.profiler is not None:
+        return (await inference_pool.execute(_predict_images, [image]))[0]
+
+    return await image_batcher.submit(image)
+
+def _busy():
+    """
+    Build the 503 response returned when the inference queue is full.
+    """
+
+    return HTTPException(
+                         status_code=503,
+                         detail="Inference queue is full, retry later.",
+                         headers={"Retry-After": str(POOL_RETRY_AFTER)},
+                         )
+
+# Worker pool (blocking inference work runs off the event loop)
+inference_pool = InferencePool(
+                               max_workers=POOL_WORKERS,
+                               queue_size=POOL_QUEUE_SIZE,
+                               kind=POOL_KIND,
+                               wait_callback=partial(record_stage, "queue"),
+                               )
+
+# Asynchronous video jobs
+video_jobs = VideoJobManager(
+                             jobs_dir=JOBS_DIR,
+                             run_fn=_run_video_job,
+                             max_workers=JOB_WORKERS,
+                             max_queued=JOB_MAX_QUEUED,
+                             ttl=JOB_TTL_HOURS * 3600,
+                             )
+
+# Open live stream sessions (/stats/live)
+live_sessions = set()
+
+# Micro-batching scheduler for /predict/image
+image_batcher = MicroBatcher(
+                             predict_fn=_predict_images,
+                             max_batch_size=BATCH_MAX_SIZE,
+                             max_wait_ms=BATCH_MAX_WAIT_MS,
+                             pool=inference_pool,
+                             )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load and warm up the production model before serving requests.
+
+    The torch thread pool gets this worker's share of the CPUs. With
+    gunicorn preloading, the model is already loaded (before fork) and
+    shared with the other workers.
+    """
+
+    configure_threads(thread_budget(WEB_WORKERS, TORCH_THREADS))
+    model_registry.get(MODEL_PATH)
+    await image_batcher.start()
+    video_jobs.start()
+    yield
+    video_jobs.shutdown()
+    await image_batcher.stop()
+    inference_pool.shutdown()
+    model_registry.clear()
+
 # App
 app = FastAPI(
               title="Marine Debris YOLOv8 Inference API",
               version="0.1.0",
+              lifespan=lifespan,
               )
 
+# Oversized video uploads rejected while they are received, before the form is spooled
+app.add_middleware(
+                   UploadLimitMiddleware,
+                   limits={path: MAX_VIDEO_UPLOAD_MB << 20 for path in ("/predict/video", "/jobs/video")},
+                   )
+
+# Request counts, latency and requests in flight per route
+app.add_middleware(MetricsMiddleware)
+
+# Server-Timing header (stage timings) on every response, call tree of sampled requests
+app.add_middleware(
+                   ProfilingMiddleware,
+                   profile_dir=PROFILE_DIR,
+                   sample_rate=PROFILE_SAMPLE_RATE,
+                   token=PROFILE_TOKEN,
+                   interval=PROFILE_INTERVAL_MS / 1000,
+                   max_profiles=PROFILE_MAX_FILES,
+                   )
+
 # Routes
 @app.post("/predict/image")
-async def predict_image(file: UploadFile = File(...)):
+async def predict_image(
+                        file: UploadFile = File(...),
+                        reduced: bool = Query(False, description="Decode large images at reduced resolution."),
+                        output: Literal["image", "json", "npy"] = Query("image", description="Response format."),
+                        tiled: bool = Query(False, description="Sliced inference: run the model on overlapping tiles at full resolution."),
+                        tile_size: int = Query(TILE_SIZE, ge=32, description="Tiled mode: tile side, in pixels."),
+                        tile_overlap: float = Query(TILE_OVERLAP, ge=0, lt=1, description="Tiled mode: fraction of a tile shared with its neighbour."),
+                        tile_batch_size: int = Query(TILE_BATCH_SIZE, ge=1, description="Tiled mode: tiles per forward pass."),
+                        tile_merge: Literal["nms", "fuse"] = Query(TILE_MERGE, description="Tiled mode: merge of the duplicates along tile borders."),  # type: ignore
+                        image_format: Literal["jpg", "webp", "png"] = Query(IMAGE_FORMAT, alias="format", description="Image output: encoding format."),  # type: ignore
+                        quality: int = Query(IMAGE_QUALITY, ge=1, le=100, description="Image output: JPG or WebP quality."),
+                        max_side: int = Query(IMAGE_MAX_SIDE, ge=0, description="Image output: longer side in pixels, shrunk before drawing (0: original size)."),
+                        ):
     """
     Run YOLOv8 inference on an uploaded image and return the annotated image.
+
+    The upload is decoded in memory and handed to the model as an array.
+    With ``reduced=true``, large images are decoded at 1/2, 1/4 or 1/8
+    resolution (never below the model inference size); the returned boxes
+    and size are still those of the original image. With
+    ``output=json`` or ``output=npy`` only the detections are returned
+    (rows ``[x1, y1, x2, y2, conf, class_id]``), without drawing.
+
+    With ``tiled=true`` (high-resolution aerial images) the image is not
+    downscaled to the model size: it is cut into overlapping tiles run in
+    batches, and the boxes are mapped back and merged across tile borders.
+
+    The annotated image is encoded as ``format`` (``jpg``, ``webp`` or
+    ``png``) with the given ``quality``. With ``max_side``, larger images
+    are shrunk before drawing and encoding, which saves encode time and
+    bandwidth when the client displays the image smaller anyway.
+
+    Results are cached by the hash of the uploaded bytes, the model weights
+    and the inference parameters; identical requests in flight share one
+    computation. The ``X-Cache`` header tells ``hit``, ``miss`` or
+    ``coalesced``.
     """
 
     suffix = Path(file.filename).suffix.lower()  # type: ignore
@@ -47,49 +649,100 @@ async def predict_image(file: UploadFile = File(...)):
                             detail=f"Invalid image format: {suffix}",
                             )
 
-    try:
-        # Save uploaded image
-        image_path = _save_upload_to_tmp(file)
+    tiling = {
+              "tile_size": tile_size,
+              "overlap": tile_overlap,
+              "batch_size": tile_batch_size,
+              "merge": tile_merge,
+              } if tiled else None
 
-        # Run inference
-        infer = InferencePicture(
-                                 weights_yolo=str(MODEL_PATH),
-                                 image_path=str(image_path),
-                                 )
+    encoding = {
+                "fmt": image_format,
+                "quality": quality,
+                "max_side": max_side,
+                } if output == "image" else None
+
+    async def compute():
+        async with inference_pool.admit():
+            # Decode uploaded image in memory
+            image, size = await inference_pool.execute(_decode_image, data, reduced)
+
+            # Run inference (tiles batched per request, or batched with concurrent requests)
+            if tiling:
+                result = await inference_pool.execute(_predict_tiled, image, tiling)
+            else:
+                result = await _predict_image(image)
+            observe_speed("image", result)
 
-        img_det = infer.run()
+            # Draw and encode
+            content, _ = await inference_pool.execute(_render_image, result, output, encoding, size)
 
-        # Encode as JPG
-        success, encoded = cv2.imencode(".jpg", img_det)
-        if not success:
-            raise RuntimeError("Failed to encode image.")
+        return content
+
+    try:
+        with stage_timer("image", "upload_read"):
+            data = await file.read()
+
+        # Cache hits are served without taking an inference slot
+        key = await run_in_threadpool(_image_cache_key, data, reduced, output, tiling, encoding)
+        content, status = await result_cache.get_or_compute(key, compute)
 
         return Response(
-                        content=encoded.tobytes(),
-                        media_type="image/jpeg",
+                        content=content,
+                        media_type=ENCODED_MEDIA_TYPES[image_format] if encoding else IMAGE_MEDIA_TYPES[output],
+                        headers={"X-Cache": status},
                         )
 
+    except PoolSaturatedError:
+        raise _busy()
+
+    except ImageDecodeError as e:
+        raise HTTPException(
+                            status_code=400,
+                            detail=str(e),
+                            )
+
     except Exception as e:
         raise HTTPException(
                             status_code=500,
                             detail=f"Inference error: {str(e)}",
                             )
 
-    finally:
-        # Cleanup temp files
-        try:
-            shutil.rmtree(image_path.parent)
-        except Exception:
-            pass
-
 
 @app.post("/predict/video")
-async def predict_video(file: UploadFile = File(...)):
+async def predict_video(
+                        request: Request,
+                        file: UploadFile = File(...),
+                        output: Literal["video", "json", "npy"] = Query("video", description="Response format."),
+                        stream: bool = Query(False, description="Stream a fragmented MP4 while frames are processed."),
+                        adaptive: bool = Query(VIDEO_ADAPTIVE, description="Run the detector only on key frames and interpolate the tracks in between."),
+                        max_stride: int = Query(VIDEO_MAX_STRIDE, ge=1, description="Adaptive mode: maximum frames between two key frames."),
+                        change_threshold: float = Query(VIDEO_CHANGE_THRESHOLD, ge=0, description="Adaptive mode: scene change (gray levels) that triggers a key frame."),
+                        ):
     """
     Run YOLOv8 inference + tracking on an uploaded video and return the
     annotated video.
+
+    The upload is copied to disk in chunks and rejected with 413 above
+    ``MAX_VIDEO_UPLOAD_MB``. The annotated video is sent from disk with HTTP
+    range support. With ``stream=true`` it is instead encoded as fragmented
+    H.264 MP4 and streamed while frames are still being processed.
+
+    With ``output=json`` or ``output=npy`` only the tracked objects are
+    returned (rows ``[frame, track_id, x1, y1, x2, y2, conf, class_id]``),
+    without drawing or video encoding.
+
+    With ``adaptive=true`` the detector only runs on key frames (every
+    ``max_stride`` frames, or earlier on scene change) and the boxes are
+    carried forward by the tracker in between.
     """
 
+    options = {
+               "adaptive": adaptive,
+               "max_stride": max_stride,
+               "change_threshold": change_threshold,
+               }
+
     suffix = Path(file.filename).suffix.lower()  # type: ignore
 
     if suffix not in VIDEO_EXTENSIONS:
@@ -98,27 +751,52 @@ async def predict_video(file: UploadFile = File(...)):
                             detail=f"Invalid video format: {suffix}",
                             )
 
+    video_path = None
+    streaming = False
+    handed_off = False
+    admission = AsyncExitStack()
+
     try:
-        # Save uploaded video
-        video_path = _save_upload_to_tmp(file)
+        await admission.enter_async_context(inference_pool.admit())
 
-        # Run inference + tracking
-        infer = InferenceVideo(
-                               input_path=str(video_path),
-                               model_path=str(MODEL_PATH),
-                               )
+        # Save uploaded video (copied in chunks, size-capped)
+        with stage_timer("video", "upload_read"):
+            video_path = await run_in_threadpool(_save_upload_to_tmp, file, MAX_VIDEO_UPLOAD_MB << 20)
 
-        output_path = infer.run()
+        # Fragmented MP4 streamed while frames are processed
+        if stream and output == "video":
+            streaming = handed_off = True
+            return StreamingResponse(
+                                     _stream_video(video_path, admission, options, request.receive),
+                                     media_type="video/mp4",
+                                     )
 
+        # Run inference + tracking
+        result, media_type = await inference_pool.execute(_run_video, video_path, output, options)
 
-        with open(output_path, "rb") as f:
-            video_bytes = f.read()
+        if media_type == "video/mp4":
+            # Sent from disk (with range support), temp files removed afterwards
+            handed_off = True
+            return FileResponse(
+                                result,
+                                media_type=media_type,
+                                background=BackgroundTask(_remove_tmp, video_path),
+                                )
 
         return Response(
-                        content=video_bytes,
-                        media_type="video/mp4",
+                        content=result,
+                        media_type=media_type,
                         )
 
+    except PoolSaturatedError:
+        raise _busy()
+
+    except UploadTooLargeError as e:
+        raise HTTPException(
+                            status_code=413,
+                            detail=str(e),
+                            )
+
     except Exception as e:
         raise HTTPException(
                             status_code=500,
@@ -126,8 +804,275 @@ async def predict_video(file: UploadFile = File(...)):
                             )
 
     finally:
+        if not streaming:
+            await admission.aclose()
+
         # Cleanup temp files
+        if not handed_off and video_path is not None:
+            await run_in_threadpool(_remove_tmp, video_path)
+
+
+@app.post("/predict/batch")
+async def predict_batch(
+                        files: list[UploadFile] = File(...),
+                        reduced: bool = Query(False, description="Decode large images at reduced resolution."),
+                        ):
+    """
+    Run YOLOv8 inference on many images and stream the detections as NDJSON.
+
+    Accepts several image uploads or a single zip/tar archive of images.
+    Images are decoded in parallel on the worker pool and go through the
+    model in batches with the micro-batcher. One JSON line per image
+    (``filename`` plus detections, or ``error``) is streamed back as soon as
+    that image is done, so the whole set is never held in memory: at most
+    ``BATCH_UPLOAD_WINDOW`` images are in flight at a time.
+    """
+
+    stack = AsyncExitStack()
+
+    try:
+        # One admission slot for the whole batch request
+        await stack.enter_async_context(inference_pool.admit())
+    except PoolSaturatedError:
+        raise _busy()
+
+    async def stream():
+        pending = set()
+
         try:
-            shutil.rmtree(video_path.parent)
-        except Exception:
-            pass
+            async for filename, data in _iter_batch_uploads(files):
+                pending.add(asyncio.create_task(_predict_batch_item(filename, data, reduced)))
+
+                if len(pending) >= BATCH_UPLOAD_WINDOW:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+
+        except Exception as e:
+            yield (json.dumps({"error": f"Batch inference error: {str(e)}"}) + "\n").encode("utf-8")
+
+        finally:
+            for task in pending:
+                task.cancel()
+            await stack.aclose()
+
+    return StreamingResponse(
+                             stream(),
+                             media_type="application/x-ndjson",
+                             )
+
+
+@app.websocket("/live")
+async def live(
+               websocket: WebSocket,
+               reduced: bool = Query(False, description="Decode large frames at reduced resolution (JPEG DCT scaling)."),
+               ):
+    """
+    Detect and track objects on a live stream of frames (e.g. a camera).
+
+    The client sends each frame as one binary message (encoded JPG or PNG)
+    and receives one JSON message per processed frame: ``seq`` (index of
+    the frame in the order sent), frame size, tracked ``objects`` (track
+    id, box, confidence and class, ids kept for the whole connection),
+    server latency and stream statistics (frames received, processed,
+    dropped and failed, achieved fps). When inference falls behind, stale
+    frames are dropped (only the latest one waits), so latency stays
+    bounded. Frames that cannot be decoded get a ``{"type": "error"}``
+    message. The connection is closed with code 1013 when the inference
+    queue is full.
+    """
+
+    await websocket.accept()
+
+    async def receive():
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return None
+        return message.get("bytes") or (message.get("text") or "").encode("utf-8")
+
+    try:
+        async with inference_pool.admit():
+            with live_connection():
+                session = _live_session(reduced)
+                live_sessions.add(session)
+                try:
+                    await session.run(receive, websocket.send_json)
+                finally:
+                    live_sessions.discard(session)
+
+    except PoolSaturatedError:
+        await websocket.close(code=1013, reason="Inference queue is full, retry later.")
+
+    except WebSocketDisconnect:
+        pass
+
+    except Exception as e:
+        await websocket.close(code=1011, reason=f"Live inference error: {str(e)}"[:120])
+
+
+@app.post("/jobs/video", status_code=202)
+async def submit_video_job(file: UploadFile = File(...)):
+    """
+    Submit a video for asynchronous inference + tracking.
+
+    Returns the job state (with its ``id``) immediately. Poll
+    ``GET /jobs/{id}`` for progress, then fetch ``/jobs/{id}/result`` or
+    ``/jobs/{id}/detections``.
+    """
+
+    suffix = Path(file.filename).suffix.lower()  # type: ignore
+
+    if suffix not in VIDEO_EXTENSIONS:
+        raise HTTPException(
+                            status_code=400,
+                            detail=f"Invalid video format: {suffix}",
+                            )
+
+    # Rejected before the upload is copied
+    if video_jobs.full():
+        raise _busy()
+
+    try:
+        with stage_timer("video", "upload_read"):
+            video_path = await run_in_threadpool(_save_upload_to_tmp, file, MAX_VIDEO_UPLOAD_MB << 20)
+
+    except UploadTooLargeError as e:
+        raise HTTPException(
+                            status_code=413,
+                            detail=str(e),
+                            )
+
+    try:
+        return await run_in_threadpool(video_jobs.submit, video_path, file.filename)
+    except JobQueueFullError:
+        raise _busy()
+    finally:
+        await run_in_threadpool(_remove_tmp, video_path)
+
+
+@app.get("/jobs/{job_id}")
+async def get_video_job(job_id: str):
+    """
+    Return the state and progress (frames done / total, fps, ETA) of a job.
+    """
+
+    job = video_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+                            status_code=404,
+                            detail=f"Job not found: {job_id}",
+                            )
+
+    return job
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_video_job_result(job_id: str):
+    """
+    Return the annotated video of a finished job (with range support).
+    """
+
+    path = video_jobs.result_path(job_id)
+    if path is None:
+        raise HTTPException(
+                            status_code=404,
+                            detail=f"No result for job: {job_id}",
+                            )
+
+    return FileResponse(
+                        path,
+                        media_type="video/mp4",
+                        )
+
+
+@app.get("/jobs/{job_id}/detections")
+async def get_video_job_detections(job_id: str):
+    """
+    Return the tracked objects of a finished job as JSON.
+    """
+
+    path = video_jobs.detections_path(job_id)
+    if path is None:
+        raise HTTPException(
+                            status_code=404,
+                            detail=f"No detections for job: {job_id}",
+                            )
+
+    return FileResponse(
+                        path,
+                        media_type="application/json",
+                        )
+
+
+@app.get("/stats/batching")
+async def batching_stats():
+    """
+    Report the batch sizes formed by the /predict/image micro-batcher.
+    """
+
+    return image_batcher.stats()
+
+
+@app.get("/stats/cache")
+async def cache_stats():
+    """
+    Report hits, misses, coalesced requests and tier sizes of the
+    /predict/image result cache.
+    """
+
+    return result_cache.stats()
+
+
+@app.get("/stats/workers")
+async def worker_stats():
+    """
+    Report queue depth and wait times of the inference worker pool.
+    """
+
+    return inference_pool.stats()
+
+
+@app.get("/stats/live")
+async def live_stats():
+    """
+    Report the frames received, processed and dropped, and the achieved
+    fps of every open live stream.
+    """
+
+    return {
+            "connections": len(live_sessions),
+            "sessions": [session.stats() for session in live_sessions],
+            }
+
+
+@app.get("/stats/process")
+async def process_stats():
+    """
+    Report the memory (RSS, PSS, shared and private) and torch threads of
+    the worker process serving the request.
+    """
+
+    return {
+            "pid": os.getpid(),
+            "torch_threads": torch.get_num_threads(),
+            **process_memory(),
+            }
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Expose the API metrics in the Prometheus text format: requests,
+    latency and requests in flight per route, per-stage latency histograms
+    of the image and video pipelines, video frames and throughput, and
+    model loads.
+    """
+
+    content, media_type = render_metrics()
+
+    return Response(content=content, media_type=media_type)
\ No newline at end of file
@@ -0,0 +1,184 @@
+# Imports
+import asyncio
+import time
+from collections import Counter
+
+
+# Classes
+class MicroBatcher():
+    """
+    Dynamic micro-batching scheduler in front of a shared model.
+
+    Concurrent callers ``submit`` single inputs; a background task gathers
+    them into batches bounded by ``max_batch_size`` and ``max_wait_ms``, runs
+    one batched forward pass through ``predict_fn`` and hands each result back
+    to the caller that submitted the corresponding input.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = 8, max_wait_ms: float = 10.0, pool=None):
+        """
+        Initialize the scheduler.
+
+        Parameters
+        ----------
+        predict_fn : callable
+            Blocking function taking a list of inputs and returning a list of
+            results in the same order (one batched forward pass).
+        max_batch_size : int, optional
+            Maximum number of inputs per forward pass. Defaults to 8.
+        max_wait_ms : float, optional
+            Maximum time, in milliseconds, the first input of a batch waits
+            for more inputs to arrive. Defaults to 10.
+        pool : InferencePool, optional
+            Worker pool running ``predict_fn``. Defaults to the event loop's
+            default executor.
+        """
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.pool = pool
+
+        self._queue = None
+        self._task = None
+
+        # Statistics
+        self.batch_sizes = Counter()
+        self.total_forward_time = 0.0
+
+    async def start(self):
+        """
+        Start the background batching task on the running event loop.
+        """
+
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """
+        Stop the background task and fail any request still waiting.
+        """
+
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        while not self._queue.empty():  # type: ignore
+            _, future = self._queue.get_nowait()  # type: ignore
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped."))
+
+    async def submit(self, item):
+        """
+        Queue a single input and wait for its result.
+
+        Parameters
+        ----------
+        item : object
+            Single model input (e.g. an image path or array).
+
+        Returns
+        -------
+        object
+            Result produced by ``predict_fn`` for this input.
+        """
+
+        if self._task is None:
+            raise RuntimeError("Batcher is not running.")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))  # type: ignore
+
+        return await future
+
+    async def _collect(self):
+        """
+        Wait for the first input, then gather more until the batch is full
+        or the maximum wait has elapsed.
+        """
+
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]  # type: ignore
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))  # type: ignore
+            except asyncio.TimeoutError:
+                break
+
+        # Drop requests whose caller already went away
+        return [(item, fut) for item, fut in batch if not fut.done()]
+
+    async def _loop(self):
+        """
+        Background task: collect a batch, run it, dispatch the results.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            start = time.perf_counter()
+
+            try:
+                if self.pool is not None:
+                    results = await self.pool.execute(self.predict_fn, items)
+                else:
+                    results = await loop.run_in_executor(None, self.predict_fn, items)
+
+                # Results are matched to inputs by position: with a missing one, none can be trusted
+                results = list(results)
+                if len(results) != len(items):
+                    raise RuntimeError(f"predict_fn returned {len(results)} results for {len(items)} inputs.")
+
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            self.total_forward_time += time.perf_counter() - start
+            self.batch_sizes[len(items)] += 1
+
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    def stats(self):
+        """
+        Return the batch sizes formed so far.
+
+        Returns
+        -------
+        dict
+            Scheduler limits, number of batches and requests served, the
+            histogram of batch sizes and the mean batch size.
+        """
+
+        batches = sum(self.batch_sizes.values())
+        requests = sum(size * count for size, count in self.batch_sizes.items())
+
+        return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": batches,
+                "requests": requests,
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "mean_batch_size": requests / batches if batches else 0.0,
+                "mean_forward_ms": 1000.0 * self.total_forward_time / batches if batches else 0.0,
+                }
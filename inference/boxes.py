@@ -0,0 +1,45 @@
+# Imports
+import numpy as np
+
+
+# Functions
+def box_overlap(a, b, metric: str = "iou"):
+    """
+    Pairwise overlap between two sets of boxes.
+
+    Shared by the tracker (IoU matching), the tile merge (IoU or IoS) and the
+    ONNX parity check.
+
+    Parameters
+    ----------
+    a : np.ndarray
+        Boxes of shape (N, 4), ``[x1, y1, x2, y2]``.
+    b : np.ndarray
+        Boxes of shape (M, 4), ``[x1, y1, x2, y2]``.
+    metric : str, optional
+        "iou" (intersection over union) or "ios" (intersection over the
+        smaller box, which stays high when a box was cut by a tile border).
+        Defaults to "iou".
+
+    Returns
+    -------
+    np.ndarray
+        Overlap matrix of shape (N, M).
+    """
+
+    # One (N, M) array per coordinate: contiguous element-wise operations
+    inter_w = np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    inter_h = np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+    inter = np.maximum(inter_w, 0) * np.maximum(inter_h, 0)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+
+    if metric == "ios":
+        denominator = np.minimum(area_a[:, None], area_b[None, :])
+    elif metric == "iou":
+        denominator = area_a[:, None] + area_b[None, :] - inter
+    else:
+        raise ValueError(f"Unknown overlap metric: {metric!r} (expected 'iou' or 'ios').")
+
+    return inter / np.maximum(denominator, 1e-9)
@@ -0,0 +1,301 @@
+# Imports
+import asyncio
+import hashlib
+import os
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+
+# Exceptions
+class _ComputationAbandoned(Exception):
+    """
+    Set on a single-flight computation whose owner was cancelled, so that
+    the requests waiting on it retry instead of being cancelled too.
+    """
+
+
+# Functions
+def cache_key(data: bytes, *parts) -> str:
+    """
+    Content-addressed cache key.
+
+    Parameters
+    ----------
+    data : bytes
+        Uploaded bytes.
+    *parts
+        Everything else the result depends on (model identity, inference
+        parameters, output format...), as values with a stable ``repr``.
+
+    Returns
+    -------
+    str
+        SHA-256 hex digest of the bytes and the parts.
+    """
+
+    digest = hashlib.sha256(data)
+    for part in parts:
+        digest.update(b"\x00")
+        digest.update(repr(part).encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+# Classes
+class ResultCache():
+    """
+    Two-tier cache of encoded inference results, with single-flight
+    deduplication.
+
+    The memory tier is an LRU bounded by the total size of the cached values.
+    The optional disk tier stores one file per key under ``disk_dir``,
+    bounded by size too (least recently used files are removed first);
+    disk hits are promoted to memory. While a key is being computed, other
+    requests for the same key wait for that computation instead of starting
+    a duplicate one.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20, disk_dir=None, disk_max_bytes: int = 1 << 30):
+        """
+        Initialize the cache.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Memory tier capacity, in bytes (0 disables it). Defaults to
+            64 MiB.
+        disk_dir : str or pathlib.Path, optional
+            Directory of the disk tier. Defaults to None (no disk tier).
+        disk_max_bytes : int, optional
+            Disk tier capacity, in bytes. Defaults to 1 GiB.
+        """
+
+        self.max_bytes = max(0, int(max_bytes))
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = max(0, int(disk_max_bytes))
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = OrderedDict()  # key -> size, least recently used first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+        # Statistics
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        if self.disk_dir is not None:
+            self._load_disk_index()
+
+    # Memory tier
+    def _memory_get(self, key):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+            return value
+
+    def _memory_put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+
+            self._memory[key] = value
+            self._memory_bytes += len(value)
+
+            while self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    # Disk tier
+    def _disk_path(self, key):
+        return self.disk_dir / key[:2] / key  # type: ignore
+
+    def _load_disk_index(self):
+        """
+        Index the files left by a previous run, oldest access first.
+        """
+
+        self.disk_dir.mkdir(parents=True, exist_ok=True)  # type: ignore
+
+        files = []
+        for path in self.disk_dir.glob("??/*"):  # type: ignore
+            if path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            files.append((stat.st_mtime, path.name, stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+        self._disk_evict()
+
+    def _disk_evict(self):
+        while self._disk_bytes > self.disk_max_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._disk_path(key).unlink(missing_ok=True)
+
+    def _disk_get(self, key):
+        if self.disk_dir is None:
+            return None
+
+        with self._lock:
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+
+        path = self._disk_path(key)
+        try:
+            value = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+
+        return value
+
+    def _disk_put(self, key, value):
+        if self.disk_dir is None or len(value) > self.disk_max_bytes:
+            return
+
+        path = self._disk_path(key)
+        path.parent.mkdir(exist_ok=True)
+
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(value)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(value)
+            self._disk_bytes += len(value)
+            self._disk_evict()
+
+    # Public API
+    def get(self, key):
+        """
+        Return the cached value of a key (memory, then disk), or None.
+
+        Blocking when the disk tier is enabled.
+        """
+
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+
+        value = self._disk_get(key)
+        if value is not None:
+            self._memory_put(key, value)
+
+        return value
+
+    def put(self, key, value: bytes):
+        """
+        Store a value in both tiers. Blocking when the disk tier is enabled.
+        """
+
+        self._memory_put(key, value)
+        self._disk_put(key, value)
+
+    async def get_or_compute(self, key, compute):
+        """
+        Return the cached value of a key, computing it at most once.
+
+        Parameters
+        ----------
+        key : str
+            Cache key (see ``cache_key``).
+        compute : callable
+            Coroutine function returning the value (bytes) on a miss.
+
+        Returns
+        -------
+        tuple of (bytes, str)
+            The value and how it was obtained: ``"hit"`` (memory or disk),
+            ``"coalesced"`` (waited for an identical request in flight) or
+            ``"miss"`` (computed).
+        """
+
+        while True:
+            value = self._memory_get(key)
+            if value is None and self.disk_dir is not None:
+                value = await asyncio.to_thread(self.get, key)
+                if value is not None:
+                    self.disk_hits += 1
+
+            if value is not None:
+                self.hits += 1
+                return value, "hit"
+
+            # Identical request in flight: wait for its result
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+
+            try:
+                value = await asyncio.shield(pending)
+            except _ComputationAbandoned:
+                continue  # its owner went away: look again, the first waiter takes over
+
+            self.coalesced += 1
+            return value, "coalesced"
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        try:
+            value = await compute()
+            if self.disk_dir is not None:
+                await asyncio.to_thread(self.put, key, value)
+            else:
+                self.put(key, value)
+            future.set_result(value)
+            return value, "miss"
+
+        except asyncio.CancelledError:
+            # Not future.cancel(): that would cancel every waiter (not caught by ``except Exception``)
+            future.set_exception(_ComputationAbandoned())
+            future.exception()
+            raise
+
+        except Exception as e:
+            # Waiters get the same error; failures are not cached
+            future.set_exception(e)
+            future.exception()
+            raise
+
+        finally:
+            del self._inflight[key]
+
+    def stats(self):
+        """
+        Return cache statistics.
+        """
+
+        with self._lock:
+            return {
+                    "hits": self.hits,
+                    "disk_hits": self.disk_hits,
+                    "misses": self.misses,
+                    "coalesced": self.coalesced,
+                    "in_flight": len(self._inflight),
+                    "memory_entries": len(self._memory),
+                    "memory_bytes": self._memory_bytes,
+                    "memory_max_bytes": self.max_bytes,
+                    "disk_entries": len(self._disk),
+                    "disk_bytes": self._disk_bytes,
+                    "disk_max_bytes": self.disk_max_bytes if self.disk_dir is not None else 0,
+                    }
\ No newline at end of file
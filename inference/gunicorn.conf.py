@@ -0,0 +1,56 @@
+# Imports
+import gc
+import os
+import shutil
+from api_config import WEB_WORKERS, WEB_PRELOAD  # type: ignore
+
+# Out of docker in ROOT
+# from inference.api_config import WEB_WORKERS, WEB_PRELOAD
+
+# Multi-worker deployment: gunicorn -c gunicorn.conf.py app:app
+bind = "0.0.0.0:8000"
+workers = WEB_WORKERS
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Import the app (and load the model) once in the master, before forking
+preload_app = WEB_PRELOAD
+
+# Prometheus multiprocess mode (metrics of all the workers on /metrics): one
+# file per process, cleared here, before the app is imported
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if PROMETHEUS_MULTIPROC_DIR:
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+# Hooks
+def when_ready(server):
+    """
+    Load the production model in the master process before the workers are
+    forked, so they share its read-only memory pages (copy-on-write).
+
+    The objects alive at this point are moved to the permanent GC
+    generation: collections in the workers no longer write to their headers,
+    which would copy the pages they live on.
+    """
+
+    if not preload_app:
+        return
+
+    from app import model_registry, MODEL_PATH  # type: ignore
+
+    model = model_registry.get(MODEL_PATH)
+    server.log.info(f"Model preloaded before fork: {model.path}")
+
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    """
+    Drop the live gauges (requests in flight) of a worker that exited.
+    """
+
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
\ No newline at end of file
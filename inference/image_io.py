@@ -0,0 +1,254 @@
+# Imports
+import io
+import tarfile
+import zipfile
+from pathlib import PurePosixPath
+import cv2
+import numpy as np
+from PIL import Image
+
+# Encoded output formats: media type and OpenCV quality flag (PNG is lossless, the quality is ignored)
+ENCODED_MEDIA_TYPES = {"jpg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+QUALITY_FLAGS = {"jpg": cv2.IMWRITE_JPEG_QUALITY, "webp": cv2.IMWRITE_WEBP_QUALITY}
+
+# EXIF tag of the image orientation
+EXIF_ORIENTATION = 0x0112
+
+
+# Exceptions
+class ImageDecodeError(ValueError):
+    """
+    Raised when uploaded bytes cannot be decoded as an image.
+    """
+
+
+# Helper functions
+def _reduction_factor(data: bytes, min_side: int) -> int:
+    """
+    Pick the largest OpenCV reduced-decode factor (1, 2, 4 or 8) that keeps
+    the longer image side at or above ``min_side``.
+    """
+
+    size = image_size(data)
+    if size is None:
+        return 1
+
+    longest = max(size)
+    factor = 1
+    while factor < 8 and longest // (factor * 2) >= min_side:
+        factor *= 2
+
+    return factor
+
+
+# Functions
+def image_size(data: bytes):
+    """
+    Original (width, height) of encoded image bytes, or None when unknown.
+
+    Only the image header is parsed (through Pillow), so no pixel buffer is
+    allocated to find the original resolution. As ``cv2.imdecode`` applies
+    the EXIF orientation of JPEG images, the size of a JPEG rotated by a
+    quarter turn (orientations 5 to 8) is swapped to match the decoded
+    array.
+    """
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            width, height = img.size
+            if img.format == "JPEG" and img.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+                width, height = height, width
+    except Exception:
+        return None
+
+    return width, height
+
+
+def decode_image(data: bytes, reduced: bool = False, min_side: int = 640) -> np.ndarray:
+    """
+    Decode encoded image bytes in memory into a BGR array.
+
+    Parameters
+    ----------
+    data : bytes
+        Encoded image (JPG or PNG) as uploaded.
+    reduced : bool, optional
+        Decode large images at 1/2, 1/4 or 1/8 resolution, as long as the
+        longer side stays at or above ``min_side``. For JPEG the downscaling
+        happens inside the decoder, so the full-resolution buffer is never
+        allocated; boxes found on the reduced image are mapped back with
+        ``restore_scale``. Defaults to False.
+    min_side : int, optional
+        Smallest longer side allowed by the reduced mode. Defaults to 640,
+        the model inference size.
+
+    Returns
+    -------
+    np.ndarray
+        Decoded image in BGR format (H, W, 3), dtype uint8.
+
+    Raises
+    ------
+    ImageDecodeError
+        If the bytes are not a valid image.
+    """
+
+    flags = cv2.IMREAD_COLOR
+
+    if reduced:
+        flags = {
+                 1: cv2.IMREAD_COLOR,
+                 2: cv2.IMREAD_REDUCED_COLOR_2,
+                 4: cv2.IMREAD_REDUCED_COLOR_4,
+                 8: cv2.IMREAD_REDUCED_COLOR_8,
+                 }[_reduction_factor(data, min_side)]
+
+    # Zero-copy view over the upload buffer
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    img = cv2.imdecode(buffer, flags)
+
+    if img is None:
+        raise ImageDecodeError("Could not decode image.")
+
+    return img
+
+
+def downscale(image: np.ndarray, max_side=None):
+    """
+    Shrink an image so that its longer side is at most ``max_side``.
+
+    Returns
+    -------
+    tuple of (np.ndarray, float)
+        Image (the input itself when it is already small enough or
+        ``max_side`` is None or 0) and the applied scale factor.
+    """
+
+    height, width = image.shape[:2]
+    if not max_side or max(height, width) <= max_side:
+        return image, 1.0
+
+    scale = max_side / max(height, width)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+
+    # INTER_AREA is much faster for integer factors: shrink by the largest
+    # one first, then to the exact size (same result, about half the time)
+    factor = int(1 / scale)
+    if factor >= 2:
+        image = cv2.resize(image, (width // factor, height // factor), interpolation=cv2.INTER_AREA)
+
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA), scale
+
+
+def restore_scale(detections: np.ndarray, shape, size):
+    """
+    Map detections made on a reduced decode back to the original image.
+
+    Parameters
+    ----------
+    detections : np.ndarray
+        Array of shape (N, 6) with rows ``[x1, y1, x2, y2, conf, class_id]``,
+        in the coordinates of the decoded image.
+    shape : tuple
+        Shape ``(H, W, ...)`` of the decoded image.
+    size : tuple or None
+        Original ``(width, height)`` (see ``image_size``); None keeps the
+        detections as they are.
+
+    Returns
+    -------
+    tuple of (np.ndarray, tuple)
+        Detections in original coordinates (clipped to the image) and the
+        original shape ``(H, W, ...)``.
+    """
+
+    if size is None or (shape[1], shape[0]) == tuple(size):
+        return detections, shape
+
+    width, height = size
+    detections = detections.copy()
+    detections[:, [0, 2]] = np.clip(detections[:, [0, 2]] * (width / shape[1]), 0, width)
+    detections[:, [1, 3]] = np.clip(detections[:, [1, 3]] * (height / shape[0]), 0, height)
+
+    return detections, (height, width, *shape[2:])
+
+
+def encode_image(image: np.ndarray, fmt: str = "jpg", quality=None) -> bytes:
+    """
+    Encode a BGR array as JPG, WebP or PNG.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        Image in BGR format (H, W, 3), dtype uint8.
+    fmt : str, optional
+        ``"jpg"``, ``"webp"`` or ``"png"``. Defaults to ``"jpg"``.
+    quality : int, optional
+        JPG or WebP quality (1-100). Defaults to None, the OpenCV default
+        (95 for JPG).
+
+    Returns
+    -------
+    bytes
+        Encoded image.
+    """
+
+    if fmt not in ENCODED_MEDIA_TYPES:
+        raise ValueError(f"Invalid image format: {fmt}")
+
+    params = [QUALITY_FLAGS[fmt], int(quality)] if quality is not None and fmt in QUALITY_FLAGS else []
+    success, encoded = cv2.imencode(f".{fmt}", image, params)
+    if not success:
+        raise RuntimeError(f"Failed to encode image as {fmt}.")
+
+    return encoded.tobytes()
+
+
+def is_archive(filename: str) -> bool:
+    """
+    Return whether an uploaded filename is a zip or tar archive.
+    """
+
+    name = filename.lower()
+
+    return name.endswith((".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz"))
+
+
+def iter_archive_images(fileobj, filename: str, extensions):
+    """
+    Lazily yield the images stored in a zip or tar archive.
+
+    Members are read one at a time, so the archive is never fully loaded
+    into memory. Directories, hidden files and members whose extension is
+    not in ``extensions`` are skipped.
+
+    Parameters
+    ----------
+    fileobj : file-like
+        Seekable binary file containing the archive.
+    filename : str
+        Archive filename, used to pick the zip or tar reader.
+    extensions : set of str
+        Accepted image extensions (e.g. ``{".jpg", ".png"}``).
+
+    Yields
+    ------
+    tuple of (str, bytes)
+        Member name and its encoded image bytes.
+    """
+
+    def accepted(name):
+        path = PurePosixPath(name)
+        return path.suffix.lower() in extensions and not path.name.startswith(".")
+
+    if filename.lower().endswith(".zip"):
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and accepted(info.filename):
+                    yield info.filename, archive.read(info)
+        return
+
+    with tarfile.open(fileobj=fileobj, mode="r:*") as archive:
+        for member in archive:
+            if member.isfile() and accepted(member.name):
+                yield member.name, archive.extractfile(member).read()  # type: ignore
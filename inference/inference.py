@@ -1,16 +1,25 @@
 from pathlib import Path
+import time
+import queue
+import threading
 import cv2
+import torch
 from ultralytics import YOLO  # type: ignore
+from ultralytics.engine.results import Results  # type: ignore
 import numpy as np
 from norfair import Detection, Tracker  # type: ignore
-
-CLASS_COLORS = {
-                "can": (255, 0, 0),               # blue
-                "foam": (0, 255, 255),            # yellow
-                "plastic": (0, 255, 0),           # green
-                "plastic bottle": (0, 165, 255),  # orange
-                "unknow": (128, 128, 128),        # gray
-                }
+from tracking import ArrayTracker  # type: ignore
+from tiling import tile_windows, merge_detections  # type: ignore
+from render import Renderer  # type: ignore
+from image_io import downscale  # type: ignore
+from video_io import FFmpegPipeReader, FFmpegPipeWriter  # type: ignore
+
+# Out of docker in ROOT
+# from inference.tracking import ArrayTracker
+# from inference.tiling import tile_windows, merge_detections
+# from inference.render import Renderer
+# from inference.image_io import downscale
+# from inference.video_io import FFmpegPipeReader, FFmpegPipeWriter
 
 class InferencePicture():
     """
@@ -21,40 +30,181 @@ class InferencePicture():
     or further processing.
     """
 
-    def __init__(self, weights_yolo, image_path):
+    # Inference parameters (also part of the result cache key)
+    PREDICT_ARGS = {"imgsz": 640, "conf": 0.25, "agnostic_nms": True}
+
+    def __init__(self, weights_yolo, image_path, model=None):
         """
         Initialize the image inference pipeline.
 
         Parameters
         ----------
         weights_yolo : str or pathlib.Path
-            Path to the YOLOv8 model weights file.
-        image_path : str or pathlib.Path
-            Path to the input image used for inference.
+            Path to the YOLOv8 model weights file (``.pt``, or ``.onnx`` to
+            run on ONNX Runtime).
+        image_path : str, pathlib.Path or np.ndarray
+            Path to the input image used for inference, or the image
+            already decoded in memory (BGR, dtype uint8).
+        model : SharedModel or ultralytics.YOLO, optional
+            Already loaded model (e.g. from the ``ModelRegistry``). When
+            given, ``weights_yolo`` is not loaded again.
         """
 
-        self.model = YOLO(weights_yolo)
+        self.model = model if model is not None else YOLO(weights_yolo, task="detect")
         self.image_path = image_path
 
-    def run(self):
+    @staticmethod
+    def predict_batch(model, sources):
+        """
+        Run a single batched forward pass over several images.
+
+        Parameters
+        ----------
+        model : SharedModel or ultralytics.YOLO
+            Loaded YOLOv8 model.
+        sources : list
+            Image paths or arrays.
+
+        Returns
+        -------
+        list of ultralytics.engine.results.Results
+            One result per input, in the same order.
+        """
+
+        return model.predict(
+                             source=list(sources),
+                             **InferencePicture.PREDICT_ARGS,
+                             )
+
+    @staticmethod
+    def predict_tiled(model, image, tile_size: int = 640, overlap: float = 0.2, batch_size: int = 8, full_image: bool = True, merge: str = "nms"):
+        """
+        Sliced inference for high-resolution images.
+
+        The image is cut into overlapping tiles that go through the model at
+        their native resolution (``imgsz=tile_size``), ``batch_size`` tiles
+        per forward pass. Tile boxes are shifted back to image coordinates
+        and the duplicates along tile borders are merged (matched by
+        intersection over the smaller box, so cut boxes match too).
+
+        Parameters
+        ----------
+        model : SharedModel or ultralytics.YOLO
+            Loaded YOLOv8 model.
+        image : np.ndarray
+            Image (BGR, dtype uint8).
+        tile_size : int, optional
+            Tile side, in pixels. Defaults to 640.
+        overlap : float, optional
+            Fraction of a tile shared with its neighbour. Defaults to 0.2.
+        batch_size : int, optional
+            Tiles per forward pass. Defaults to 8.
+        full_image : bool, optional
+            Also run the whole image at the usual inference size, so objects
+            larger than a tile are still found. Defaults to True.
+        merge : str, optional
+            Cross-tile merge: "nms" (keep the best box) or "fuse" (grow it
+            to enclose its duplicates). Defaults to "nms".
+
+        Returns
+        -------
+        ultralytics.engine.results.Results
+            Merged detections on the full image, usable like the result of
+            ``predict_batch`` (``run``, ``detections``). Its ``speed`` sums
+            the times of all the forward passes of the image.
+        """
+
+        height, width = image.shape[:2]
+        windows = tile_windows(width, height, tile_size, overlap)
+        tile_args = {**InferencePicture.PREDICT_ARGS, "imgsz": tile_size}
+        batch_size = max(1, int(batch_size))
+
+        parts = []
+        speed = {"preprocess": 0.0, "inference": 0.0, "postprocess": 0.0}
+
+        def collect(r, x1=0, y1=0):
+            boxes = r.boxes.data.cpu().numpy().astype(np.float32)
+            boxes[:, [0, 2]] += x1
+            boxes[:, [1, 3]] += y1
+            parts.append(boxes)
+            for key in speed:
+                speed[key] += r.speed.get(key) or 0.0
+
+        for start in range(0, len(windows), batch_size):
+            chunk = windows[start:start + batch_size]
+            crops = [image[y1:y2, x1:x2] for x1, y1, x2, y2 in chunk]
+
+            for (x1, y1, _, _), r in zip(chunk, model.predict(source=crops, **tile_args)):
+                collect(r, x1, y1)
+
+        if full_image and len(windows) > 1:
+            collect(InferencePicture.predict_batch(model, [image])[0])
+
+        merged = merge_detections(
+                                  np.concatenate(parts) if parts else np.zeros((0, 6), dtype=np.float32),
+                                  method=merge,
+                                  agnostic=InferencePicture.PREDICT_ARGS["agnostic_nms"],
+                                  )
+
+        return Results(orig_img=image, path="", names=model.names, boxes=torch.from_numpy(merged), speed=speed)
+
+    def run(self, result=None, max_side=None):
         """
         Run YOLOv8 inference and return the annotated image.
 
+        Parameters
+        ----------
+        result : ultralytics.engine.results.Results, optional
+            Precomputed result for ``image_path`` (e.g. from a batched
+            forward pass). When given, the model is not called again.
+        max_side : int, optional
+            Longer side of the annotated image. Larger images are shrunk
+            before drawing, so labels keep their size in the output.
+            Defaults to None (full resolution).
+
         Returns
         -------
         np.ndarray
-            Annotated image in RGB format (H, W, 3), dtype uint8.
+            Annotated image in BGR format (H, W, 3), dtype uint8: the
+            frame of the result (``result.orig_img``) drawn in place, or
+            its downscaled copy.
         """
 
-        results = self.model.predict(
-                                     source=self.image_path,
-                                     imgsz=640,
-                                     agnostic_nms=True
-                                     )
-        
-        img_bgr = results[0].plot()
+        if result is None:
+            result = self.predict_batch(self.model, [self.image_path])[0]
+
+        frame, scale = downscale(result.orig_img, max_side)
+        detections = self.detections(result=result)
+        if scale != 1.0:
+            detections = detections.copy()
+            detections[:, :4] *= scale
 
-        return img_bgr
+        return Renderer(result.names).draw_detections(frame, detections)
+
+    def detections(self, result=None):
+        """
+        Run YOLOv8 inference and return the raw detections, without drawing.
+
+        Parameters
+        ----------
+        result : ultralytics.engine.results.Results, optional
+            Precomputed result for ``image_path``. When given, the model is
+            not called again.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (N, 6), dtype float32, with rows
+            ``[x1, y1, x2, y2, conf, class_id]`` in image coordinates.
+        """
+
+        if result is None:
+            result = self.predict_batch(self.model, [self.image_path])[0]
+
+        if result.boxes is None:
+            return np.zeros((0, 6), dtype=np.float32)
+
+        return result.boxes.data.cpu().numpy().astype(np.float32)
 
 class InferenceVideo():
     """
@@ -64,9 +214,35 @@ class InferenceVideo():
     performs inference, tracks detected objects across frames, and
     renders bounding boxes with object IDs, class labels, and confidence
     scores on the output video.
+
+    Processing is split in three stages: decoding, inference + tracking,
+    and rendering + encoding. In pipelined mode each stage runs in its own
+    thread, connected by bounded queues, so throughput approaches the cost
+    of the slowest stage instead of the sum of all stages. Every stage is a
+    single thread consuming a FIFO queue, so frame order and tracker updates
+    are exactly the same as in serial mode.
+
+    With ``batch_size > 1``, consecutive frames go through the model in a
+    single call and the per-frame results are then fed to the tracker in
+    order.
+
+    In adaptive mode the detector only runs on key frames: every
+    ``max_stride`` frames, or earlier when the scene changed by more than
+    ``change_threshold`` since the last key frame (mean absolute difference
+    of downscaled grayscale frames). On the frames in between, boxes are
+    carried forward from the tracker motion estimates.
+
+    Two tracker backends are available: Norfair (default), and the
+    vectorized ``ArrayTracker`` (``tracker="array"``), which keeps the
+    detections as one array per frame and scales better to crowded scenes.
+
+    Video I/O goes through OpenCV (default) or ffmpeg pipes
+    (``backend="ffmpeg"``): frames are then decoded by a multithreaded
+    ffmpeg process, optionally downscaled while decoding, and the annotated
+    video is encoded to H.264 instead of MPEG-4 Part 2 (``mp4v``).
     """
 
-    def __init__(self, input_path: str, model_path):
+    def __init__(self, input_path: str, model_path, model=None, output: str = "video", writer=None, progress_callback=None, pipelined: bool = False, queue_size: int = 8, batch_size: int = 1, adaptive: bool = False, max_stride: int = 5, change_threshold: float = 6.0, tracker: str = "norfair", stage_callback=None, backend: str = "opencv", decode_threads: int = 0, decode_max_side=None):
         """
         Initialize the video inference pipeline.
 
@@ -75,24 +251,453 @@ class InferenceVideo():
         input_path : str
             Path to the input video file.
         model_path : str
-            Path to the trained YOLO model weights.
+            Path to the trained YOLO model weights (``.pt``, or ``.onnx`` to
+            run on ONNX Runtime).
+        model : SharedModel or ultralytics.YOLO, optional
+            Already loaded model (e.g. from the ``ModelRegistry``). When
+            given, ``model_path`` is not loaded again.
+        output : str, optional
+            ``"video"`` to render and write the annotated video, or
+            ``"detections"`` to only collect the tracked objects (no drawing
+            and no video encoding). Defaults to ``"video"``.
+        writer : object, optional
+            Already opened ``cv2.VideoWriter``-like object (``write`` and
+            ``release``), e.g. an ``FFmpegPipeWriter`` streaming fragmented
+            MP4. Defaults to an OpenCV ``mp4v`` writer next to the input.
+        progress_callback : callable, optional
+            Called after every frame as ``progress_callback(frames_done,
+            frames_total)``; ``frames_total`` is 0 when the container does
+            not report it.
+        pipelined : bool, optional
+            Run decoding, inference + tracking and rendering + encoding in
+            separate threads. Defaults to False.
+        queue_size : int, optional
+            Capacity of the queues between pipeline stages (frames).
+            Defaults to 8.
+        batch_size : int, optional
+            Number of frames per model call. Defaults to 1.
+        adaptive : bool, optional
+            Run the detector only on key frames and interpolate the tracks
+            in between. Defaults to False.
+        max_stride : int, optional
+            Maximum number of frames between two key frames in adaptive
+            mode. Defaults to 5.
+        change_threshold : float, optional
+            Scene change (mean absolute difference, in gray levels 0-255)
+            since the last key frame that triggers a new key frame in
+            adaptive mode. Defaults to 6.0.
+        tracker : str, optional
+            ``"norfair"`` or ``"array"`` (vectorized ``ArrayTracker``).
+            Defaults to ``"norfair"``.
+        stage_callback : callable, optional
+            Called as ``stage_callback(stage, seconds)`` with the time spent
+            by each frame in each stage: ``"decode"``, ``"preprocess"``,
+            ``"forward"``, ``"postprocess"`` (NMS), ``"tracking"``,
+            ``"drawing"`` and ``"encode"``.
+        backend : str, optional
+            Video I/O backend: ``"opencv"`` (``cv2.VideoCapture`` and
+            ``mp4v`` writer) or ``"ffmpeg"`` (``FFmpegPipeReader`` and H.264
+            ``FFmpegPipeWriter``). Defaults to ``"opencv"``.
+        decode_threads : int, optional
+            ffmpeg decoder threads (0: chosen by ffmpeg). Defaults to 0.
+        decode_max_side : int, optional
+            Longer side of the decoded frames with the ffmpeg backend;
+            larger videos are downscaled while decoding, and the detections
+            and annotated video are in the downscaled size. Defaults to None
+            (original size).
         """
 
+        if output not in ("video", "detections"):
+            raise ValueError(f"Invalid output: {output}")
+
+        if backend not in ("opencv", "ffmpeg"):
+            raise ValueError(f"Invalid backend: {backend}")
+
+        if decode_max_side and backend != "ffmpeg":
+            raise ValueError("decode_max_side requires the ffmpeg backend")
+
+        if tracker not in ("norfair", "array"):
+            raise ValueError(f"Invalid tracker: {tracker}")
+
         self.input_path = input_path
-        self.model = YOLO(model_path)
-        self.tracker = Tracker(distance_function="euclidean", distance_threshold=100)
+        self.model = model if model is not None else YOLO(model_path, task="detect")
+        self.tracker_backend = tracker
+        if tracker == "array":
+            self.tracker = ArrayTracker(distance_threshold=100)
+        else:
+            self.tracker = Tracker(distance_function="euclidean", distance_threshold=100)
+        self.output = output
+        self.writer = writer
+        self.progress_callback = progress_callback
+        self.pipelined = pipelined
+        self.queue_size = max(1, int(queue_size))
+        self.batch_size = max(1, int(batch_size))
+        self.adaptive = adaptive
+        self.max_stride = max(1, int(max_stride))
+        self.change_threshold = float(change_threshold)
+        self.stage_callback = stage_callback
+        self.backend = backend
+        self.decode_threads = max(0, int(decode_threads))
+        self.decode_max_side = decode_max_side
+        self.renderer = Renderer(self.model.names)
+
+        # Filled by run()
+        self.fps = None
+        self.frame_shape = None
+        self.tracks = None
+        self.frames_inferred = 0
+        self.frames_interpolated = 0
+        self._rows = []
+        self._key_thumbnail = None
+        self._since_key = 0
+        self._last_tracked = None
+
+
+    # Stages
+    def _report_stage(self, stage, start):
+        """
+        Report the time elapsed since ``start`` in a stage.
+        """
+
+        if self.stage_callback is not None:
+            self.stage_callback(stage, time.perf_counter() - start)
+
+    @staticmethod
+    def _thumbnail(frame, width: int = 64):
+        """
+        Downscaled grayscale copy of a frame, used to measure scene change.
+        """
+
+        height = max(1, round(width * frame.shape[0] / frame.shape[1]))
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        return cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+
+    def _schedule(self, frame):
+        """
+        Decide whether the detector runs on a frame.
+
+        Returns the number of frames since the previous key frame (the
+        Norfair ``period``) for a key frame, or 0 for a frame whose boxes
+        are interpolated. Every frame is a key frame unless adaptive.
+        """
+
+        if not self.adaptive:
+            return 1
+
+        self._since_key += 1
+        thumbnail = self._thumbnail(frame)
+
+        if (
+            self._key_thumbnail is None
+            or self._since_key >= self.max_stride
+            or cv2.absdiff(thumbnail, self._key_thumbnail).mean() > self.change_threshold
+            ):
+            period = self._since_key
+            self._key_thumbnail = thumbnail
+            self._since_key = 0
+            return period
+
+        return 0
+
+    def _detect(self, frames):
+        """
+        Run YOLO on a batch of frames (one model call) and build the Norfair
+        detections of each frame.
+        """
+
+        results = self.model(frames if len(frames) > 1 else frames[0], agnostic_nms=True, conf=0.4)
+
+        # Per-frame times measured by Ultralytics (milliseconds)
+        if self.stage_callback is not None:
+            for r in results:
+                for key, stage in (("preprocess", "preprocess"), ("inference", "forward"), ("postprocess", "postprocess")):
+                    self.stage_callback(stage, r.speed[key] / 1000)
 
+        return [self._to_detections(r) for r in results]
+
+    def _to_detections(self, r):
+        """
+        Convert the YOLO result of one frame into tracker detections: an
+        (N, 6) array ``[x1, y1, x2, y2, conf, class_id]`` for the array
+        tracker, a list of Norfair detections otherwise.
+        """
+
+        if self.tracker_backend == "array":
+            if r.boxes is None:
+                return np.zeros((0, 6), dtype=np.float32)
+            return r.boxes.data.cpu().numpy().astype(np.float32)
+
+        detections = []
+
+        boxes = r.boxes
+        if boxes is not None and len(boxes) > 0:
+
+            for xyxy, cls_id, conf in zip(boxes.xyxy, boxes.cls, boxes.conf):
+                x1, y1, x2, y2 = xyxy.tolist()
+
+                center = np.array(
+                                  [(x1 + x2) / 2, (y1 + y2) / 2],
+                                  dtype=np.float32
+                                  )
+
+                detections.append(
+                    Detection(
+                        points=center,
+                        scores=np.array([float(conf)]),
+                        data={
+                              "bbox": (int(x1), int(y1), int(x2), int(y2)),
+                              "class_name": self.model.names[int(cls_id)],
+                              "class_id": int(cls_id),
+                              "conf": float(conf),
+                              },
+                              )
+                                  )
+
+        return detections
+
+    def _track(self, frame_idx, detections, period: int = 1):
+        """
+        Update the tracker and snapshot the tracked objects.
+
+        ``detections`` is None for interpolated frames: the tracker only
+        predicts, and each box is the last detected box moved to the
+        estimated position of its track.
+
+        Returns an array of shape (K, 8), dtype float32, with rows
+        ``[frame, track_id, x1, y1, x2, y2, conf, class_id]``. It is a copy,
+        so the rendering stage can use it while the tracker already moved on
+        to the next frame.
+        """
+
+        if self.tracker_backend == "array":
+            # Frames since the previous update: the Kalman prediction steps over dropped frames
+            elapsed = frame_idx - self._last_tracked if self._last_tracked is not None else 1
+            self._last_tracked = frame_idx
+            tracked = self.tracker.update(detections, period=max(1, elapsed))
+            if detections is None:
+                self.frames_interpolated += 1
+            else:
+                self.frames_inferred += 1
+
+            tracked = np.column_stack([np.full(len(tracked), frame_idx, dtype=np.float32), tracked])
+            self._rows.append(tracked)
+            return tracked
+
+        if detections is None:
+            tracked_objects = self.tracker.update()
+            self.frames_interpolated += 1
+        else:
+            tracked_objects = self.tracker.update(detections=detections, period=period)
+            self.frames_inferred += 1
+
+        tracked = []
+
+        for obj in tracked_objects:
+            det = obj.last_detection
+            if det is None or det.data is None:
+                continue
+
+            x1, y1, x2, y2 = det.data["bbox"]
+
+            if detections is None:
+                cx, cy = obj.estimate[0]
+                half_w, half_h = (x2 - x1) / 2, (y2 - y1) / 2
+                x1, y1, x2, y2 = int(cx - half_w), int(cy - half_h), int(cx + half_w), int(cy + half_h)
+
+            tracked.append((frame_idx, obj.id, x1, y1, x2, y2, det.data["conf"], det.data["class_id"]))
+
+        tracked = np.array(tracked, dtype=np.float32).reshape(-1, 8)
+        self._rows.append(tracked)
+
+        return tracked
+
+    def _emit(self, frame_idx, frame, tracked, writer, total):
+        """
+        Render and encode one frame (video output) and report progress.
+        """
+
+        if writer is not None:
+            start = time.perf_counter()
+            self.renderer.draw_tracks(frame, tracked)
+            self._report_stage("drawing", start)
+
+            start = time.perf_counter()
+            writer.write(frame)
+            self._report_stage("encode", start)
+
+        if self.progress_callback is not None:
+            self.progress_callback(frame_idx + 1, total)
+
+    # Runners
+    def _infer_frames(self, read, emit):
+        """
+        Inference + tracking stage shared by both runners.
+
+        Frames are read with ``read()`` (None at the end) until the chunk
+        holds ``batch_size`` key frames, which go through the model in one
+        call (always full batches except the last, so results do not depend
+        on thread timing). The whole chunk is then tracked in frame order
+        and passed to ``emit(frame_idx, frame, tracked)``, which returns
+        False to stop.
+        """
+
+        frame_idx = 0
+        done = False
+        while not done:
+            frames, keys = [], {}
+            while len(keys) < self.batch_size:
+                frame = read()
+                if frame is None:
+                    done = True
+                    break
+
+                period = self._schedule(frame)
+                if period:
+                    keys[len(frames)] = period
+                frames.append(frame)
+
+            if not frames:
+                break
+
+            detections = {}
+            if keys:
+                detections = dict(zip(keys, self._detect([frames[i] for i in keys])))
+
+            for i, frame in enumerate(frames):
+                start = time.perf_counter()
+                tracked = self._track(frame_idx, detections.get(i), keys.get(i, 1))
+                self._report_stage("tracking", start)
+                if not emit(frame_idx, frame, tracked):
+                    done = True
+                    break
+                frame_idx += 1
+
+    def _run_serial(self, cap, writer, total):
+        """
+        Run the three stages one after the other for every chunk of frames.
+        """
+
+        def read():
+            start = time.perf_counter()
+            ret, frame = cap.read()
+            self._report_stage("decode", start)
+            return frame if ret else None
+
+        def emit(frame_idx, frame, tracked):
+            self._emit(frame_idx, frame, tracked, writer, total)
+            return True
+
+        self._infer_frames(read, emit)
+
+    def _run_pipelined(self, cap, writer, total):
+        """
+        Run decoding and rendering + encoding in their own threads, with
+        inference + tracking on the calling thread.
+        """
+
+        end = object()
+        stop = threading.Event()
+        errors = []
+        decoded = queue.Queue(maxsize=self.queue_size)
+        annotated = queue.Queue(maxsize=self.queue_size)
+
+        def put(q, item):
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return end
+
+        def decode_stage():
+            try:
+                while True:
+                    start = time.perf_counter()
+                    ret, frame = cap.read()
+                    self._report_stage("decode", start)
+                    if not ret or not put(decoded, frame):
+                        break
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                put(decoded, end)
+
+        def encode_stage():
+            try:
+                frame_idx = 0
+                while True:
+                    item = get(annotated)
+                    if item is end:
+                        break
+                    self._emit(frame_idx, item[0], item[1], writer, total)
+                    frame_idx += 1
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+        threads = [
+                   threading.Thread(target=decode_stage, name="video-decode", daemon=True),
+                   threading.Thread(target=encode_stage, name="video-encode", daemon=True),
+                   ]
+        for t in threads:
+            t.start()
+
+        def read():
+            frame = get(decoded)
+            return None if frame is end else frame
+
+        def emit(frame_idx, frame, tracked):
+            return put(annotated, (frame, tracked))
+
+        try:
+            self._infer_frames(read, emit)
+            put(annotated, end)
+
+        except BaseException:
+            stop.set()
+            raise
+
+        finally:
+            for t in threads:
+                t.join()
+
+        if errors:
+            raise errors[0]
 
     def run(self):
         """
         Run inference and tracking over the entire video.
 
         This version explicitly controls video reading and writing
-        using OpenCV to ensure compatibility in Docker environments.
+        (OpenCV or ffmpeg pipes) to ensure compatibility in Docker
+        environments.
+
+        Returns
+        -------
+        str, None or np.ndarray
+            Path to the annotated video when ``output="video"`` (None when
+            an external ``writer`` was given). Otherwise, an array of shape
+            (M, 8), dtype float32, with one row
+            ``[frame, track_id, x1, y1, x2, y2, conf, class_id]`` per tracked
+            object and frame (also stored in ``self.tracks``).
         """
 
-        # OpenCV reader
-        cap = cv2.VideoCapture(self.input_path)
+        # Reader
+        if self.backend == "ffmpeg":
+            cap = FFmpegPipeReader(self.input_path, threads=self.decode_threads, max_side=self.decode_max_side)
+        else:
+            cap = cv2.VideoCapture(self.input_path)
         if not cap.isOpened():
             raise RuntimeError(f"Could not open video: {self.input_path}")
 
@@ -103,80 +708,80 @@ class InferenceVideo():
 
         width  = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
-        # OpenCV writer
-        in_path = Path(self.input_path)
-        output_path = str(in_path.with_name(in_path.stem + "_annotated.mp4"))
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")  # type: ignore
-        writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+        total  = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+
+        self.fps = fps
+        self.frame_shape = (height, width, 3)
+        self.frames_inferred = 0
+        self.frames_interpolated = 0
+        self._rows = []
+        self._key_thumbnail = None
+        self._since_key = 0
+        self._last_tracked = None
+
+        # Writer
+        writer = None
+        output_path = None
+        if self.output == "video" and self.writer is not None:
+            writer = self.writer
+        elif self.output == "video":
+            in_path = Path(self.input_path)
+            output_path = str(in_path.with_name(in_path.stem + "_annotated.mp4"))
+            if self.backend == "ffmpeg":
+                writer = FFmpegPipeWriter(output_path, width, height, fps)
+            else:
+                fourcc = cv2.VideoWriter_fourcc(*"mp4v")  # type: ignore
+                writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
 
         # Frame loop
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        try:
+            if self.pipelined:
+                self._run_pipelined(cap, writer, total)
+            else:
+                self._run_serial(cap, writer, total)
 
-            # YOLO inference
-            results = self.model(frame, agnostic_nms=True, conf=0.4)
-            detections = []
+        # Cleanup
+        finally:
+            cap.release()
+            if writer is not None:
+                writer.release()
 
-            for r in results:
-                boxes = r.boxes
-                if boxes is None or len(boxes) == 0:
-                    continue
+        self.tracks = np.concatenate(self._rows) if self._rows else np.zeros((0, 8), dtype=np.float32)
 
-                for xyxy, cls_id, conf in zip(boxes.xyxy, boxes.cls, boxes.conf):
-                    x1, y1, x2, y2 = xyxy.tolist()
-
-                    center = np.array(
-                                      [(x1 + x2) / 2, (y1 + y2) / 2],
-                                      dtype=np.float32
-                                      )
-
-                    detections.append(
-                        Detection(
-                            points=center,
-                            scores=np.array([float(conf)]),
-                            data={
-                                  "bbox": (int(x1), int(y1), int(x2), int(y2)),
-                                  "class_name": self.model.names[int(cls_id)],
-                                  "conf": float(conf),
-                                  },
-                                  )
-                                      )
+        if self.output != "video":
+            return self.tracks
 
-            # Norfair tracking
-            tracked_objects = self.tracker.update(detections=detections)
+        return output_path
 
-            # Drawing bounding boxes
-            for obj in tracked_objects:
-                det = obj.last_detection
-                if det is None or det.data is None:
-                    continue
+    def process_frame(self, frame, frame_idx: int, period: int = 1):
+        """
+        Detect and track a single frame outside of ``run()``, e.g. a frame
+        received from a live stream.
 
-                x1, y1, x2, y2 = det.data["bbox"]
-                label = det.data["class_name"]
-                conf = det.data["conf"]
-
-                color = CLASS_COLORS.get(label, (255, 255, 255))
-
-                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                cv2.putText(
-                            frame,
-                            f"ID {obj.id} | {label} {conf:.2f}",
-                            (x1, max(0, y1 - 8)),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.55,
-                            color,
-                            2,
-                            cv2.LINE_AA,
-                            )
-
-            # writer
-            writer.write(frame)
+        Parameters
+        ----------
+        frame : np.ndarray
+            BGR frame (H, W, 3), dtype uint8.
+        frame_idx : int
+            Index of the frame in the stream (first column of the rows).
+        period : int, optional
+            Frames since the previously processed frame, so that the tracker
+            ages its objects over frames dropped upstream. Defaults to 1.
 
-        # Cleanup
-        cap.release()
-        writer.release()
+        Returns
+        -------
+        np.ndarray
+            Array of shape (K, 8), dtype float32, with rows
+            ``[frame, track_id, x1, y1, x2, y2, conf, class_id]``. Rows are
+            not accumulated in ``self.tracks``.
+        """
+
+        self.frame_shape = frame.shape
+        detections = self._detect([frame])[0]
+
+        start = time.perf_counter()
+        tracked = self._track(frame_idx, detections, max(1, int(period)))
+        self._report_stage("tracking", start)
+        self._rows.clear()
 
-        return output_path
\ No newline at end of file
+        return tracked
\ No newline at end of file
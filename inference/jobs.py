@@ -0,0 +1,409 @@
+# Imports
+import re
+import json
+import os
+import fcntl
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Exceptions
+class JobQueueFullError(RuntimeError):
+    """
+    Raised when a ``VideoJobManager`` already has ``max_queued`` unfinished
+    jobs.
+    """
+
+
+# Classes
+class VideoJobManager():
+    """
+    Asynchronous video inference jobs with persisted state.
+
+    Each job lives in its own directory under ``jobs_dir`` with the uploaded
+    video, a ``job.json`` state file, the annotated video and the detections.
+    Jobs run on a local thread pool and report progress (frames done / total,
+    fps, ETA). Because the state is on disk, finished results survive an API
+    restart and are served again without reprocessing; jobs that were queued
+    or running when the API stopped are queued again on startup.
+
+    Several API workers can share one ``jobs_dir``: the state is read from
+    ``job.json`` on every lookup, and a worker only runs a job while it holds
+    an exclusive ``flock`` on the job's claim file. The lock is released by
+    the OS if the worker dies, so an interrupted job is queued again by the
+    next worker that starts, and never runs twice at the same time.
+    """
+
+    STATE_FILE = "job.json"
+    DETECTIONS_FILE = "detections.json"
+    CLAIM_FILE = "claim.lock"
+    JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+    def __init__(self, jobs_dir, run_fn, max_workers: int = 1, persist_interval: float = 1.0, max_queued: int = 0, ttl: float = 0):
+        """
+        Initialize the job manager.
+
+        Parameters
+        ----------
+        jobs_dir : str or pathlib.Path
+            Directory where job inputs, outputs and state are stored.
+        run_fn : callable
+            Blocking function ``run_fn(input_path, progress_callback)``
+            returning ``(output_path, detections_bytes)``. The callback must
+            be called as ``progress_callback(frames_done, frames_total)``.
+        max_workers : int, optional
+            Number of jobs processed at the same time. Defaults to 1.
+        persist_interval : float, optional
+            Minimum time, in seconds, between two progress writes to disk.
+            Defaults to 1.0.
+        max_queued : int, optional
+            Maximum number of unfinished (queued or running) jobs of this
+            process; ``submit`` raises ``JobQueueFullError`` beyond it.
+            Defaults to 0 (unlimited).
+        ttl : float, optional
+            Time, in seconds, finished and failed jobs are kept after they
+            end; older job directories are deleted on ``start`` and
+            ``submit``. Defaults to 0 (kept forever).
+        """
+
+        self.jobs_dir = Path(jobs_dir)
+        self.run_fn = run_fn
+        self.max_workers = max(1, int(max_workers))
+        self.persist_interval = persist_interval
+        self.max_queued = max(0, int(max_queued))
+        self.ttl = max(0.0, float(ttl))
+
+        # Jobs claimed by this process (queued or running here), with their claim file
+        self._jobs = {}
+        self._claims = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    # State persistence
+    def _job_dir(self, job_id):
+        return self.jobs_dir / job_id
+
+    def _load(self, job_id):
+        """
+        Read the persisted state of a job, or None if it does not exist.
+        """
+
+        if not self.JOB_ID.fullmatch(str(job_id)):
+            return None
+
+        try:
+            with open(self._job_dir(job_id) / self.STATE_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _claim(self, job_id):
+        """
+        Take the exclusive claim of a job for this process.
+
+        Returns
+        -------
+        bool
+            False if another process holds it (the job is running there).
+        """
+
+        fd = os.open(self._job_dir(job_id) / self.CLAIM_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+
+        with self._lock:
+            self._claims[job_id] = fd
+
+        return True
+
+    def _release(self, job_id):
+        """
+        Give up the claim of a job (takes ``self._lock``, so it must not be
+        held by the caller).
+        """
+
+        with self._lock:
+            fd = self._claims.pop(job_id, None)
+        if fd is not None:
+            os.close(fd)  # releases the lock
+
+    def _save(self, job):
+        """
+        Atomically write the state of a job to its ``job.json``.
+        """
+
+        path = self._job_dir(job["id"]) / self.STATE_FILE
+        tmp_path = path.with_suffix(".tmp")
+
+        with open(tmp_path, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, path)
+
+    def _update(self, job_id, persist: bool = True, **fields):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            snapshot = dict(job)
+
+        if persist:
+            self._save(snapshot)
+
+    # Lifecycle
+    def start(self):
+        """
+        Start the worker pool and reload the jobs persisted on disk.
+
+        Finished and failed jobs are served as they are; queued and running
+        jobs that no other process has claimed (interrupted by a restart)
+        are queued again.
+        """
+
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.sweep()
+        self._executor = ThreadPoolExecutor(
+                                            max_workers=self.max_workers,
+                                            thread_name_prefix="video-job",
+                                            )
+
+        for state_file in sorted(self.jobs_dir.glob(f"*/{self.STATE_FILE}")):
+            try:
+                with open(state_file) as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if job["status"] not in ("queued", "running") or not self._claim(job["id"]):
+                continue
+
+            # Claimed: re-read, another process may have finished it in the meantime
+            job = self._load(job["id"])
+            if job is None or job["status"] not in ("queued", "running"):
+                self._release(state_file.parent.name)
+                continue
+
+            with self._lock:
+                self._jobs[job["id"]] = job
+
+            self._update(job["id"], status="queued", frames_done=0, fps=None, eta_seconds=None, started=None)
+            self._executor.submit(self._run, job["id"])
+
+    def shutdown(self):
+        """
+        Stop the worker pool. Unfinished jobs resume on the next start.
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+        # Queued jobs can be claimed by another worker from now on
+        with self._lock:
+            queued = [job_id for job_id in self._claims if job_id in self._jobs and self._jobs[job_id]["status"] == "queued"]
+            for job_id in queued:
+                self._jobs.pop(job_id)
+
+        for job_id in queued:
+            self._release(job_id)
+
+    # Jobs
+    def full(self):
+        """
+        Whether a new job would exceed ``max_queued``.
+        """
+
+        with self._lock:
+            return bool(self.max_queued) and len(self._jobs) >= self.max_queued
+
+    def sweep(self):
+        """
+        Delete the directories of the jobs finished or failed more than
+        ``ttl`` seconds ago.
+
+        Returns
+        -------
+        int
+            Number of jobs deleted.
+        """
+
+        if not self.ttl:
+            return 0
+
+        deadline = time.time() - self.ttl
+        deleted = 0
+
+        for state_file in self.jobs_dir.glob(f"*/{self.STATE_FILE}"):
+            job = self._load(state_file.parent.name)
+            if job is None or job["status"] not in ("done", "failed") or (job["finished"] or 0) > deadline:
+                continue
+
+            shutil.rmtree(state_file.parent, ignore_errors=True)
+            deleted += 1
+
+        return deleted
+
+    def submit(self, upload_path, filename):
+        """
+        Create a job for an uploaded video and queue it.
+
+        Parameters
+        ----------
+        upload_path : str or pathlib.Path
+            Path to the uploaded video; the file is moved into the job
+            directory.
+        filename : str
+            Original filename of the upload.
+
+        Returns
+        -------
+        dict
+            Initial job state.
+
+        Raises
+        ------
+        JobQueueFullError
+            If this process already has ``max_queued`` unfinished jobs.
+        """
+
+        self.sweep()
+
+        job_id = uuid.uuid4().hex
+        input_path = self._job_dir(job_id) / f"input{Path(upload_path).suffix}"
+
+        job = {
+               "id": job_id,
+               "filename": filename,
+               "status": "queued",
+               "created": time.time(),
+               "started": None,
+               "finished": None,
+               "input": input_path.name,
+               "output": None,
+               "frames_done": 0,
+               "frames_total": None,
+               "fps": None,
+               "eta_seconds": None,
+               "error": None,
+               }
+
+        # Slot reserved before the upload is moved, so concurrent submits cannot exceed the cap
+        with self._lock:
+            if self.max_queued and len(self._jobs) >= self.max_queued:
+                raise JobQueueFullError("Video job queue is full.")
+            self._jobs[job_id] = job
+            snapshot = dict(job)
+
+        try:
+            self._job_dir(job_id).mkdir(parents=True)
+            self._claim(job_id)
+            shutil.move(str(upload_path), input_path)
+            self._save(snapshot)
+        except Exception:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            self._release(job_id)
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+            raise
+
+        self._executor.submit(self._run, job_id)  # type: ignore
+
+        return snapshot
+
+    def get(self, job_id):
+        """
+        Return a copy of the state of a job, or None if it does not exist.
+
+        Jobs run by this process are read from memory (latest progress),
+        the others from their ``job.json``.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+
+        return self._load(job_id)
+
+    def result_path(self, job_id):
+        """
+        Return the annotated video of a finished job, or None.
+        """
+
+        job = self.get(job_id)
+        if job is None or job["status"] != "done":
+            return None
+
+        return self._job_dir(job_id) / job["output"]
+
+    def detections_path(self, job_id):
+        """
+        Return the detections JSON of a finished job, or None.
+        """
+
+        job = self.get(job_id)
+        if job is None or job["status"] != "done":
+            return None
+
+        return self._job_dir(job_id) / self.DETECTIONS_FILE
+
+    def _run(self, job_id):
+        """
+        Process one job on a worker thread.
+        """
+
+        started = time.time()
+        last_persist = [0.0]
+        self._update(job_id, status="running", started=started)
+
+        def progress(frames_done, frames_total):
+            now = time.time()
+            fps = frames_done / max(now - started, 1e-6)
+            eta = (frames_total - frames_done) / fps if frames_total and fps > 0 else None
+
+            persist = now - last_persist[0] >= self.persist_interval
+            if persist:
+                last_persist[0] = now
+
+            self._update(
+                         job_id,
+                         persist=persist,
+                         frames_done=frames_done,
+                         frames_total=frames_total or None,
+                         fps=round(fps, 2),
+                         eta_seconds=round(eta, 1) if eta is not None else None,
+                         )
+
+        try:
+            job = self.get(job_id)
+            output_path, detections = self.run_fn(self._job_dir(job_id) / job["input"], progress)  # type: ignore
+
+            with open(self._job_dir(job_id) / self.DETECTIONS_FILE, "wb") as f:
+                f.write(detections)
+
+            self._update(
+                         job_id,
+                         status="done",
+                         finished=time.time(),
+                         output=Path(output_path).name,
+                         eta_seconds=0.0,
+                         )
+
+        except Exception as e:
+            self._update(
+                         job_id,
+                         status="failed",
+                         finished=time.time(),
+                         error=str(e),
+                         )
+
+        # Finished jobs are read from disk from now on
+        finally:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            self._release(job_id)
@@ -0,0 +1,237 @@
+# Imports
+import asyncio
+import time
+from collections import deque
+from outputs import frame_tracks_to_dict  # type: ignore
+
+# Out of docker in ROOT
+# from inference.outputs import frame_tracks_to_dict
+
+
+# Classes
+class LatestFrameSlot():
+    """
+    Single-slot buffer between the receiving and the processing side of a
+    live stream.
+
+    Putting a frame replaces the frame still waiting, if any: the processing
+    side always gets the most recent frame, and at most one frame waits
+    while another one is processed.
+    """
+
+    def __init__(self):
+        self._item = None
+        self._closed = False
+        self._ready = asyncio.Event()
+
+    def put(self, item):
+        """
+        Store a frame, returning the frame it replaced (dropped) or None.
+        """
+
+        replaced, self._item = self._item, item
+        self._ready.set()
+
+        return replaced
+
+    def close(self):
+        """
+        Wake the processing side up; ``get`` returns None once empty.
+        """
+
+        self._closed = True
+        self._ready.set()
+
+    async def get(self):
+        """
+        Wait for a frame and take it out of the slot (None when closed).
+        """
+
+        while self._item is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+        item, self._item = self._item, None
+
+        return item
+
+
+class LiveSession():
+    """
+    Detection and tracking of one live stream (e.g. a WebSocket connection
+    fed by a camera).
+
+    Encoded frames are received as fast as the client sends them, so they
+    never queue up in the connection. When inference falls behind, the
+    frame waiting in the ``LatestFrameSlot`` is replaced by the newer one
+    and counted as dropped: latency stays bounded by about two inference
+    times instead of growing with the backlog. The tracker is told how many
+    frames were skipped (Norfair ``period``) so that tracks age with the
+    stream time.
+
+    Every processed frame is answered with one message: the tracked
+    objects, the latency since the frame was received, and the session
+    statistics (frames received, processed, dropped and failed, processing
+    and input frame rates).
+    """
+
+    def __init__(self, infer, decode, executor=None, frame_callback=None, window: int = 30):
+        """
+        Initialize the session.
+
+        Parameters
+        ----------
+        infer : InferenceVideo
+            Inference pipeline of this stream; its tracker keeps the track
+            ids across frames (``InferenceVideo.process_frame``).
+        decode : callable
+            Blocking function decoding the received bytes into a BGR frame;
+            raises ``ValueError`` for invalid data.
+        executor : callable, optional
+            Coroutine function running a blocking call as
+            ``await executor(fn, *args)`` (e.g. ``InferencePool.execute``).
+            Defaults to the event loop's default executor.
+        frame_callback : callable, optional
+            Called as ``frame_callback(status, latency)`` for every frame,
+            with ``status`` in ``"processed"``, ``"dropped"`` and
+            ``"failed"``, and the latency in seconds (None unless
+            processed).
+        window : int, optional
+            Number of recent frames over which the frame rates are
+            measured. Defaults to 30.
+        """
+
+        self.infer = infer
+        self.decode = decode
+        self.executor = executor
+        self.frame_callback = frame_callback
+
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.started = time.time()
+        self._received_times = deque(maxlen=max(2, int(window)))
+        self._processed_times = deque(maxlen=max(2, int(window)))
+        self._last_seq = None
+
+    @staticmethod
+    def _rate(times):
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def _report(self, status: str, latency=None):
+        if self.frame_callback is not None:
+            self.frame_callback(status, latency)
+
+    def stats(self):
+        """
+        Frames received, processed, dropped and failed, and the processing
+        and input frame rates over the recent frames.
+        """
+
+        return {
+                "received": self.received,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "fps": round(self._rate(self._processed_times), 2),
+                "input_fps": round(self._rate(self._received_times), 2),
+                "uptime_s": round(time.time() - self.started, 1),
+                }
+
+    def _process(self, data, seq: int, period: int):
+        """
+        Decode, detect and track one frame (blocking).
+        """
+
+        frame = self.decode(data)
+
+        return self.infer.process_frame(frame, seq, period)
+
+    async def _execute(self, fn, *args):
+        if self.executor is not None:
+            return await self.executor(fn, *args)
+
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def _receive_loop(self, receive, slot):
+        while True:
+            data = await receive()
+            if data is None:
+                break
+
+            now = time.perf_counter()
+            self._received_times.append(now)
+            replaced = slot.put((self.received, now, data))
+            self.received += 1
+
+            if replaced is not None:
+                self.dropped += 1
+                self._report("dropped")
+
+        slot.close()
+
+    async def _process_loop(self, send, slot):
+        while True:
+            item = await slot.get()
+            if item is None:
+                break
+
+            seq, received_at, data = item
+            period = seq - self._last_seq if self._last_seq is not None else 1
+
+            try:
+                tracked = await self._execute(self._process, data, seq, period)
+
+            except ValueError as e:
+                self.failed += 1
+                self._report("failed")
+                await send({"type": "error", "seq": seq, "detail": str(e), "stats": self.stats()})
+                continue
+
+            self._last_seq = seq
+            self.processed += 1
+            self._processed_times.append(time.perf_counter())
+            latency = time.perf_counter() - received_at
+            self._report("processed", latency)
+
+            await send({
+                        "type": "detections",
+                        "seq": seq,
+                        **frame_tracks_to_dict(tracked, self.infer.model.names, self.infer.frame_shape),
+                        "latency_ms": round(latency * 1000, 1),
+                        "stats": self.stats(),
+                        })
+
+    async def run(self, receive, send):
+        """
+        Serve the stream until the client disconnects.
+
+        Parameters
+        ----------
+        receive : callable
+            Coroutine function returning the next encoded frame (bytes), or
+            None when the client disconnected.
+        send : callable
+            Coroutine function sending one JSON-serializable message.
+        """
+
+        slot = LatestFrameSlot()
+        receiver = asyncio.create_task(self._receive_loop(receive, slot))
+        processor = asyncio.create_task(self._process_loop(send, slot))
+
+        # Stop at the disconnection (frame in progress discarded) or on the first error
+        try:
+            done, _ = await asyncio.wait({receiver, processor}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (receiver, processor):
+                task.cancel()
+            await asyncio.gather(receiver, processor, return_exceptions=True)
+
+        for task in done:
+            task.result()
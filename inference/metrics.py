@@ -0,0 +1,249 @@
+# Imports
+import os
+import time
+from contextlib import contextmanager
+from prometheus_client import (
+                               CONTENT_TYPE_LATEST,
+                               REGISTRY,
+                               CollectorRegistry,
+                               Counter,
+                               Gauge,
+                               Histogram,
+                               generate_latest,
+                               multiprocess,
+                               )
+from starlette.routing import Match
+from profiling import current_trace, record_stage  # type: ignore
+
+# Out of docker in ROOT
+# from inference.profiling import current_trace, record_stage
+
+# Histogram buckets (seconds)
+REQUEST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Ultralytics ``Results.speed`` keys (milliseconds per image) to stage names
+SPEED_STAGES = {"preprocess": "preprocess", "inference": "forward", "postprocess": "postprocess"}
+
+# Metrics
+REQUESTS = Counter(
+                   "api_requests_total",
+                   "HTTP requests by endpoint, method and status code.",
+                   ["endpoint", "method", "status"],
+                   )
+REQUEST_LATENCY = Histogram(
+                            "api_request_duration_seconds",
+                            "HTTP request latency, until the last byte of the response.",
+                            ["endpoint"],
+                            buckets=REQUEST_BUCKETS,
+                            )
+IN_FLIGHT = Gauge(
+                  "api_requests_in_flight",
+                  "HTTP requests being processed.",
+                  ["endpoint"],
+                  multiprocess_mode="livesum",
+                  )
+STAGE_LATENCY = Histogram(
+                          "inference_stage_duration_seconds",
+                          "Time per image or video frame spent in each processing stage.",
+                          ["pipeline", "stage"],
+                          buckets=STAGE_BUCKETS,
+                          )
+VIDEO_FRAMES = Counter(
+                       "video_frames_total",
+                       "Video frames processed, by detector mode (inferred or interpolated).",
+                       ["mode"],
+                       )
+VIDEO_FPS = Histogram(
+                      "video_processing_fps",
+                      "Processing throughput of each video, in frames per second.",
+                      buckets=(1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 240),
+                      )
+LIVE_CONNECTIONS = Gauge(
+                         "live_connections",
+                         "Open live stream (WebSocket) connections.",
+                         multiprocess_mode="livesum",
+                         )
+LIVE_FRAMES = Counter(
+                      "live_frames_total",
+                      "Live stream frames, by outcome (processed, dropped or failed).",
+                      ["status"],
+                      )
+LIVE_LATENCY = Histogram(
+                         "live_frame_latency_seconds",
+                         "Live stream frame latency, from the frame received to its detections sent.",
+                         buckets=STAGE_BUCKETS + (5.0, 10.0),
+                         )
+MODEL_LOADS = Counter(
+                      "model_loads_total",
+                      "Model weights loaded by the model registry.",
+                      )
+MODEL_LOAD_LATENCY = Histogram(
+                               "model_load_duration_seconds",
+                               "Model loading time, warmup included.",
+                               buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+                               )
+
+
+# Functions
+def observe_stage(pipeline: str, stage: str, seconds: float):
+    """
+    Record the time spent by one image or frame in a stage (histogram, and
+    ``Server-Timing`` of the current request).
+    """
+
+    STAGE_LATENCY.labels(pipeline, stage).observe(seconds)
+    record_stage(stage, seconds)
+
+
+def stage_recorder(pipeline: str):
+    """
+    Build a stage callback (``InferenceVideo``) bound to the current request.
+
+    The trace is captured here, on the request side: the video decode and
+    encode threads do not inherit the context of the request.
+    """
+
+    trace = current_trace()
+
+    def observe(stage: str, seconds: float):
+        STAGE_LATENCY.labels(pipeline, stage).observe(seconds)
+        if trace is not None:
+            trace.record(stage, seconds)
+
+    return observe
+
+
+@contextmanager
+def stage_timer(pipeline: str, stage: str):
+    """
+    Time the enclosed block as one observation of a stage.
+    """
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(pipeline, stage, time.perf_counter() - start)
+
+
+def observe_speed(pipeline: str, result):
+    """
+    Record the preprocess, forward and postprocess (NMS) times measured by
+    Ultralytics for one image (``Results.speed``, per image of the batch).
+    """
+
+    for key, stage in SPEED_STAGES.items():
+        value = result.speed.get(key)
+        if value is not None:
+            observe_stage(pipeline, stage, value / 1000)
+
+
+def observe_video(frames_inferred: int, frames_interpolated: int, seconds: float):
+    """
+    Record the frames and the throughput of one processed video.
+    """
+
+    VIDEO_FRAMES.labels("inferred").inc(frames_inferred)
+    VIDEO_FRAMES.labels("interpolated").inc(frames_interpolated)
+
+    frames = frames_inferred + frames_interpolated
+    if frames and seconds > 0:
+        VIDEO_FPS.observe(frames / seconds)
+
+
+def live_connection():
+    """
+    Context manager counting one open live stream connection.
+    """
+
+    return LIVE_CONNECTIONS.track_inprogress()
+
+
+def observe_live_frame(status: str, latency=None):
+    """
+    Record the outcome of one live stream frame (``processed``,
+    ``dropped`` or ``failed``) and, when processed, its latency.
+    """
+
+    LIVE_FRAMES.labels(status).inc()
+    if latency is not None:
+        LIVE_LATENCY.observe(latency)
+
+
+def observe_model_load(weights, seconds: float):
+    """
+    Record a model load (``ModelRegistry`` load callback).
+    """
+
+    MODEL_LOADS.inc()
+    MODEL_LOAD_LATENCY.observe(seconds)
+
+
+def render_metrics():
+    """
+    Render every metric in the Prometheus text format.
+
+    When ``PROMETHEUS_MULTIPROC_DIR`` is set (several API workers, or the
+    process worker pool), the values of all the processes are aggregated.
+
+    Returns
+    -------
+    tuple of (bytes, str)
+        Content and media type.
+    """
+
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+# Classes
+class MetricsMiddleware():
+    """
+    ASGI middleware counting HTTP requests, measuring their latency and
+    tracking the requests in flight, labelled by route template (e.g.
+    ``/jobs/{job_id}``, so the label set stays bounded).
+
+    The latency ends with the last byte of the response, so streamed videos
+    are measured in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _endpoint(scope):
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self._endpoint(scope)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = IN_FLIGHT.labels(endpoint)
+        in_flight.inc()
+        start = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(endpoint).observe(time.perf_counter() - start)
+            REQUESTS.labels(endpoint, scope["method"], str(status["code"])).inc()
+            in_flight.dec()
@@ -0,0 +1,173 @@
+# Imports
+import io
+import json
+import numpy as np
+
+
+# Helper functions
+def _track_object(row, names):
+    """
+    JSON-serializable dict of one tracked object row
+    ``[frame, track_id, x1, y1, x2, y2, conf, class_id]``.
+    """
+
+    return {
+            "id": int(row[1]),
+            "bbox": [round(float(v), 1) for v in row[2:6]],
+            "confidence": round(float(row[6]), 4),
+            "class_id": int(row[7]),
+            "class_name": names[int(row[7])],
+            }
+
+
+# Functions
+def detections_to_dict(detections, names, shape):
+    """
+    Convert the detections of an image into a JSON-serializable dict.
+
+    Parameters
+    ----------
+    detections : np.ndarray
+        Array of shape (N, 6) with rows ``[x1, y1, x2, y2, conf, class_id]``.
+    names : dict
+        Mapping from class index to class name.
+    shape : tuple
+        Image shape ``(H, W, ...)``.
+
+    Returns
+    -------
+    dict
+        Image size and list of detections (box, confidence, class).
+    """
+
+    return {
+            "width": int(shape[1]),
+            "height": int(shape[0]),
+            "detections": [
+                           {
+                            "bbox": [round(float(v), 1) for v in row[:4]],
+                            "confidence": round(float(row[4]), 4),
+                            "class_id": int(row[5]),
+                            "class_name": names[int(row[5])],
+                            }
+                           for row in detections
+                           ],
+            }
+
+
+def detections_to_json(detections, names, shape):
+    """
+    Serialize the detections of an image as JSON.
+
+    Parameters
+    ----------
+    detections : np.ndarray
+        Array of shape (N, 6) with rows ``[x1, y1, x2, y2, conf, class_id]``.
+    names : dict
+        Mapping from class index to class name.
+    shape : tuple
+        Image shape ``(H, W, ...)``.
+
+    Returns
+    -------
+    bytes
+        UTF-8 encoded JSON document.
+    """
+
+    return json.dumps(detections_to_dict(detections, names, shape)).encode("utf-8")
+
+
+def frame_tracks_to_dict(tracked, names, shape):
+    """
+    Convert the tracked objects of a single frame into a JSON-serializable
+    dict (one message of the live stream).
+
+    Parameters
+    ----------
+    tracked : np.ndarray
+        Array of shape (K, 8) with rows
+        ``[frame, track_id, x1, y1, x2, y2, conf, class_id]``.
+    names : dict
+        Mapping from class index to class name.
+    shape : tuple
+        Frame shape ``(H, W, ...)``.
+
+    Returns
+    -------
+    dict
+        Frame size and list of tracked objects (track id, box, confidence,
+        class), in the format of the ``frames`` of ``tracks_to_json``.
+    """
+
+    return {
+            "width": int(shape[1]),
+            "height": int(shape[0]),
+            "objects": [_track_object(row, names) for row in tracked],
+            }
+
+
+def tracks_to_json(tracks, names, shape, fps, stats=None):
+    """
+    Serialize the tracked objects of a video as JSON, grouped by frame.
+
+    Parameters
+    ----------
+    tracks : np.ndarray
+        Array of shape (M, 8) with rows
+        ``[frame, track_id, x1, y1, x2, y2, conf, class_id]``.
+    names : dict
+        Mapping from class index to class name.
+    shape : tuple
+        Frame shape ``(H, W, ...)``.
+    fps : float
+        Frame rate of the video.
+    stats : dict, optional
+        Extra run statistics added to the document (e.g. frames inferred
+        and interpolated).
+
+    Returns
+    -------
+    bytes
+        UTF-8 encoded JSON document.
+    """
+
+    frames = {}
+
+    for row in tracks:
+        frames.setdefault(int(row[0]), []).append(_track_object(row, names))
+
+    payload = {
+               "width": int(shape[1]),
+               "height": int(shape[0]),
+               "fps": float(fps),
+               "frames": [
+                          {"frame": frame, "objects": objects}
+                          for frame, objects in sorted(frames.items())
+                          ],
+               }
+
+    if stats:
+        payload.update(stats)
+
+    return json.dumps(payload).encode("utf-8")
+
+
+def array_to_npy(array):
+    """
+    Serialize a detections or tracks array in the compact ``.npy`` format.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        Detections (N, 6) or tracks (M, 8) array.
+
+    Returns
+    -------
+    bytes
+        ``.npy`` file contents (float32), loadable with ``np.load``.
+    """
+
+    buffer = io.BytesIO()
+    np.save(buffer, np.ascontiguousarray(array, dtype=np.float32))
+
+    return buffer.getvalue()
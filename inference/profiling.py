@@ -0,0 +1,341 @@
+# Imports
+import sys
+import json
+import time
+import hmac
+import uuid
+import random
+import asyncio
+import threading
+import contextvars
+from pathlib import Path
+from collections import Counter
+
+# Trace of the request being served (propagated to the inference pool threads)
+_current_trace = contextvars.ContextVar("request_trace", default=None)
+
+
+# Helper functions
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def _stack(frame):
+    """
+    Call stack of a frame, from the outermost call to the frame itself.
+    """
+
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+
+    return tuple(reversed(names))
+
+
+# Functions
+def current_trace():
+    """
+    Return the ``RequestTrace`` of the request being served, or None.
+    """
+
+    return _current_trace.get()
+
+
+def record_stage(stage: str, seconds: float):
+    """
+    Add the time spent in a stage to the trace of the current request (no-op
+    outside a request).
+    """
+
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(stage, seconds)
+
+
+def traced_call(fn, *args, **kwargs):
+    """
+    Run ``fn`` on the calling thread, sampled by the profiler of the current
+    request while it runs (if the request is profiled).
+    """
+
+    trace = _current_trace.get()
+    if trace is None or trace.profiler is None:
+        return fn(*args, **kwargs)
+
+    ident = threading.get_ident()
+    trace.profiler.add_thread(ident)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        trace.profiler.remove_thread(ident)
+
+
+# Classes
+class SamplingProfiler():
+    """
+    Statistical profiler for the threads working on one request.
+
+    A background thread samples the call stacks of the registered threads
+    every ``interval`` seconds (``sys._current_frames``); the time of a call
+    is estimated as its number of samples times the interval. Unlike a
+    tracing profiler, the profiled code is not slowed down, and only the
+    threads registered for the request are sampled, not the other requests
+    served at the same time.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Initialize the profiler.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Sampling interval, in seconds. Defaults to 0.005.
+        """
+
+        self.interval = max(0.0005, float(interval))
+        self.samples = Counter()
+        self.count = 0
+
+        self._threads = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def add_thread(self, ident):
+        with self._lock:
+            self._threads.add(ident)
+
+    def remove_thread(self, ident):
+        with self._lock:
+            self._threads.discard(ident)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = list(self._threads)
+            if not threads:
+                continue
+
+            frames = sys._current_frames()
+            for ident in threads:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.samples[_stack(frame)] += 1
+                    self.count += 1
+
+    def start(self):
+        self._sampler = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def call_tree(self):
+        """
+        Build the call tree of the samples.
+
+        Returns
+        -------
+        list of dict
+            Root calls, each with ``name``, ``samples``, ``ms`` (inclusive),
+            ``self_ms`` and ``children`` (same structure), by decreasing
+            time.
+        """
+
+        root = {"children": {}}
+        for stack, count in self.samples.items():
+            node = root
+            for name in stack:
+                node = node["children"].setdefault(name, {"name": name, "samples": 0, "self": 0, "children": {}})
+                node["samples"] += count
+            node["self"] += count
+
+        def export(node):
+            return {
+                    "name": node["name"],
+                    "samples": node["samples"],
+                    "ms": round(node["samples"] * self.interval * 1000, 1),
+                    "self_ms": round(node["self"] * self.interval * 1000, 1),
+                    "children": sorted((export(c) for c in node["children"].values()), key=lambda c: -c["samples"]),
+                    }
+
+        return sorted((export(c) for c in root["children"].values()), key=lambda c: -c["samples"])
+
+    def folded(self):
+        """
+        Samples in the folded stacks format (one ``a;b;c count`` line per
+        stack), readable by flame graph tools.
+        """
+
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common())
+
+
+class RequestTrace():
+    """
+    Stage timings of one request, and its profiler when it is sampled.
+    """
+
+    def __init__(self, profiler=None):
+        """
+        Initialize an empty trace.
+
+        Parameters
+        ----------
+        profiler : SamplingProfiler, optional
+            Profiler of the request. Defaults to None (not profiled).
+        """
+
+        self.id = uuid.uuid4().hex[:12]
+        self.profiler = profiler
+        self.stages = {}  # stage -> [seconds, observations], in order of first appearance
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            total = self.stages.setdefault(stage, [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+
+    def server_timing(self, total_seconds: float):
+        """
+        Build the ``Server-Timing`` header value: time per stage (summed
+        over the frames of a video, with their number in ``desc``) and the
+        total time until the response started.
+        """
+
+        with self._lock:
+            stages = list(self.stages.items())
+
+        metrics = []
+        for stage, (seconds, count) in stages:
+            metric = f"{stage};dur={seconds * 1000:.1f}"
+            if count > 1:
+                metric += f';desc="{count}x"'
+            metrics.append(metric)
+
+        metrics.append(f"total;dur={total_seconds * 1000:.1f}")
+
+        return ", ".join(metrics)
+
+
+class ProfilingMiddleware():
+    """
+    ASGI middleware adding a ``Server-Timing`` header with the stage
+    timings of every request, and profiling sampled requests.
+
+    A request is profiled when it carries the ``X-Profile: <token>`` header
+    (if a ``token`` is set) or, at random, with probability ``sample_rate``.
+    Its call tree is written to ``profile_dir`` as ``<id>.json`` (with the
+    stage timings) and ``<id>.folded``; the id is returned in the
+    ``X-Profile-Id`` header. Only the ``max_profiles`` most recent profiles
+    are kept.
+    """
+
+    def __init__(self, app, profile_dir, sample_rate: float = 0.0, token: str = "", interval: float = 0.005, max_profiles: int = 100):
+        """
+        Initialize the middleware.
+
+        Parameters
+        ----------
+        app : ASGI application
+            Wrapped application.
+        profile_dir : str or pathlib.Path
+            Directory of the profiles.
+        sample_rate : float, optional
+            Fraction of the requests profiled at random. Defaults to 0.0.
+        token : str, optional
+            Shared secret clients send as ``X-Profile: <token>`` to request
+            a profile. Defaults to "" (header ignored).
+        interval : float, optional
+            Sampling interval of the profiler, in seconds. Defaults to
+            0.005.
+        max_profiles : int, optional
+            Number of profiles kept in ``profile_dir``; the oldest are
+            deleted. Defaults to 100.
+        """
+
+        self.app = app
+        self.profile_dir = Path(profile_dir)
+        self.sample_rate = sample_rate
+        self.token = token.encode("latin-1")
+        self.interval = interval
+        self.max_profiles = max(1, int(max_profiles))
+        self._write_lock = threading.Lock()
+
+    def _sampled(self, scope):
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == b"x-profile" and hmac.compare_digest(value, self.token):
+                    return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _prune(self):
+        """
+        Delete the oldest profiles beyond ``max_profiles``.
+        """
+
+        profiles = []
+        for path in self.profile_dir.glob("*.json"):
+            try:
+                profiles.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+
+        for _, path in sorted(profiles)[:-self.max_profiles]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".folded").unlink(missing_ok=True)
+
+    def _write_profile(self, trace, scope, seconds):
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+        profile = {
+                   "id": trace.id,
+                   "method": scope["method"],
+                   "path": scope["path"],
+                   "query": scope["query_string"].decode("latin-1"),
+                   "duration_ms": round(seconds * 1000, 1),
+                   "interval_ms": trace.profiler.interval * 1000,
+                   "samples": trace.profiler.count,
+                   "stages_ms": {stage: round(total * 1000, 1) for stage, (total, _) in trace.stages.items()},
+                   "call_tree": trace.profiler.call_tree(),
+                   }
+
+        with self._write_lock:
+            (self.profile_dir / f"{trace.id}.folded").write_text(trace.profiler.folded())
+            (self.profile_dir / f"{trace.id}.json").write_text(json.dumps(profile, indent=1))
+            self._prune()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(SamplingProfiler(self.interval) if self._sampled(scope) else None)
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing(time.perf_counter() - start).encode("latin-1")))
+                if trace.profiler is not None:
+                    headers.append((b"x-profile-id", trace.id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        if trace.profiler is not None:
+            trace.profiler.start()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+
+        finally:
+            _current_trace.reset(token)
+            if trace.profiler is not None:
+                trace.profiler.stop()
+                await asyncio.to_thread(self._write_profile, trace, scope, time.perf_counter() - start)
@@ -0,0 +1,201 @@
+# Imports
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+from ultralytics import YOLO  # type: ignore
+
+
+# Classes
+class SharedModel():
+    """
+    Process-wide YOLOv8 model handed out by the ``ModelRegistry``.
+
+    The wrapper exposes the subset of the Ultralytics ``YOLO`` interface used
+    by the inference pipelines (``predict``, ``__call__`` and ``names``), so
+    it can be passed wherever a ``YOLO`` instance is expected. Every forward
+    pass is serialized with a lock because the Ultralytics predictor keeps
+    per-call state and is not safe to share between threads.
+
+    ONNX models (exported with ``ModelYoloV8.export_onnx``) are loaded the
+    same way and run on ONNX Runtime behind the same interface.
+    """
+
+    def __init__(self, weights, sha256):
+        """
+        Load the model weights.
+
+        Parameters
+        ----------
+        weights : str or pathlib.Path
+            Path to the YOLOv8 model weights file (``.pt`` or ``.onnx``).
+        sha256 : str
+            SHA-256 digest of the weights file, used as the model identity.
+        """
+
+        self.path = Path(weights)
+        self.sha256 = sha256
+        self.model = YOLO(str(weights), task="detect")
+        self.names = self.model.names
+        self.lock = threading.Lock()
+
+    def predict(self, *args, **kwargs):
+        """
+        Thread-safe wrapper around ``YOLO.predict``.
+        """
+
+        with self.lock:
+            return self.model.predict(*args, **kwargs)
+
+    def __call__(self, *args, **kwargs):
+        """
+        Thread-safe wrapper around ``YOLO.__call__``.
+        """
+
+        with self.lock:
+            return self.model(*args, **kwargs)
+
+    def warmup(self, imgsz=640):
+        """
+        Run a single dummy forward pass.
+
+        The first call of an Ultralytics model builds the predictor, fuses
+        layers and allocates buffers. Doing it once at load time keeps that
+        cost out of the first real request.
+
+        Parameters
+        ----------
+        imgsz : int, optional
+            Inference size used for the dummy image. Defaults to 640.
+        """
+
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        self.predict(source=dummy, imgsz=imgsz, verbose=False)
+
+
+class ModelRegistry():
+    """
+    LRU registry of loaded YOLOv8 models.
+
+    Each weights file is loaded (and warmed up) once and then shared by every
+    caller. Entries are keyed by the resolved path plus the file mtime and
+    size, so replacing a weights file on disk transparently triggers a reload,
+    and the SHA-256 of the file is kept as the model identity. When more than
+    ``capacity`` weights files are in use, the least recently used model is
+    evicted.
+    """
+
+    def __init__(self, capacity: int = 3, warmup: bool = True, load_callback=None):
+        """
+        Initialize an empty registry.
+
+        Parameters
+        ----------
+        capacity : int, optional
+            Maximum number of models kept in memory. Defaults to 3
+            (baseline, best_final and baseline_tunned).
+        warmup : bool, optional
+            Whether to run a dummy forward pass right after loading.
+            Defaults to True.
+        load_callback : callable, optional
+            Called after every load as ``load_callback(weights, seconds)``
+            (warmup included), e.g. to export load metrics.
+        """
+
+        self.capacity = capacity
+        self.warmup = warmup
+        self.load_callback = load_callback
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_key(weights):
+        """
+        Build the cache key for a weights file from its path and stat.
+        """
+
+        path = Path(weights).resolve()
+        stat = path.stat()
+
+        return (str(path), stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _file_sha256(path, chunk_size: int = 1 << 20):
+        """
+        Compute the SHA-256 digest of a file, reading it in chunks.
+        """
+
+        digest = hashlib.sha256()
+
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def get(self, weights):
+        """
+        Return the shared model for a weights file, loading it if needed.
+
+        Parameters
+        ----------
+        weights : str or pathlib.Path
+            Path to the YOLOv8 model weights file.
+
+        Returns
+        -------
+        SharedModel
+            Loaded and warmed-up model shared by all callers.
+        """
+
+        key = self._file_key(weights)
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+
+            # Drop stale entries of the same file (weights replaced on disk)
+            for stale in [k for k in self._models if k[0] == key[0]]:
+                del self._models[stale]
+
+            start = time.perf_counter()
+            model = SharedModel(key[0], self._file_sha256(key[0]))
+            if self.warmup:
+                model.warmup()
+            if self.load_callback is not None:
+                self.load_callback(key[0], time.perf_counter() - start)
+
+            self._models[key] = model
+
+            while len(self._models) > self.capacity:
+                self._models.popitem(last=False)
+
+            return model
+
+    def loaded(self):
+        """
+        Return a summary of the models currently held in memory.
+
+        Returns
+        -------
+        list of dict
+            One entry per model, from least to most recently used, with the
+            weights path and SHA-256 digest.
+        """
+
+        with self._lock:
+            return [
+                    {"path": str(m.path), "sha256": m.sha256}
+                    for m in self._models.values()
+                    ]
+
+    def clear(self):
+        """
+        Drop every loaded model.
+        """
+
+        with self._lock:
+            self._models.clear()
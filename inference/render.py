@@ -0,0 +1,228 @@
+# Imports
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+# Box and label color of each class (BGR)
+CLASS_COLORS = {
+                "can": (255, 0, 0),               # blue
+                "foam": (0, 255, 255),            # yellow
+                "plastic": (0, 255, 0),           # green
+                "plastic bottle": (0, 165, 255),  # orange
+                "unknow": (128, 128, 128),        # gray
+                }
+DEFAULT_COLOR = (255, 255, 255)
+
+
+# Classes
+class LabelAtlas():
+    """
+    Cache of rasterized label texts.
+
+    Rasterizing anti-aliased text (``cv2.putText``) is the most expensive
+    part of drawing a frame. Each text is rendered once per color into a
+    coverage mask; drawing it again only blends the cached mask into the
+    frame. Labels are drawn as segments (e.g. ``"ID 7 | plastic"`` and
+    ``" 0.84"``) so that the cache stays small while the confidence changes
+    from frame to frame. Thread-safe; least recently used entries are
+    evicted beyond ``capacity``.
+    """
+
+    def __init__(self, font: int = cv2.FONT_HERSHEY_SIMPLEX, scale: float = 0.55, thickness: int = 2, capacity: int = 4096):
+        """
+        Initialize an empty atlas.
+
+        Parameters
+        ----------
+        font : int, optional
+            OpenCV Hershey font. Defaults to ``cv2.FONT_HERSHEY_SIMPLEX``.
+        scale : float, optional
+            Font scale. Defaults to 0.55.
+        thickness : int, optional
+            Stroke thickness, in pixels. Defaults to 2.
+        capacity : int, optional
+            Maximum number of cached (text, color) entries. Defaults to
+            4096.
+        """
+
+        self.font = font
+        self.scale = scale
+        self.thickness = thickness
+        self.capacity = capacity
+
+        # Common line box of every text (anti-aliased strokes overflow by the thickness)
+        (_, self.ascent), self.descent = cv2.getTextSize("Ag|", font, scale, thickness)
+        self.pad = thickness
+        self.height = self.ascent + self.descent + 2 * self.pad
+
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _render(self, text: str, color):
+        (width, _), _ = cv2.getTextSize(text, self.font, self.scale, self.thickness)
+
+        mask = np.zeros((self.height, width + 2 * self.pad), np.uint8)
+        cv2.putText(mask, text, (self.pad, self.pad + self.ascent), self.font, self.scale, 255, self.thickness, cv2.LINE_AA)
+
+        alpha = mask.astype(np.float32) / 255
+        fill = np.empty((*mask.shape, 3), np.uint8)
+        fill[:] = color
+
+        # Pen advance: the text width counts the stroke thickness once
+        return fill, alpha, 1 - alpha, width - self.thickness
+
+    def get(self, text: str, color):
+        """
+        Return the cached entry of a text and color, rendering it on a miss.
+
+        Returns
+        -------
+        tuple
+            Color fill (H, W, 3) uint8, coverage (H, W) float32, its
+            complement and the pen advance in pixels.
+        """
+
+        key = (text, color)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._render(text, color)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def draw(self, frame, text: str, color, x: int, y: int):
+        """
+        Draw a text in place, like ``cv2.putText`` with ``(x, y)`` as the
+        bottom-left corner (baseline) of the text.
+
+        Returns
+        -------
+        int
+            Pen position after the text, to draw the next segment.
+        """
+
+        fill, alpha, inverse, advance = self.get(text, color)
+
+        # Clip the text box to the frame
+        top, left = y - self.ascent - self.pad, x - self.pad
+        y0, x0 = max(0, -top), max(0, -left)
+        y1 = min(fill.shape[0], frame.shape[0] - top)
+        x1 = min(fill.shape[1], frame.shape[1] - left)
+
+        if y1 > y0 and x1 > x0:
+            roi = frame[top + y0:top + y1, left + x0:left + x1]
+            roi[:] = cv2.blendLinear(fill[y0:y1, x0:x1], roi, alpha[y0:y1, x0:x1], inverse[y0:y1, x0:x1])
+
+        return x + advance
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class Renderer():
+    """
+    Draw boxes and labels into frames in place (no copy of the frame).
+
+    Boxes are drawn with one ``cv2.polylines`` call per color, and labels
+    are blended from a ``LabelAtlas`` instead of rasterized every frame.
+    Same colors, thickness, font and positions as drawing each object with
+    ``cv2.rectangle`` and ``cv2.putText``; the labels are drawn over all the
+    boxes.
+    """
+
+    def __init__(self, names, colors=None, thickness: int = 2, atlas=None):
+        """
+        Initialize the renderer.
+
+        Parameters
+        ----------
+        names : dict or list
+            Class names by class id (``model.names``).
+        colors : dict, optional
+            Color (BGR) by class name. Defaults to ``CLASS_COLORS``.
+        thickness : int, optional
+            Box thickness, in pixels. Defaults to 2.
+        atlas : LabelAtlas, optional
+            Label cache. Defaults to the atlas shared by every renderer of
+            the process.
+        """
+
+        self.names = names
+        self.colors = CLASS_COLORS if colors is None else colors
+        self.thickness = thickness
+        self.atlas = atlas if atlas is not None else SHARED_ATLAS
+
+    def _color(self, class_id):
+        return self.colors.get(self.names[int(class_id)], DEFAULT_COLOR)
+
+    def draw_boxes(self, frame, boxes, class_ids):
+        """
+        Draw boxes ``[x1, y1, x2, y2]`` in place, batched by class color.
+        """
+
+        if not len(boxes):
+            return
+
+        b = np.asarray(boxes).astype(np.int32)
+        corners = np.stack([b[:, [0, 1]], b[:, [2, 1]], b[:, [2, 3]], b[:, [0, 3]]], axis=1)
+        class_ids = np.asarray(class_ids).astype(np.int64)
+
+        for class_id in np.unique(class_ids):
+            cv2.polylines(frame, list(corners[class_ids == class_id]), True, self._color(class_id), self.thickness)
+
+    def draw_labels(self, frame, boxes, class_ids, confs, prefixes=None):
+        """
+        Draw ``"{prefix}{class} {conf:.2f}"`` above each box, in place.
+        """
+
+        for i, (x1, y1, _, _) in enumerate(np.asarray(boxes).astype(np.int32)):
+            class_id = int(class_ids[i])
+            color = self._color(class_id)
+            label = self.names[class_id]
+            if prefixes is not None:
+                label = prefixes[i] + label
+
+            x = self.atlas.draw(frame, label, color, int(x1), max(0, int(y1) - 8))
+            self.atlas.draw(frame, f" {float(confs[i]):.2f}", color, x, max(0, int(y1) - 8))
+
+    def draw_detections(self, frame, detections):
+        """
+        Draw detections (rows ``[x1, y1, x2, y2, conf, class_id]``) in place.
+        """
+
+        detections = np.asarray(detections).reshape(-1, 6)
+        self.draw_boxes(frame, detections[:, :4], detections[:, 5])
+        self.draw_labels(frame, detections[:, :4], detections[:, 5], detections[:, 4])
+
+        return frame
+
+    def draw_tracks(self, frame, tracked):
+        """
+        Draw tracked objects (rows ``[frame, track_id, x1, y1, x2, y2, conf,
+        class_id]``) in place, labelled ``"ID {track_id} | {class} {conf}"``.
+        """
+
+        tracked = np.asarray(tracked).reshape(-1, 8)
+        self.draw_boxes(frame, tracked[:, 2:6], tracked[:, 7])
+        self.draw_labels(frame, tracked[:, 2:6], tracked[:, 7], tracked[:, 6], [f"ID {int(t)} | " for t in tracked[:, 1]])
+
+        return frame
+
+
+# Label cache shared by the renderers of the process (labels repeat across requests)
+SHARED_ATLAS = LabelAtlas()
@@ -0,0 +1,136 @@
+# Imports
+import os
+import math
+from pathlib import Path
+import cv2
+import torch
+
+# cgroup CPU quota files: v2 ("<quota> <period>" or "max <period>"), v1 (quota, period)
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_CPU_DIRS = (Path("/sys/fs/cgroup/cpu"), Path("/sys/fs/cgroup/cpu,cpuacct"))
+
+
+# Functions
+def cgroup_cpu_quota():
+    """
+    CPU quota of the container (``docker --cpus``, Compose ``cpus:``), in
+    CPUs, or None when there is no quota or no cgroup.
+    """
+
+    try:
+        quota, period = CGROUP_V2_CPU_MAX.read_text().split()[:2]
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    for cpu_dir in CGROUP_V1_CPU_DIRS:
+        try:
+            quota = int((cpu_dir / "cpu.cfs_quota_us").read_text())
+            period = int((cpu_dir / "cpu.cfs_period_us").read_text())
+        except (OSError, ValueError):
+            continue
+        return quota / period if quota > 0 and period > 0 else None
+
+    return None
+
+
+def available_cpus():
+    """
+    Number of CPUs this process may use: the CPUs it may run on (container
+    CPU sets included), capped by the cgroup CPU quota (rounded up).
+    """
+
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+
+    return cpus
+
+
+def thread_budget(workers: int = 1, threads: int = 0):
+    """
+    Torch intra-op threads per worker process.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of API worker processes. Defaults to 1.
+    threads : int, optional
+        Explicit budget; 0 splits the available CPUs evenly between the
+        workers, so that workers x threads matches the cores. Defaults to 0.
+
+    Returns
+    -------
+    int
+        Threads per worker (at least 1).
+    """
+
+    if threads > 0:
+        return threads
+
+    return max(1, available_cpus() // max(1, workers))
+
+
+def configure_threads(threads: int):
+    """
+    Set the torch intra-op and OpenCV thread pool sizes of the current
+    process.
+
+    Returns
+    -------
+    int
+        Intra-op threads now used by torch.
+    """
+
+    torch.set_num_threads(threads)
+    cv2.setNumThreads(threads)
+
+    return torch.get_num_threads()
+
+
+def process_memory(pid="self"):
+    """
+    Memory of a process, in MiB.
+
+    RSS counts pages shared with other processes (e.g. the model weights
+    loaded before forking the workers) in full; PSS divides them between
+    the processes sharing them, so the PSS of the workers adds up to the
+    memory actually used.
+
+    Parameters
+    ----------
+    pid : int or str, optional
+        Process ID. Defaults to the current process.
+
+    Returns
+    -------
+    dict
+        ``rss_mb``, ``pss_mb``, ``shared_mb`` and ``private_mb`` (None when
+        ``/proc/<pid>/smaps_rollup`` is not available, e.g. outside Linux).
+    """
+
+    fields = {}
+    rollup = Path(f"/proc/{pid}/smaps_rollup")
+
+    if rollup.exists():
+        for line in rollup.read_text().splitlines():
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+
+    def total(*names):
+        return round(sum(fields[n] for n in names), 1) if fields else None
+
+    return {
+            "rss_mb": total("Rss"),
+            "pss_mb": total("Pss"),
+            "shared_mb": total("Shared_Clean", "Shared_Dirty"),
+            "private_mb": total("Private_Clean", "Private_Dirty"),
+            }
@@ -0,0 +1,126 @@
+# Imports
+import numpy as np
+from boxes import box_overlap  # type: ignore
+
+# Out of docker in ROOT
+# from inference.boxes import box_overlap
+
+
+# Helper functions
+def _tile_starts(length: int, tile_size: int, step: int):
+    """
+    Start offsets of the tiles along one axis; the last tile is aligned to
+    the border so every tile has the full size.
+    """
+
+    if length <= tile_size:
+        return [0]
+
+    return list(range(0, length - tile_size, step)) + [length - tile_size]
+
+
+# Functions
+def tile_windows(width: int, height: int, tile_size: int = 640, overlap: float = 0.2):
+    """
+    Cut an image into overlapping square tiles.
+
+    Parameters
+    ----------
+    width : int
+        Image width, in pixels.
+    height : int
+        Image height, in pixels.
+    tile_size : int, optional
+        Tile side, in pixels. Images smaller than a tile along an axis get a
+        single (smaller) tile along that axis. Defaults to 640.
+    overlap : float, optional
+        Fraction of a tile shared with its neighbour, in [0, 1). Defaults to
+        0.2.
+
+    Returns
+    -------
+    np.ndarray
+        Windows of shape (T, 4), dtype int64, with rows ``[x1, y1, x2, y2]``
+        in image coordinates, row by row.
+    """
+
+    if tile_size < 1:
+        raise ValueError(f"tile_size must be positive, got {tile_size}.")
+    if not 0 <= overlap < 1:
+        raise ValueError(f"overlap must be in [0, 1), got {overlap}.")
+
+    step = max(1, int(round(tile_size * (1 - overlap))))
+
+    return np.array([
+                     [x, y, min(x + tile_size, width), min(y + tile_size, height)]
+                     for y in _tile_starts(height, tile_size, step)
+                     for x in _tile_starts(width, tile_size, step)
+                     ], dtype=np.int64)
+
+
+def merge_detections(detections, method: str = "nms", metric: str = "ios", threshold: float = 0.5, agnostic: bool = True):
+    """
+    Merge the duplicates of detections gathered from overlapping tiles.
+
+    Detections are visited by decreasing confidence (then area); each one
+    absorbs the remaining detections overlapping it by at least
+    ``threshold``. With ``method="nms"`` the absorbed detections are dropped;
+    with ``method="fuse"`` the kept box is grown to enclose them (an object
+    cut by a tile border is rebuilt from its parts).
+
+    Parameters
+    ----------
+    detections : np.ndarray
+        Array of shape (N, 6) with rows ``[x1, y1, x2, y2, conf, class_id]``
+        in image coordinates.
+    method : str, optional
+        "nms" or "fuse". Defaults to "nms".
+    metric : str, optional
+        Overlap metric, "iou" or "ios" (see ``box_overlap``). Defaults to
+        "ios".
+    threshold : float, optional
+        Minimum overlap for two detections to be merged. Defaults to 0.5.
+    agnostic : bool, optional
+        Merge detections of different classes too, as the model NMS does
+        with ``agnostic_nms``. Defaults to True.
+
+    Returns
+    -------
+    np.ndarray
+        Merged detections of shape (K, 6), dtype float32, by decreasing
+        confidence.
+    """
+
+    if method not in ("nms", "fuse"):
+        raise ValueError(f"Unknown merge method: {method!r} (expected 'nms' or 'fuse').")
+
+    detections = np.asarray(detections, dtype=np.float32).reshape(-1, 6)
+    if len(detections) < 2:
+        return detections
+
+    # By decreasing confidence, then area (a box cut by a tile border loses ties)
+    area = (detections[:, 2] - detections[:, 0]) * (detections[:, 3] - detections[:, 1])
+    detections = detections[np.lexsort((-area, -detections[:, 4]))]
+    overlap = box_overlap(detections[:, :4], detections[:, :4], metric) >= threshold
+    if not agnostic:
+        overlap &= detections[:, None, 5] == detections[None, :, 5]
+
+    merged = []
+    free = np.ones(len(detections), dtype=bool)
+
+    for i in range(len(detections)):
+        if not free[i]:
+            continue
+
+        group = overlap[i] & free
+        group[i] = True
+        free &= ~group
+
+        row = detections[i].copy()
+        if method == "fuse":
+            boxes = detections[group, :4]
+            row[:2] = boxes[:, :2].min(axis=0)
+            row[2:4] = boxes[:, 2:4].max(axis=0)
+        merged.append(row)
+
+    return np.stack(merged)
@@ -0,0 +1,276 @@
+# Imports
+import numpy as np
+from boxes import box_overlap  # type: ignore
+
+# Out of docker in ROOT
+# from inference.boxes import box_overlap
+
+
+# Helper functions
+def _xyxy_to_cxcywh(boxes):
+    """
+    Convert (N, 4) ``[x1, y1, x2, y2]`` boxes to ``[cx, cy, w, h]``.
+    """
+
+    wh = boxes[:, 2:4] - boxes[:, 0:2]
+
+    return np.concatenate([boxes[:, 0:2] + wh / 2, wh], axis=1)
+
+
+def _cxcywh_to_xyxy(boxes):
+    """
+    Convert (N, 4) ``[cx, cy, w, h]`` boxes to ``[x1, y1, x2, y2]``.
+    """
+
+    half = np.maximum(boxes[:, 2:4], 0) / 2
+
+    return np.concatenate([boxes[:, 0:2] - half, boxes[:, 0:2] + half], axis=1)
+
+
+def greedy_match(cost):
+    """
+    Match rows to columns of a cost matrix by iterated mutual best pairs.
+
+    At every round, each row whose lowest-cost column also has that row as
+    its lowest-cost row is matched, then both are removed. Each round is a
+    couple of array reductions, and the cheapest remaining pair is always a
+    mutual best, so the loop ends after at most ``min(N, M)`` rounds (a few
+    in practice). Infinite costs are never matched.
+
+    Parameters
+    ----------
+    cost : np.ndarray
+        Cost matrix of shape (N, M).
+
+    Returns
+    -------
+    tuple of np.ndarray
+        Matched row indices and column indices.
+    """
+
+    cost = cost.copy()
+    rows, cols = [], []
+    row_idx = np.arange(cost.shape[0])
+
+    while cost.size and np.isfinite(cost).any():
+        best_col = np.argmin(cost, axis=1)
+        best_row = np.argmin(cost, axis=0)
+
+        mutual = (best_row[best_col] == row_idx) & np.isfinite(cost[row_idx, best_col])
+        if not mutual.any():
+            break
+
+        r, c = row_idx[mutual], best_col[mutual]
+        rows.append(r)
+        cols.append(c)
+        cost[r, :] = np.inf
+        cost[:, c] = np.inf
+
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+# Classes
+class ArrayTracker():
+    """
+    Multi-object tracker whose state lives in contiguous NumPy arrays.
+
+    Every track has a constant-velocity Kalman filter over ``[cx, cy, w, h]``
+    (state ``[cx, cy, w, h, vcx, vcy, vw, vh]``). Prediction and correction
+    run as batched matrix operations over all tracks, and association uses
+    vectorized IoU and center distance matrices: pairs overlapping by at
+    least ``iou_threshold`` are preferred, then pairs whose centers are
+    closer than ``distance_threshold``. No Python object is built per
+    detection or per track.
+
+    A track is reported once it has been matched ``min_hits`` times and is
+    dropped after ``max_age`` consecutive frames without a match.
+    """
+
+    # Kalman model (pixels, one frame per step)
+    _F = np.eye(8) + np.eye(8, k=4)
+    _H = np.eye(4, 8)
+    _Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.5, 0.5, 0.25, 0.25]) ** 2
+    _R = np.diag([4.0, 4.0, 8.0, 8.0]) ** 2
+    _P0 = np.diag([8.0, 8.0, 16.0, 16.0, 32.0, 32.0, 16.0, 16.0]) ** 2
+
+    def __init__(self, iou_threshold: float = 0.3, distance_threshold: float = 100.0, min_hits: int = 3, max_age: int = 15):
+        """
+        Initialize an empty tracker.
+
+        Parameters
+        ----------
+        iou_threshold : float, optional
+            Minimum IoU between a predicted track box and a detection for an
+            overlap match. Defaults to 0.3.
+        distance_threshold : float, optional
+            Maximum center distance, in pixels, for a distance match
+            (non-overlapping pairs, e.g. small fast objects). Defaults to
+            100.0, as the Norfair tracker.
+        min_hits : int, optional
+            Matches needed before a track is reported. Defaults to 3.
+        max_age : int, optional
+            Consecutive unmatched frames after which a track is dropped.
+            Defaults to 15.
+        """
+
+        self.iou_threshold = iou_threshold
+        self.distance_threshold = distance_threshold
+        self.min_hits = max(1, int(min_hits))
+        self.max_age = max(0, int(max_age))
+
+        self._next_id = 1
+        self._mean = np.zeros((0, 8))
+        self._cov = np.zeros((0, 8, 8))
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._hits = np.zeros(0, dtype=np.int64)
+        self._misses = np.zeros(0, dtype=np.int64)
+        self._conf = np.zeros(0, dtype=np.float32)
+        self._class = np.zeros(0, dtype=np.int64)
+        self._boxes = np.zeros((0, 4), dtype=np.float32)
+
+    def __len__(self):
+        return len(self._ids)
+
+    # Kalman filter
+    def _predict(self, steps: int = 1):
+        for _ in range(steps):
+            self._mean = self._mean @ self._F.T
+            self._cov = self._F @ self._cov @ self._F.T + self._Q
+
+    def _correct(self, idx, measurements):
+        mean, cov = self._mean[idx], self._cov[idx]
+
+        # S = H P H^T + R, K = P H^T S^-1 (S is symmetric)
+        pht = cov @ self._H.T
+        s = self._H @ pht + self._R
+        gain = np.linalg.solve(s, pht.transpose(0, 2, 1)).transpose(0, 2, 1)
+
+        innovation = measurements - mean @ self._H.T
+        self._mean[idx] = mean + np.einsum("nij,nj->ni", gain, innovation)
+        self._cov[idx] = cov - gain @ self._H @ cov
+
+    # Association
+    def _associate(self, track_boxes, det_boxes):
+        if len(track_boxes) == 0 or len(det_boxes) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        iou = box_overlap(track_boxes, det_boxes)
+
+        track_centers = (track_boxes[:, 0:2] + track_boxes[:, 2:4]) / 2
+        det_centers = (det_boxes[:, 0:2] + det_boxes[:, 2:4]) / 2
+        dx = track_centers[:, None, 0] - det_centers[None, :, 0]
+        dy = track_centers[:, None, 1] - det_centers[None, :, 1]
+        distance = np.sqrt(dx * dx + dy * dy)
+
+        # Overlap matches cost [0, 1), distance matches [1, 2), others never
+        cost = np.where(
+                        iou >= self.iou_threshold,
+                        1.0 - iou,
+                        np.where(distance <= self.distance_threshold, 1.0 + distance / max(self.distance_threshold, 1e-9), np.inf),
+                        )
+
+        return greedy_match(cost)
+
+    # Tracking
+    def update(self, detections=None, period: int = 1):
+        """
+        Advance the tracker to the next processed frame.
+
+        Parameters
+        ----------
+        detections : np.ndarray, optional
+            Detections of the frame, shape (M, 6) with rows
+            ``[x1, y1, x2, y2, conf, class_id]``. None when the detector did
+            not run on this frame: tracks are only predicted (their boxes
+            follow the motion model) and do not age.
+        period : int, optional
+            Frames since the previous call (more than 1 when frames were
+            dropped, e.g. on a live stream). The motion model advances
+            ``period`` steps and unmatched tracks age by ``period`` frames.
+            Defaults to 1.
+
+        Returns
+        -------
+        np.ndarray
+            Reported tracks, shape (K, 7), dtype float32, with rows
+            ``[track_id, x1, y1, x2, y2, conf, class_id]``.
+        """
+
+        period = max(1, int(period))
+        self._predict(period)
+        predicted = _cxcywh_to_xyxy(self._mean[:, 0:4]).astype(np.float32)
+
+        if detections is None:
+            self._boxes = predicted
+            return self._report()
+
+        detections = np.asarray(detections, dtype=np.float32).reshape(-1, 6)
+        det_boxes = detections[:, 0:4]
+
+        rows, cols = self._associate(predicted, det_boxes)
+
+        # Matched tracks: Kalman correction, detected box reported
+        self._boxes = predicted
+        if len(rows):
+            self._correct(rows, _xyxy_to_cxcywh(det_boxes[cols].astype(np.float64)))
+            self._boxes[rows] = det_boxes[cols]
+            self._conf[rows] = detections[cols, 4]
+            self._class[rows] = detections[cols, 5].astype(np.int64)
+
+        self._hits[rows] += 1
+        matched = np.zeros(len(self._ids), dtype=bool)
+        matched[rows] = True
+        self._misses[~matched] += period
+        self._misses[matched] = 0
+
+        # Unmatched detections start new tracks
+        new = np.ones(len(detections), dtype=bool)
+        new[cols] = False
+        if new.any():
+            self._spawn(detections[new])
+
+        # Drop lost tracks
+        alive = self._misses <= self.max_age
+        if not alive.all():
+            self._keep(alive)
+
+        return self._report()
+
+    def _spawn(self, detections):
+        count = len(detections)
+
+        mean = np.zeros((count, 8))
+        mean[:, 0:4] = _xyxy_to_cxcywh(detections[:, 0:4].astype(np.float64))
+
+        self._mean = np.concatenate([self._mean, mean])
+        self._cov = np.concatenate([self._cov, np.broadcast_to(self._P0, (count, 8, 8))])
+        self._ids = np.concatenate([self._ids, np.arange(self._next_id, self._next_id + count)])
+        self._hits = np.concatenate([self._hits, np.ones(count, dtype=np.int64)])
+        self._misses = np.concatenate([self._misses, np.zeros(count, dtype=np.int64)])
+        self._conf = np.concatenate([self._conf, detections[:, 4]])
+        self._class = np.concatenate([self._class, detections[:, 5].astype(np.int64)])
+        self._boxes = np.concatenate([self._boxes, detections[:, 0:4]])
+        self._next_id += count
+
+    def _keep(self, mask):
+        self._mean = self._mean[mask]
+        self._cov = self._cov[mask]
+        self._ids = self._ids[mask]
+        self._hits = self._hits[mask]
+        self._misses = self._misses[mask]
+        self._conf = self._conf[mask]
+        self._class = self._class[mask]
+        self._boxes = self._boxes[mask]
+
+    def _report(self):
+        confirmed = self._hits >= self.min_hits
+
+        return np.column_stack([
+                                self._ids[confirmed],
+                                self._boxes[confirmed],
+                                self._conf[confirmed],
+                                self._class[confirmed],
+                                ]).astype(np.float32)
\ No newline at end of file
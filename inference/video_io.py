@@ -0,0 +1,246 @@
+# Imports
+import subprocess
+import cv2
+import numpy as np
+
+
+# Functions
+def probe_video(path):
+    """
+    Read the frame size, frame rate and frame count of a video.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Path to the video file.
+
+    Returns
+    -------
+    tuple of (int, int, float, int)
+        Width, height, frames per second (30.0 when unknown) and number of
+        frames (0 when unknown).
+
+    Raises
+    ------
+    RuntimeError
+        If the video cannot be opened.
+    """
+
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if not fps or fps <= 0:
+        fps = 30.0
+
+    width  = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    frames = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    cap.release()
+
+    return width, height, fps, frames
+
+
+def scaled_size(width: int, height: int, max_side=None):
+    """
+    Frame size after shrinking the longer side to ``max_side`` (even sizes,
+    as needed by the H.264 encoder). Unchanged when ``max_side`` is None,
+    0 or larger than the frame.
+    """
+
+    if not max_side or max(width, height) <= max_side:
+        return width, height
+
+    scale = max_side / max(width, height)
+
+    return max(2, round(width * scale / 2) * 2), max(2, round(height * scale / 2) * 2)
+
+
+# Classes
+class FFmpegPipeReader():
+    """
+    ``cv2.VideoCapture``-like reader that decodes a video in an ffmpeg
+    process and reads raw BGR frames from its ``stdout``.
+
+    ffmpeg decodes with several threads (``cv2.VideoCapture`` uses one) and
+    can shrink the frames while decoding (``max_side``), so full-size frames
+    never reach Python. Implements the subset of the ``cv2.VideoCapture``
+    API used by ``InferenceVideo``: ``isOpened``, ``get``, ``read`` and
+    ``release``.
+    """
+
+    def __init__(self, path, threads: int = 0, max_side=None):
+        """
+        Start the ffmpeg decoder process.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Path to the video file.
+        threads : int, optional
+            Decoder threads (0: chosen by ffmpeg). Defaults to 0.
+        max_side : int, optional
+            Longer side of the decoded frames; larger videos are scaled
+            down by ffmpeg. Defaults to None (original size).
+
+        Raises
+        ------
+        RuntimeError
+            If the video cannot be opened.
+        """
+
+        width, height, fps, frames = probe_video(path)
+        out_width, out_height = scaled_size(width, height, max_side)
+
+        scale = ["-vf", f"scale={out_width}:{out_height}:flags=area"] if (out_width, out_height) != (width, height) else []
+        cmd = [
+               "ffmpeg", "-loglevel", "error", "-nostdin",
+               "-threads", str(threads),
+               "-i", str(path),
+               *scale,
+               "-an", "-sn",
+               "-fps_mode", "passthrough",  # one output frame per decoded frame
+               "-f", "rawvideo", "-pix_fmt", "bgr24",
+               "pipe:1",
+               ]
+
+        self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.shape = (out_height, out_width, 3)
+        self._properties = {
+                            cv2.CAP_PROP_FRAME_WIDTH: out_width,
+                            cv2.CAP_PROP_FRAME_HEIGHT: out_height,
+                            cv2.CAP_PROP_FPS: fps,
+                            cv2.CAP_PROP_FRAME_COUNT: frames,
+                            }
+
+    def isOpened(self):
+        return self.process.stdout is not None and not self.process.stdout.closed
+
+    def get(self, prop):
+        return float(self._properties.get(prop, 0))
+
+    def read(self):
+        """
+        Read the next frame.
+
+        Returns
+        -------
+        tuple of (bool, np.ndarray or None)
+            ``(True, frame)`` with a new BGR array (H, W, 3), dtype uint8,
+            or ``(False, None)`` at the end of the video.
+        """
+
+        frame = np.empty(self.shape, dtype=np.uint8)
+        buffer = memoryview(frame).cast("B")
+
+        filled = 0
+        while filled < len(buffer):
+            n = self.process.stdout.readinto(buffer[filled:])  # type: ignore
+            if not n:
+                return False, None
+            filled += n
+
+        return True, frame
+
+    def release(self):
+        """
+        Stop the decoder (also before the end of the video). Calling it more
+        than once is safe.
+        """
+
+        if self.process.poll() is None:
+            self.process.kill()
+        if self.process.stdout and not self.process.stdout.closed:
+            self.process.stdout.close()
+        self.process.wait()
+
+
+class FFmpegPipeWriter():
+    """
+    ``cv2.VideoWriter``-like writer that pipes raw BGR frames into ffmpeg.
+
+    Frames are encoded to H.264. With ``fragmented=True`` the MP4 is written
+    as fragments (``frag_keyframe+empty_moov``), so it can be sent to
+    ``pipe:1`` and streamed to a client while frames are still being
+    processed; read the encoded bytes from ``stdout``.
+    """
+
+    def __init__(self, output, width: int, height: int, fps: float, fragmented: bool = False, crf: int = 23, preset: str = "veryfast"):
+        """
+        Start the ffmpeg encoder process.
+
+        Parameters
+        ----------
+        output : str or pathlib.Path
+            Output file path, or ``"pipe:1"`` to read the encoded video from
+            ``stdout``.
+        width, height : int
+            Frame size of the raw input frames.
+        fps : float
+            Output frame rate.
+        fragmented : bool, optional
+            Write a fragmented MP4 suitable for streaming. Defaults to False.
+        crf : int, optional
+            x264 constant rate factor (quality). Defaults to 23.
+        preset : str, optional
+            x264 speed preset. Defaults to ``"veryfast"``.
+        """
+
+        movflags = "frag_keyframe+empty_moov+default_base_moof" if fragmented else "+faststart"
+        to_pipe = str(output) == "pipe:1"
+
+        cmd = [
+               "ffmpeg", "-loglevel", "error", "-y",
+               "-f", "rawvideo", "-pix_fmt", "bgr24",
+               "-s", f"{width}x{height}", "-r", f"{fps}",
+               "-i", "pipe:0",
+               "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",  # yuv420p needs even sizes
+               "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+               "-pix_fmt", "yuv420p",
+               "-movflags", movflags,
+               "-f", "mp4", str(output),
+               ]
+
+        self.process = subprocess.Popen(
+                                        cmd,
+                                        stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE if to_pipe else subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL,
+                                        )
+        self.stdout = self.process.stdout
+
+    def write(self, frame):
+        """
+        Send one BGR frame (H, W, 3), dtype uint8, to the encoder.
+        """
+
+        self.process.stdin.write(frame.tobytes())  # type: ignore
+
+    def release(self):
+        """
+        Close the input pipe and wait for the encoder to finish. Calling it
+        more than once is safe.
+
+        Raises
+        ------
+        RuntimeError
+            If ffmpeg exits with an error.
+        """
+
+        if self.process.stdin and not self.process.stdin.closed:
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+        # With pipe:1 the reader drains stdout, so do not wait for it here
+        if self.stdout is None and self.process.wait() != 0:
+            raise RuntimeError("ffmpeg failed to encode the video.")
+
+    def kill(self):
+        """
+        Abort the encoder (e.g. when the client went away).
+        """
+
+        self.process.kill()
@@ -0,0 +1,198 @@
+# Imports
+import asyncio
+import functools
+import contextvars
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from profiling import traced_call  # type: ignore
+
+# Out of docker in ROOT
+# from inference.profiling import traced_call
+
+
+# Exceptions
+class PoolSaturatedError(RuntimeError):
+    """
+    Raised when the admission queue of an ``InferencePool`` is full.
+    """
+
+
+# Helper functions
+def _timed_call(fn, args, kwargs):
+    """
+    Run ``fn`` in a worker and return the wall-clock start time with its
+    result (wall clock so it can be compared across processes).
+    """
+
+    return time.time(), traced_call(fn, *args, **kwargs)
+
+
+# Classes
+class InferencePool():
+    """
+    Bounded worker pool running blocking inference work off the event loop.
+
+    Work runs on a thread or process pool of ``max_workers``. At most
+    ``max_workers + queue_size`` requests are admitted at the same time;
+    further requests are rejected with ``PoolSaturatedError`` so the API can
+    answer 503 + Retry-After instead of letting latency grow without limit.
+    """
+
+    def __init__(self, max_workers: int = 2, queue_size: int = 16, kind: str = "thread", window: int = 1000, wait_callback=None):
+        """
+        Initialize the pool.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            Number of worker threads or processes. Defaults to 2.
+        queue_size : int, optional
+            Number of admitted requests allowed to wait for a free worker.
+            Defaults to 16.
+        kind : str, optional
+            ``"thread"`` or ``"process"``. With processes, submitted
+            functions and their arguments must be picklable. Defaults to
+            ``"thread"``.
+        window : int, optional
+            Number of recent wait times kept for the statistics.
+            Defaults to 1000.
+        wait_callback : callable, optional
+            Called with the time (seconds) each call waited for a free
+            worker, from the caller's context. Defaults to None.
+        """
+
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Invalid pool kind: {kind}")
+
+        self.kind = kind
+        self.max_workers = max(1, int(max_workers))
+        self.capacity = self.max_workers + max(0, int(queue_size))
+        self.wait_callback = wait_callback
+
+        if kind == "thread":
+            self.executor = ThreadPoolExecutor(
+                                               max_workers=self.max_workers,
+                                               thread_name_prefix="inference",
+                                               )
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        # Statistics (only mutated from the event loop thread)
+        self.in_flight = 0
+        self.executing = 0
+        self.rejected = 0
+        self.completed = 0
+        self._waits = deque(maxlen=window)
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Reserve an admission slot for the duration of a request.
+
+        Raises
+        ------
+        PoolSaturatedError
+            If every admission slot is taken.
+        """
+
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise PoolSaturatedError("Inference queue is full.")
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    async def execute(self, fn, *args, **kwargs):
+        """
+        Run ``fn`` on the pool for an already admitted request.
+
+        Parameters
+        ----------
+        fn : callable
+            Blocking function to run.
+        *args, **kwargs
+            Arguments forwarded to ``fn``.
+
+        Returns
+        -------
+        object
+            Return value of ``fn``.
+        """
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(_timed_call, fn, args, kwargs)
+        if self.kind == "thread":
+            # Run in the caller's context (request trace of the profiling hooks)
+            call = functools.partial(contextvars.copy_context().run, call)
+        submitted = time.time()
+
+        self.executing += 1
+        try:
+            started, result = await loop.run_in_executor(self.executor, call)
+        finally:
+            self.executing -= 1
+
+        wait = max(0.0, started - submitted)
+        self._waits.append(wait)
+        self.completed += 1
+        if self.wait_callback is not None:
+            self.wait_callback(wait)
+
+        return result
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Admit a request and run ``fn`` on the pool.
+
+        Raises
+        ------
+        PoolSaturatedError
+            If every admission slot is taken.
+        """
+
+        async with self.admit():
+            return await self.execute(fn, *args, **kwargs)
+
+    def shutdown(self):
+        """
+        Shut the underlying executor down, cancelling queued work.
+        """
+
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """
+        Return queue depth and wait time statistics.
+
+        Returns
+        -------
+        dict
+            Pool configuration, admitted / executing / queued work, rejected
+            and completed counts, and the recent queue wait times in
+            milliseconds (mean, p50, p95, max).
+        """
+
+        waits = sorted(self._waits)
+
+        def pct(q):
+            return 1000.0 * waits[min(len(waits) - 1, int(q * len(waits)))] if waits else 0.0
+
+        return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "executing": self.executing,
+                "queue_depth": max(0, self.executing - self.max_workers),
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "wait_ms_mean": 1000.0 * sum(waits) / len(waits) if waits else 0.0,
+                "wait_ms_p50": pct(0.50),
+                "wait_ms_p95": pct(0.95),
+                "wait_ms_max": 1000.0 * waits[-1] if waits else 0.0,
+                }
@@ -0,0 +1,49 @@
+# Imports
+import io
+import sys
+from pathlib import Path
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "inference"))
+from image_io import EXIF_ORIENTATION, decode_image, image_size, restore_scale  # type: ignore
+
+
+# Helper functions
+def _jpeg(width: int, height: int, orientation: int = 1) -> bytes:
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = orientation
+
+    buffer = io.BytesIO()
+    Image.fromarray(np.zeros((height, width, 3), dtype=np.uint8)).save(buffer, "JPEG", exif=exif)
+
+    return buffer.getvalue()
+
+
+# Tests
+@pytest.mark.parametrize("orientation", [1, 3, 5, 6, 7, 8])
+def test_reduced_decode_maps_back_to_decoded_size(orientation):
+    data = _jpeg(400, 300, orientation)
+
+    full = decode_image(data)
+    reduced = decode_image(data, reduced=True, min_side=100)
+    assert reduced.shape[0] < full.shape[0]
+
+    # Full-frame box on the reduced image covers the full-resolution image
+    height, width = reduced.shape[:2]
+    detections = np.array([[0, 0, width, height, 0.9, 0]], dtype=np.float32)
+    restored, shape = restore_scale(detections, reduced.shape, image_size(data))
+
+    assert image_size(data) == (full.shape[1], full.shape[0])
+    assert shape == full.shape
+    np.testing.assert_allclose(restored[0, :4], [0, 0, full.shape[1], full.shape[0]])
+
+
+def test_restore_scale_without_size_keeps_detections():
+    detections = np.array([[1, 2, 3, 4, 0.5, 1]], dtype=np.float32)
+
+    restored, shape = restore_scale(detections, (10, 20, 3), None)
+
+    assert restored is detections
+    assert shape == (10, 20, 3)
@@ -0,0 +1,211 @@
+# Imports
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+import cv2
+import numpy as np
+from ultralytics import YOLO  # type: ignore
+from train_models.src.yolov8 import ModelYoloV8
+from config.config import (
+                           ROOT_DIR,
+                           INFERENCE,
+                           DATASET_YAML,
+                           DATASET_TEST_IMAGES,
+                           MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED,
+                           MODEL_NAME_YOLO_FINAL_BASELINE_ONNX,
+                           MODEL_NAME_YOLO_FINAL_BASELINE_ONNX_DYNAMIC,
+                           )
+
+sys.path.insert(0, str(INFERENCE))
+from boxes import box_overlap  # type: ignore
+
+# Same inference parameters as the API (InferencePicture.PREDICT_ARGS)
+PREDICT_ARGS = {"imgsz": 640, "conf": 0.25, "agnostic_nms": True}
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+
+# Helper functions
+def _detections(model, images, **kwargs):
+    """
+    Run a model on images and return one (N, 6) array per image.
+    """
+
+    results = model.predict(images, verbose=False, **{**PREDICT_ARGS, **kwargs})
+
+    return [r.boxes.data.cpu().numpy() for r in results]
+
+
+# Functions
+def parity(reference, candidate, images, box_tol: float, score_tol: float):
+    """
+    Compare the detections of two models image by image.
+
+    Boxes are matched greedily by IoU (highest first, IoU >= 0.5). Boxes
+    without a match count as mismatches, except when their score is within
+    ``score_tol`` of the confidence threshold (they may legitimately fall on
+    either side of it).
+
+    Returns
+    -------
+    dict
+        Matched and unmatched boxes, maximum box coordinate and score
+        differences, class mismatches and whether the tolerances are met.
+    """
+
+    matched, unmatched, class_mismatches = 0, 0, 0
+    max_box_diff, max_score_diff = 0.0, 0.0
+    borderline = PREDICT_ARGS["conf"] + score_tol
+
+    for path in images:
+        image = cv2.imread(str(path))
+        ref, cand = _detections(reference, [image])[0], _detections(candidate, [image])[0]
+
+        used_ref, used_cand = set(), set()
+        if len(ref) and len(cand):
+            iou = box_overlap(ref[:, :4], cand[:, :4])
+            for i, j in zip(*np.unravel_index(np.argsort(-iou, axis=None), iou.shape)):
+                if iou[i, j] < 0.5:
+                    break
+                if i in used_ref or j in used_cand:
+                    continue
+
+                used_ref.add(i)
+                used_cand.add(j)
+                matched += 1
+                max_box_diff = max(max_box_diff, float(np.abs(ref[i, :4] - cand[j, :4]).max()))
+                max_score_diff = max(max_score_diff, float(abs(ref[i, 4] - cand[j, 4])))
+                class_mismatches += int(ref[i, 5] != cand[j, 5])
+
+        unmatched += sum(1 for i in range(len(ref)) if i not in used_ref and ref[i, 4] >= borderline)
+        unmatched += sum(1 for j in range(len(cand)) if j not in used_cand and cand[j, 4] >= borderline)
+
+    return {
+            "images": len(images),
+            "matched_boxes": matched,
+            "unmatched_boxes": unmatched,
+            "class_mismatches": class_mismatches,
+            "max_box_diff_px": round(max_box_diff, 3),
+            "max_score_diff": round(max_score_diff, 5),
+            "box_tol_px": box_tol,
+            "score_tol": score_tol,
+            "passed": unmatched == 0 and class_mismatches == 0 and max_box_diff <= box_tol and max_score_diff <= score_tol,
+            }
+
+
+def latency(model, images, batch: int = 1, repeats: int = 3):
+    """
+    Measure the mean end-to-end latency per image (preprocess, inference and
+    postprocess) after a warmup call.
+
+    Returns
+    -------
+    dict
+        Mean milliseconds per image overall and per stage.
+    """
+
+    frames = [cv2.imread(str(path)) for path in images]
+    batches = [frames[i:i + batch] for i in range(0, len(frames), batch)]
+
+    model.predict(batches[0], verbose=False, **PREDICT_ARGS)  # warmup
+
+    stages = {"preprocess": 0.0, "inference": 0.0, "postprocess": 0.0}
+    count = 0
+    start = time.perf_counter()
+
+    for _ in range(repeats):
+        for chunk in batches:
+            for r in model.predict(chunk, verbose=False, **PREDICT_ARGS):
+                for stage in stages:
+                    stages[stage] += r.speed[stage]
+                count += 1
+
+    total_ms = 1000 * (time.perf_counter() - start)
+
+    return {
+            "batch": batch,
+            "ms_per_image": round(total_ms / count, 2),
+            **{f"{stage}_ms": round(value / count, 2) for stage, value in stages.items()},
+            }
+
+
+def main():
+    """
+    ONNX export, parity check and latency comparison for the final YOLOv8 model.
+
+    This script exports the final model to ONNX (fixed batch of 1 and dynamic
+    batch), checks that the ONNX Runtime detections match the PyTorch ones on
+    the test split (box/score tolerances and mAP delta), and compares the CPU
+    latency of both engines. The report is saved to ``runs/onnx/report.json``.
+    """
+
+    parser = argparse.ArgumentParser(description="Export the final model to ONNX and check parity and latency.")
+    parser.add_argument("--weights", default=str(INFERENCE / MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED), help="PyTorch weights.")
+    parser.add_argument("--data", default=str(DATASET_YAML), help="Dataset YAML (test split used for mAP).")
+    parser.add_argument("--images", default=str(DATASET_TEST_IMAGES), help="Test images directory (parity and latency).")
+    parser.add_argument("--box-tol", type=float, default=2.0, help="Maximum box coordinate difference (pixels).")
+    parser.add_argument("--score-tol", type=float, default=0.02, help="Maximum score difference.")
+    parser.add_argument("--map-tol", type=float, default=0.005, help="Maximum mAP50-95 drop.")
+    parser.add_argument("--latency-images", type=int, default=16, help="Test images used for the latency comparison.")
+    parser.add_argument("--skip-export", action="store_true", help="Reuse the ONNX models already exported.")
+    args = parser.parse_args()
+
+    fixed_path = INFERENCE / MODEL_NAME_YOLO_FINAL_BASELINE_ONNX
+    dynamic_path = INFERENCE / MODEL_NAME_YOLO_FINAL_BASELINE_ONNX_DYNAMIC
+
+    # Export (the fixed variant keeps the default <weights>.onnx name, so it goes last)
+    if not args.skip_export:
+        model_yolov8 = ModelYoloV8(args.weights)
+        model_yolov8.export_onnx(weight_name_model=dynamic_path.relative_to(ROOT_DIR), dynamic=True, batch=8)
+        model_yolov8.export_onnx(weight_name_model=fixed_path.relative_to(ROOT_DIR), dynamic=False, batch=1)
+
+    images = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if not images:
+        raise ValueError(f"No test images found in {args.images}")
+
+    torch_model = YOLO(args.weights, task="detect")
+    onnx_fixed = YOLO(str(fixed_path), task="detect")
+    onnx_dynamic = YOLO(str(dynamic_path), task="detect")
+
+    # Parity: detections
+    report = {
+              "parity": {
+                         "onnx_fixed": parity(torch_model, onnx_fixed, images, args.box_tol, args.score_tol),
+                         "onnx_dynamic": parity(torch_model, onnx_dynamic, images, args.box_tol, args.score_tol),
+                         },
+              }
+
+    # Parity: mAP on the test split
+    metrics = {}
+    for name, weights in (("torch", args.weights), ("onnx_fixed", fixed_path), ("onnx_dynamic", dynamic_path)):
+        result = ModelYoloV8(str(weights)).evaluate(data=args.data, split="test", imgsz=640, device="cpu", batch=1, plots=False)
+        metrics[name] = {"map50_95": float(result["map50_95"]), "map50": float(result["map50"])}
+
+    report["map"] = metrics
+    for name in ("onnx_fixed", "onnx_dynamic"):
+        delta = metrics[name]["map50_95"] - metrics["torch"]["map50_95"]
+        report["parity"][name]["map50_95_delta"] = round(delta, 5)
+        report["parity"][name]["passed"] = report["parity"][name]["passed"] and delta >= -args.map_tol
+
+    # Latency (CPU)
+    latency_images = images[:args.latency_images]
+    report["latency"] = {
+                         "torch_b1": latency(torch_model, latency_images, batch=1),
+                         "onnx_fixed_b1": latency(onnx_fixed, latency_images, batch=1),
+                         "onnx_dynamic_b1": latency(onnx_dynamic, latency_images, batch=1),
+                         "onnx_dynamic_b8": latency(onnx_dynamic, latency_images, batch=8),
+                         }
+
+    print(json.dumps(report, indent=2))
+
+    output = ROOT_DIR / "runs" / "onnx" / "report.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    if not all(p["passed"] for p in report["parity"].values()):
+        raise SystemExit("ONNX parity check failed.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,296 @@
+# Imports
+import json
+import random
+import shutil
+import argparse
+import resource
+import multiprocessing
+from pathlib import Path
+import cv2
+import numpy as np
+import onnx
+from onnxruntime.quantization import (
+                                     CalibrationDataReader,
+                                     CalibrationMethod,
+                                     QuantFormat,
+                                     QuantType,
+                                     quant_pre_process,
+                                     quantize_static,
+                                     )
+from ultralytics.data.augment import LetterBox  # type: ignore
+from train_models.src.yolov8 import ModelYoloV8
+from train_models.export_onnx import PREDICT_ARGS, IMAGE_EXTENSIONS, latency
+from config.config import (
+                           ROOT_DIR,
+                           INFERENCE,
+                           DATASET_YAML,
+                           DATASET_TRAIN_IMAGES,
+                           DATASET_TEST_IMAGES,
+                           MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED,
+                           MODEL_NAME_YOLO_FINAL_BASELINE_ONNX,
+                           MODEL_NAME_YOLO_FINAL_BASELINE_INT8,
+                           )
+
+CALIBRATION_METHODS = {
+                       "minmax": CalibrationMethod.MinMax,
+                       "entropy": CalibrationMethod.Entropy,
+                       "percentile": CalibrationMethod.Percentile,
+                       }
+
+
+# Classes
+class ImageCalibrationReader(CalibrationDataReader):
+    """
+    Feed calibration images to ONNX Runtime, preprocessed as Ultralytics
+    does at inference time (letterbox to ``imgsz`` with gray padding, BGR to
+    RGB, CHW, scaled to [0, 1]).
+    """
+
+    def __init__(self, images, input_name: str, imgsz: int = 640):
+        """
+        Initialize the reader.
+
+        Parameters
+        ----------
+        images : list of pathlib.Path
+            Calibration images.
+        input_name : str
+            Name of the model input.
+        imgsz : int, optional
+            Model input size. Defaults to 640.
+        """
+
+        self.images = list(images)
+        self.input_name = input_name
+        self.letterbox = LetterBox(new_shape=(imgsz, imgsz), auto=False)
+        self._iterator = None
+
+    def _preprocess(self, path):
+        image = self.letterbox(image=cv2.imread(str(path)))
+        image = image[..., ::-1].transpose(2, 0, 1)  # BGR to RGB, HWC to CHW
+
+        return (np.ascontiguousarray(image, dtype=np.float32) / 255.0)[None]
+
+    def get_next(self):
+        if self._iterator is None:
+            self._iterator = iter(self.images)
+
+        path = next(self._iterator, None)
+        if path is None:
+            return None
+
+        return {self.input_name: self._preprocess(path)}
+
+    def rewind(self):
+        self._iterator = None
+
+
+# Helper functions
+def _list_images(directory):
+    return sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def _head_nodes(model, convs: bool):
+    """
+    Names of the nodes of the Detect head (last ``/model.N/`` module).
+
+    The head ends by decoding boxes (pixels) and class scores ([0, 1]) into
+    a single output tensor: quantized with one scale, the scores lose all
+    their precision. With ``convs=False`` only the decoding nodes are
+    returned (the head convolutions stay quantized).
+    """
+
+    modules = {}
+    for node in model.graph.node:
+        parts = node.name.split("/")
+        if len(parts) > 2 and parts[1].startswith("model."):
+            modules.setdefault(int(parts[1].split(".")[1]), []).append(node)
+
+    if not modules:
+        return []
+
+    return [node.name for node in modules[max(modules)] if convs or node.op_type != "Conv"]
+
+
+def _peak_memory_worker(weights, images, queue):
+    from ultralytics import YOLO  # type: ignore
+
+    model = YOLO(str(weights), task="detect")
+    for path in images:
+        model.predict(cv2.imread(str(path)), verbose=False, **PREDICT_ARGS)
+
+    # VmHWM is the peak of this process only (ru_maxrss keeps the parent's peak across exec)
+    status = Path("/proc/self/status")
+    if status.exists():
+        peak_kib = next(int(line.split()[1]) for line in status.read_text().splitlines() if line.startswith("VmHWM:"))
+    else:
+        peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    queue.put(peak_kib / 1024)  # KiB to MiB
+
+
+# Functions
+def quantize(fp32_path, output_path, images, method: str = "minmax", head: str = "decode", imgsz: int = 640):
+    """
+    Post-training static INT8 quantization of an ONNX model.
+
+    Weights are quantized per channel (int8) and activations per tensor
+    (uint8) in QDQ format, with activation ranges calibrated on ``images``.
+
+    Parameters
+    ----------
+    fp32_path : pathlib.Path
+        FP32 ONNX model (fixed input shape).
+    output_path : pathlib.Path
+        Quantized model path.
+    images : list of pathlib.Path
+        Calibration images.
+    method : str, optional
+        Calibration method: "minmax", "entropy" or "percentile". Defaults to
+        "minmax".
+    head : str, optional
+        Detect head nodes kept in FP32: "decode" (box and score decoding),
+        "full" (decoding and convolutions) or "none". Defaults to "decode".
+    imgsz : int, optional
+        Model input size. Defaults to 640.
+
+    Returns
+    -------
+    pathlib.Path
+        Path of the quantized model.
+    """
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Shape inference and graph optimizations before quantization
+    prepared_path = output_path.with_name(output_path.stem + "_prepared.onnx")
+    quant_pre_process(str(fp32_path), str(prepared_path))
+
+    prepared = onnx.load(str(prepared_path))
+    excluded = [] if head == "none" else _head_nodes(prepared, convs=head == "full")
+
+    quantize_static(
+                    prepared,
+                    str(output_path),
+                    ImageCalibrationReader(images, prepared.graph.input[0].name, imgsz),
+                    quant_format=QuantFormat.QDQ,
+                    per_channel=True,
+                    activation_type=QuantType.QUInt8,
+                    weight_type=QuantType.QInt8,
+                    nodes_to_exclude=excluded,
+                    calibrate_method=CALIBRATION_METHODS[method],
+                    )
+    prepared_path.unlink(missing_ok=True)
+
+    # Ultralytics reads class names, stride and imgsz from the model metadata
+    source, quantized = onnx.load(str(fp32_path)), onnx.load(str(output_path))
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(source.metadata_props)
+    onnx.save(quantized, str(output_path))
+
+    return output_path
+
+
+def peak_memory(weights, images):
+    """
+    Peak resident memory (MiB) of a fresh process loading a model and running
+    it on ``images``. Each model is measured in its own process so the
+    numbers are comparable.
+    """
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_peak_memory_worker, args=(str(weights), [str(p) for p in images], queue))
+    process.start()
+    value = queue.get()
+    process.join()
+
+    return round(value, 1)
+
+
+def main():
+    """
+    INT8 quantization workflow for the final YOLOv8 model.
+
+    This script quantizes the FP32 ONNX export of the final model (exported
+    first if missing) with post-training static quantization calibrated on a
+    sample of the training split, evaluates mAP50-95 on the test split
+    against the PyTorch model and publishes the INT8 model next to the
+    inference service only if the drop is within ``--max-drop``. Latency and
+    peak memory of the PyTorch, FP32 ONNX and INT8 ONNX models are reported
+    in ``runs/quantize/report.json``.
+    """
+
+    parser = argparse.ArgumentParser(description="Quantize the final model to INT8 and publish it if accurate enough.")
+    parser.add_argument("--weights", default=str(INFERENCE / MODEL_NAME_YOLO_FINAL_BASELINE_TUNNED), help="PyTorch weights (FP32 baseline).")
+    parser.add_argument("--onnx", default=str(INFERENCE / MODEL_NAME_YOLO_FINAL_BASELINE_ONNX), help="FP32 ONNX model, fixed batch of 1 (exported if missing).")
+    parser.add_argument("--data", default=str(DATASET_YAML), help="Dataset YAML (test split used for mAP).")
+    parser.add_argument("--calibration-images", default=str(DATASET_TRAIN_IMAGES), help="Training images directory (calibration).")
+    parser.add_argument("--calibration-size", type=int, default=200, help="Training images sampled for calibration.")
+    parser.add_argument("--method", choices=sorted(CALIBRATION_METHODS), default="minmax", help="Calibration method.")
+    parser.add_argument("--head", choices=["decode", "full", "none"], default="decode", help="Detect head nodes kept in FP32.")
+    parser.add_argument("--max-drop", type=float, default=0.01, help="Maximum mAP50-95 drop to publish the INT8 model.")
+    parser.add_argument("--images", default=str(DATASET_TEST_IMAGES), help="Test images directory (latency and memory).")
+    parser.add_argument("--latency-images", type=int, default=16, help="Test images used for latency and memory.")
+    parser.add_argument("--seed", type=int, default=0, help="Calibration sampling seed.")
+    args = parser.parse_args()
+
+    fp32_path = Path(args.onnx)
+    candidate_path = ROOT_DIR / "runs" / "quantize" / MODEL_NAME_YOLO_FINAL_BASELINE_INT8
+    published_path = INFERENCE / MODEL_NAME_YOLO_FINAL_BASELINE_INT8
+
+    if not fp32_path.exists():
+        ModelYoloV8(args.weights).export_onnx(weight_name_model=fp32_path.relative_to(ROOT_DIR), dynamic=False, batch=1)
+
+    # Calibration on a sample of the training split
+    calibration = _list_images(args.calibration_images)
+    if not calibration:
+        raise ValueError(f"No calibration images found in {args.calibration_images}")
+    calibration = sorted(random.Random(args.seed).sample(calibration, min(args.calibration_size, len(calibration))))
+
+    quantize(fp32_path, candidate_path, calibration, method=args.method, head=args.head)
+
+    # Accuracy gate on the test split
+    metrics = {}
+    for name, weights in (("torch", args.weights), ("onnx_fp32", fp32_path), ("onnx_int8", candidate_path)):
+        result = ModelYoloV8(str(weights)).evaluate(data=args.data, split="test", imgsz=640, device="cpu", batch=1, plots=False)
+        metrics[name] = {"map50_95": float(result["map50_95"]), "map50": float(result["map50"])}
+
+    drop = metrics["torch"]["map50_95"] - metrics["onnx_int8"]["map50_95"]
+    passed = drop <= args.max_drop
+
+    # Latency and memory (CPU)
+    images = _list_images(args.images)[:args.latency_images]
+    if not images:
+        raise ValueError(f"No test images found in {args.images}")
+
+    models = {"torch": Path(args.weights), "onnx_fp32": fp32_path, "onnx_int8": candidate_path}
+    report = {
+              "calibration": {"images": len(calibration), "method": args.method, "head_fp32": args.head},
+              "map": metrics,
+              "gate": {"map50_95_drop": round(drop, 5), "max_drop": args.max_drop, "passed": passed},
+              "latency": {name: latency(ModelYoloV8(str(weights)).model, images, batch=1) for name, weights in models.items()},
+              "memory": {
+                         name: {
+                                "file_mb": round(weights.stat().st_size / (1 << 20), 2),
+                                "peak_rss_mb": peak_memory(weights, images),
+                                }
+                         for name, weights in models.items()
+                         },
+              }
+
+    if passed:
+        shutil.copy(candidate_path, published_path)
+        report["gate"]["published"] = str(published_path.relative_to(ROOT_DIR))
+
+    print(json.dumps(report, indent=2))
+
+    output = ROOT_DIR / "runs" / "quantize" / "report.json"
+    output.write_text(json.dumps(report, indent=2))
+
+    if not passed:
+        raise SystemExit(f"INT8 model not published: mAP50-95 drop {drop:.4f} > {args.max_drop}.")
+
+if __name__ == "__main__":
+    main()
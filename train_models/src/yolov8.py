@@ -27,10 +27,11 @@ class ModelYoloV8():
         ----------
         model_name : str, optional
             Name or path of the YOLOv8 model to load (e.g., 'yolov8n.pt',
-            'yolov8m.pt'). Defaults to MODEL_NAME_YOLO.
+            'yolov8m.pt', or an exported '.onnx' model for evaluation).
+            Defaults to MODEL_NAME_YOLO.
         """
 
-        self.model = YOLO(model_name)
+        self.model = YOLO(model_name, task="detect")
         self.model_name = model_name
         self.metrics = None
 
@@ -119,4 +120,55 @@ class ModelYoloV8():
             raise ValueError("Model training has not been completed or 'best' weights are unavailable.")
         
         best = self.model.trainer.best
-        shutil.copy(best, ROOT_DIR / weight_name_model)
\ No newline at end of file
+        shutil.copy(best, ROOT_DIR / weight_name_model)
+
+    def export_onnx(self, weight_name_model=None, dynamic: bool = False, batch: int = 1, imgsz: int = 640, simplify: bool = True, opset=None):
+        """
+        Export the model to ONNX for CPU inference with ONNX Runtime.
+
+        This method is a wrapper around ``YOLO.export(format="onnx")``. The
+        exported model can be loaded by the inference API (``MODEL_PATH``)
+        and by ``ModelYoloV8`` for evaluation.
+
+        Parameters
+        ----------
+        weight_name_model : str, optional
+            Filename (or relative path from the project root) of the ONNX
+            model. Defaults to the weights name with a ``.onnx`` suffix,
+            next to the weights.
+        dynamic : bool, optional
+            Export with a dynamic batch dimension (any batch size at
+            runtime). Defaults to False, a fixed batch of ``batch`` images.
+        batch : int, optional
+            Batch size of the fixed variant (example batch of the dynamic
+            one). Defaults to 1.
+        imgsz : int, optional
+            Input image size. Defaults to 640.
+        simplify : bool, optional
+            Simplify the ONNX graph. Defaults to True.
+        opset : int, optional
+            ONNX opset version. Defaults to the Ultralytics default.
+
+        Returns
+        -------
+        pathlib.Path
+            Path to the exported ONNX model.
+        """
+
+        exported = Path(self.model.export(
+                                          format="onnx",
+                                          dynamic=dynamic,
+                                          batch=batch,
+                                          imgsz=imgsz,
+                                          simplify=simplify,
+                                          opset=opset,
+                                          ))
+
+        if weight_name_model is None:
+            return exported
+
+        # Ultralytics always writes <weights>.onnx, so variants are moved away
+        destination = ROOT_DIR / weight_name_model
+        shutil.move(str(exported), destination)
+
+        return destination
\ No newline at end of file